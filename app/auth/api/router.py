@@ -13,11 +13,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 @router.post("/signup", response_model=User)
 async def signup(user: UserCreate):
-    return auth_service.signup(user)
+    return await auth_service.signup(user)
 
 @router.post("/login", response_model=Token)
 async def login(user: UserLogin):
-    return auth_service.login(user)
+    return await auth_service.login(user)
 
 @router.get("/me", response_model=User)
 async def get_current_user():
@@ -1,19 +1,25 @@
 
-from typing import Dict, Optional
+from typing import Optional
 from app.auth.schema.user import UserCreate, User
+from app.integration.shared_store import SharedStore
 
-# In-memory mock database
-fake_users_db: Dict[str, dict] = {}
+# Users live in the shared store so every worker process sees the same accounts
+USER_KEY = "user:{email}"
+USER_ID_SEQUENCE_KEY = "user_id_sequence"
 
 class UserRepository:
-    def get_by_email(self, email: str) -> Optional[User]:
-        if email in fake_users_db:
-             user_dict = fake_users_db[email]
+    def __init__(self, store: SharedStore):
+        self.store = store
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        user_dict = await self.store.get(USER_KEY.format(email=email))
+        if user_dict is not None:
              return User(**user_dict)
         return None
 
-    def create(self, user: UserCreate) -> User:
-        user_id = len(fake_users_db) + 1
+    async def create(self, user: UserCreate) -> Optional[User]:
+        """Returns None when the email is already registered."""
+        user_id = await self.store.update(USER_ID_SEQUENCE_KEY, lambda last: ((last or 0) + 1, (last or 0) + 1))
         user_obj = User(
             id=user_id,
             email=user.email,
@@ -21,6 +27,8 @@ class UserRepository:
             is_active=True
         )
         # Store password plainly for mock (in real app, hash it!)
-        fake_users_db[user.email] = user_obj.model_dump()
-        fake_users_db[user.email]["hashed_password"] = user.password # Simulated hash
+        user_dict = user_obj.model_dump()
+        user_dict["hashed_password"] = user.password # Simulated hash
+        if not await self.store.add(USER_KEY.format(email=user.email), user_dict):
+            return None
         return user_obj
@@ -1,20 +1,158 @@
-from typing import List
-from fastapi import APIRouter, Depends, File, UploadFile
+import math
+import anyio
+from typing import Literal, Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Header, Query, Request, status
 from fastapi.responses import StreamingResponse
-from app.core.dependencies.dependencies_analyze import get_analyze_service
+from starlette.background import BackgroundTask
+from app.core.dependencies.dependencies_analyze import get_analyze_service, get_extraction_cache, get_rate_scheduler, get_resilience, get_tenant_limiter
+from app.core.dependencies.dependencies_job import get_extraction_job_service
+from app.core.dependencies.dependencies_tenant import get_current_tenant
 from app.core.services.analyze_service import AnalyzeService
+from app.core.services.extraction_job_service import ExtractionJobService
+from app.integration.extraction_cache import ExtractionCache
+from app.integration.rate_scheduler import RateScheduler
+from app.integration.resilience import Resilience
+from app.integration.tenant_limiter import TenantLimiter
+from config.config import settings
+from core.exceptions import TooManyRequestsException
+from dto.extraction_job import ExtractionJobResponse
+from utl.multipart_stream import MultipartFileStream, UploadStreamingResponse
 
 
 router = APIRouter()
 
-@router.post("/upload")
-async def upload(files: List[UploadFile] = File(...), analyze_service: AnalyzeService = Depends(get_analyze_service)):
-    files_data = []
-    for file in files:
-        content = await file.read()
-        files_data.append({"filename": file.filename, "content": content})
-    
+UPLOAD_OPENAPI_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                    "required": ["files"],
+                }
+            }
+        },
+    }
+}
+
+@router.post("/upload", openapi_extra=UPLOAD_OPENAPI_BODY)
+async def upload(
+    request: Request,
+    mode: Literal["batch", "incremental"] = Query("batch", description="batch: one final `response` event; incremental: one `document` event per page plus a `summary`"),
+    analyze_service: AnalyzeService = Depends(get_analyze_service),
+    tenant: str = Depends(get_current_tenant),
+    tenant_limiter: TenantLimiter = Depends(get_tenant_limiter),
+):
+    # Rejected before a single byte of the body is read
+    retry_after = await tenant_limiter.try_enter(tenant)
+    if retry_after is not None:
+        raise TooManyRequestsException(f"Límite de uso alcanzado, reintentar en {math.ceil(retry_after)}s", retry_after)
+
+    left = False
+
+    async def leave():
+        nonlocal left
+        if left:
+            return
+        # Runs in the stream's `finally` while a client disconnect is cancelling it: the
+        # decrement must finish, or the tenant's slot stays taken until the store TTL
+        with anyio.CancelScope(shield=True):
+            await tenant_limiter.leave(tenant)
+        left = True
+
+    # The body is parsed incrementally: each file reaches the service as soon as it is uploaded
+    files = MultipartFileStream(
+        request,
+        field_name="files",
+        spool_max_size=settings.UPLOAD_SPOOL_MAX_SIZE,
+        max_files=settings.UPLOAD_MAX_FILES,
+    )
+
     async def event_stream():
-        async for token in analyze_service.upload_stream(files_data):
-            yield token
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
\ No newline at end of file
+        try:
+            async for token in analyze_service.upload_stream(files, incremental=mode == "incremental", tenant=tenant):
+                yield token
+        finally:
+            await leave()
+    # The background task covers streams that never started (client gone before the first byte)
+    return UploadStreamingResponse(event_stream(), upload_stream=files, media_type="text/event-stream", background=BackgroundTask(leave))
+
+
+@router.get("/cache/stats")
+async def cache_stats(cache: ExtractionCache = Depends(get_extraction_cache)):
+    return cache.stats()
+
+
+@router.get("/scheduler/stats")
+async def scheduler_stats(scheduler: RateScheduler = Depends(get_rate_scheduler)):
+    return scheduler.stats()
+
+
+@router.get("/tenants/stats")
+async def tenant_stats(tenant_limiter: TenantLimiter = Depends(get_tenant_limiter)):
+    return tenant_limiter.stats()
+
+
+@router.get("/resilience/stats")
+async def resilience_stats(resilience: Resilience = Depends(get_resilience)):
+    return resilience.stats()
+
+
+@router.post("/jobs", openapi_extra=UPLOAD_OPENAPI_BODY, response_model=ExtractionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: Request,
+    job_service: ExtractionJobService = Depends(get_extraction_job_service),
+    tenant: str = Depends(get_current_tenant),
+    tenant_limiter: TenantLimiter = Depends(get_tenant_limiter),
+):
+    """Stores the files and queues their extraction; follow it with GET /jobs/{job_id} or /jobs/{job_id}/events.
+    Admitted like /upload; the job's pages are charged to the same tenant when it runs."""
+    retry_after = await tenant_limiter.try_enter(tenant)
+    if retry_after is not None:
+        raise TooManyRequestsException(f"Límite de uso alcanzado, reintentar en {math.ceil(retry_after)}s", retry_after)
+
+    try:
+        files = []
+        async for upload in MultipartFileStream(
+            request,
+            field_name="files",
+            spool_max_size=settings.UPLOAD_SPOOL_MAX_SIZE,
+            max_files=settings.UPLOAD_MAX_FILES,
+        ):
+            try:
+                files.append((upload.filename, await upload.read()))
+            finally:
+                await upload.close()
+        return await job_service.submit(files, tenant)
+    finally:
+        # The slot covers the upload itself; a disconnect must not leave it taken
+        with anyio.CancelScope(shield=True):
+            await tenant_limiter.leave(tenant)
+
+
+@router.get("/jobs/{job_id}", response_model=ExtractionJobResponse)
+async def get_job(job_id: UUID, job_service: ExtractionJobService = Depends(get_extraction_job_service)):
+    return await job_service.get(job_id)
+
+
+@router.post("/jobs/{job_id}/retry", response_model=ExtractionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def retry_job(job_id: UUID, job_service: ExtractionJobService = Depends(get_extraction_job_service)):
+    """Re-queues a finished job with errors; only its failed pages are extracted again."""
+    return await job_service.retry(job_id)
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(
+    job_id: UUID,
+    after: Optional[int] = Query(None, description="Replay only events with a greater id"),
+    last_event_id: Optional[int] = Header(None),
+    job_service: ExtractionJobService = Depends(get_extraction_job_service),
+):
+    """Same events as /upload?mode=incremental, replayed from the start (or after the given
+    id, e.g. the EventSource Last-Event-ID on reconnect) and followed live until the job ends."""
+    await job_service.get(job_id)  # 404 before the stream starts
+    after_seq = after if after is not None else last_event_id if last_event_id is not None else -1
+    return StreamingResponse(job_service.events(job_id, after_seq), media_type="text/event-stream")
+
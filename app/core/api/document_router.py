@@ -1,9 +1,11 @@
-from typing import List
-from fastapi import APIRouter, Depends
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
 
-from app.core.dependencies.dependencies_document import get_document_facade
+from app.core.dependencies.dependencies_document import document_facade_scope, get_document_facade
 from app.core.facade.document_facade import DocumentFacade
 from dto.document import DocumentRequest
+from config.config import settings
 from dto.universal_dto import BaseOperacionResponse
 
 router = APIRouter()
@@ -13,8 +15,47 @@ async def save( requestList: List[DocumentRequest], document_facade: DocumentFac
     return await document_facade.save(requestList)
 
 @router.get("/list", response_model=List[dict])
-async def list_documents(document_facade: DocumentFacade = Depends(get_document_facade)):
-    return await document_facade.list()
+async def list_documents(
+    response: Response,
+    limit: int = Query(settings.DOCUMENT_LIST_DEFAULT_LIMIT, ge=1, le=settings.DOCUMENT_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="Value of the X-Next-Cursor header of the previous page"),
+    include_fields: bool = Query(True, description="False skips the JSONB fields payload"),
+    type: Optional[str] = None,
+    is_anonymized: Optional[bool] = None,
+    enabled: Optional[bool] = None,
+    document_facade: DocumentFacade = Depends(get_document_facade),
+):
+    page = await document_facade.list(
+        limit,
+        cursor=cursor,
+        include_fields=include_fields,
+        type=type,
+        is_anonymized=is_anonymized,
+        enabled=enabled,
+    )
+    # The body stays a plain list; the cursor for the next page travels in a header
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
+
+@router.get("/export")
+async def export_documents(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    type: Optional[str] = None,
+    is_anonymized: Optional[bool] = None,
+    enabled: Optional[bool] = None,
+):
+    filters = {"type": type, "is_anonymized": is_anonymized, "enabled": enabled}
+
+    # Rows are streamed from a server-side cursor, so memory stays flat regardless of table size
+    async def export_stream():
+        async with document_facade_scope() as document_facade:
+            async for chunk in document_facade.export(format, **filters):
+                yield chunk
+
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="documents.{format}"'}
+    return StreamingResponse(export_stream(), media_type=media_type, headers=headers)
 
 @router.delete("/delete/{id}", response_model=BaseOperacionResponse)
 async def delete_document(id: str, document_facade: DocumentFacade = Depends(get_document_facade)):
@@ -1,18 +1,154 @@
 from functools import lru_cache
+from typing import Callable, Dict
 from app.core.services.analyze_service import AnalyzeService
 from app.core.services.impl.analyze_service_impl import AnalyzeServiceImpl
+from app.integration.extraction_cache import ExtractionCache
 from app.integration.extraction_engine import ExtractionEngine
+from app.integration.impl.cached_extraction_engine import CachedExtractionEngine
+from app.integration.impl.extraction_cache_impl import ExtractionCacheImpl
 from app.integration.impl.extraction_engine_impl import ExtractionEngineImpl
+from app.integration.impl.fake_extraction_engine import FakeExtractionEngine
+from app.integration.impl.gemini_client_pool import GeminiClientPool
+from app.integration.impl.single_flight_extraction_engine import SingleFlightExtractionEngine
+from app.integration.impl.text_layer_extraction_engine import TextLayerExtractionEngine
+from app.integration.rate_scheduler import RateScheduler
+from app.integration.resilience import Resilience, RetryPolicy
+from app.integration.single_flight import SingleFlight
+from app.integration.tenant_limiter import TenantLimiter
+from config.config import settings
+from config.store_config import get_shared_store
+
 
 @lru_cache()
-def get_extraction_engine() -> ExtractionEngine:
-    return ExtractionEngineImpl()
+def get_extraction_cache() -> ExtractionCache:
+    return ExtractionCacheImpl(
+        memory_entries=settings.EXTRACTION_CACHE_MEMORY_ENTRIES,
+        disk_entries=settings.EXTRACTION_CACHE_DISK_ENTRIES,
+        ttl_seconds=settings.EXTRACTION_CACHE_TTL_SECONDS,
+        path=settings.EXTRACTION_CACHE_PATH,
+        store=get_shared_store() if settings.EXTRACTION_CACHE_SHARED else None,
+    )
+
+
+def _per_worker(budget: int) -> int:
+    # Dispatching runs on every slot release and must not wait on a store round-trip, so each
+    # web worker enforces its share of the per-minute budgets (set them per node with several nodes)
+    if budget <= 0:
+        return budget
+    return max(1, budget // max(1, settings.WEB_WORKERS))
 
 
 @lru_cache()
-def get_analyze_service() -> AnalyzeService:
-    engine = get_extraction_engine()
-    return AnalyzeServiceImpl(extraction_engine=engine)
+def get_rate_scheduler() -> RateScheduler:
+    return RateScheduler(
+        max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+        requests_per_minute=_per_worker(settings.LLM_REQUESTS_PER_MINUTE),
+        tokens_per_minute=_per_worker(settings.LLM_TOKENS_PER_MINUTE),
+        max_in_flight_per_owner=settings.TENANT_MAX_IN_FLIGHT,
+        weight_of=lambda owner: settings.TENANT_WEIGHTS.get(owner, 1.0),
+    )
+
+
+@lru_cache()
+def get_tenant_limiter() -> TenantLimiter:
+    return TenantLimiter(
+        store=get_shared_store(),
+        max_concurrent=settings.TENANT_MAX_CONCURRENT_UPLOADS,
+        pages_per_minute=settings.TENANT_PAGES_PER_MINUTE,
+    )
+
+
+@lru_cache()
+def get_resilience() -> Resilience:
+    return Resilience(
+        policy=RetryPolicy(
+            max_attempts=settings.LLM_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.LLM_RETRY_BASE_DELAY_SECONDS,
+            max_delay=settings.LLM_RETRY_MAX_DELAY_SECONDS,
+        ),
+        failure_threshold=settings.LLM_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.LLM_BREAKER_RESET_SECONDS,
+        quota_open_seconds=settings.LLM_BREAKER_QUOTA_OPEN_SECONDS,
+        hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+        hedge_min_delay=settings.LLM_HEDGE_MIN_DELAY_SECONDS,
+    )
+
+
+@lru_cache()
+def get_gemini_client_pool() -> GeminiClientPool:
+    return GeminiClientPool(
+        api_key=settings.LLM_API_KEY,
+        use_stub=settings.LLM_USE_STUB,
+        stub_latency_ms=settings.LLM_STUB_LATENCY_MS,
+        stub_connect_ms=settings.LLM_STUB_CONNECT_MS,
+    )
+
 
+def _gemini_backend() -> ExtractionEngine:
+    engine = ExtractionEngineImpl(
+        scheduler=get_rate_scheduler(),
+        client_pool=get_gemini_client_pool(),
+        resilience=get_resilience(),
+    )
+    if settings.EXTRACTION_CACHE_ENABLED:
+        engine = CachedExtractionEngine(
+            engine,
+            get_extraction_cache(),
+            model_name=settings.LLM_MODEL_NAME,
+            prompt_version=settings.LLM_PROMPT_VERSION,
+        )
+    return engine
 
 
+def _fake_backend() -> ExtractionEngine:
+    return FakeExtractionEngine(
+        scheduler=get_rate_scheduler(),
+        latency_ms=settings.FAKE_ENGINE_LATENCY_MS,
+        per_page_ms=settings.FAKE_ENGINE_PER_PAGE_MS,
+        jitter_ms=settings.FAKE_ENGINE_JITTER_MS,
+        distribution=settings.FAKE_ENGINE_DISTRIBUTION,
+        error_rate=settings.FAKE_ENGINE_ERROR_RATE,
+        seed=settings.FAKE_ENGINE_SEED,
+    )
+
+
+def _text_layer_backend() -> ExtractionEngine:
+    fallback_name = settings.TEXT_LAYER_FALLBACK_BACKEND
+    if fallback_name == "text_layer":
+        raise ValueError("TEXT_LAYER_FALLBACK_BACKEND cannot be 'text_layer'")
+    return TextLayerExtractionEngine(
+        fallback=build_extraction_backend(fallback_name) if fallback_name else None,
+        min_chars=settings.TEXT_LAYER_MIN_CHARS,
+        max_image_coverage=settings.TEXT_LAYER_MAX_IMAGE_COVERAGE,
+    )
+
+
+# Selected with settings.EXTRACTION_BACKEND
+EXTRACTION_BACKENDS: Dict[str, Callable[[], ExtractionEngine]] = {
+    "gemini": _gemini_backend,
+    "fake": _fake_backend,
+    "text_layer": _text_layer_backend,
+}
+
+
+def build_extraction_backend(name: str) -> ExtractionEngine:
+    factory = EXTRACTION_BACKENDS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown extraction backend '{name}', expected one of {sorted(EXTRACTION_BACKENDS)}")
+    return factory()
+
+
+@lru_cache()
+def get_extraction_engine() -> ExtractionEngine:
+    engine = build_extraction_backend(settings.EXTRACTION_BACKEND)
+    if settings.SINGLE_FLIGHT_ENABLED:
+        # Outermost, so identical concurrent calls are merged before they even miss the cache
+        engine = SingleFlightExtractionEngine(engine)
+    return engine
+
+
+@lru_cache()
+def get_analyze_service() -> AnalyzeService:
+    engine = get_extraction_engine()
+    preparations = SingleFlight("prepare") if settings.SINGLE_FLIGHT_ENABLED else None
+    return AnalyzeServiceImpl(extraction_engine=engine, preparations=preparations, tenant_limiter=get_tenant_limiter())
@@ -1,10 +1,12 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.facade.document_facade import DocumentFacade
 from app.core.facade.impl.document_facade_impl import DocumentFacadeImpl
 from app.core.repository.impl.document_repository_impl import DocumentRepositoryImpl
 from app.core.services.impl.document_service_impl import DocumentServiceImpl
-from config.database_config import get_db
+from config.database_config import AsyncSessionLocal, get_db
 
 def get_document_repository(db: AsyncSession = Depends(get_db)):
     return DocumentRepositoryImpl(db)
@@ -14,3 +16,11 @@ def get_document_service(repository = Depends(get_document_repository)):
 
 def get_document_facade(service = Depends(get_document_service)):
     return DocumentFacadeImpl(service)
+
+
+@asynccontextmanager
+async def document_facade_scope() -> AsyncIterator[DocumentFacade]:
+    """Facade bound to its own session, for StreamingResponse bodies: dependencies with
+    yield are closed before the response body is sent, so they can't back a stream."""
+    async with AsyncSessionLocal() as session:
+        yield DocumentFacadeImpl(DocumentServiceImpl(DocumentRepositoryImpl(session)))
@@ -0,0 +1,30 @@
+from functools import lru_cache
+from app.core.dependencies.dependencies_analyze import get_analyze_service
+from app.core.services.extraction_job_service import ExtractionJobService
+from app.core.services.impl.extraction_job_service_impl import ExtractionJobServiceImpl
+from app.core.services.impl.extraction_job_worker import ExtractionJobWorkerPool
+from config.config import settings
+from config.database_config import AsyncSessionLocal
+
+
+@lru_cache()
+def get_extraction_job_service() -> ExtractionJobService:
+    # Opens a short session per operation: jobs outlive any single request
+    return ExtractionJobServiceImpl(
+        AsyncSessionLocal,
+        get_analyze_service(),
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+        flush_interval=settings.JOB_EVENT_FLUSH_SECONDS,
+    )
+
+
+@lru_cache()
+def get_extraction_job_worker_pool() -> ExtractionJobWorkerPool:
+    return ExtractionJobWorkerPool(
+        get_extraction_job_service(),
+        workers=settings.JOB_WORKERS,
+        poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+        max_poll_interval=settings.JOB_MAX_POLL_INTERVAL_SECONDS,
+    )
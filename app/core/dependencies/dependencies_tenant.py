@@ -0,0 +1,24 @@
+from functools import lru_cache
+from typing import Optional
+from fastapi import Depends, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from app.auth.service.auth_service import AuthService
+from core.exceptions import AppBaseException
+
+# Anonymous calls stay allowed; a token, when sent, must be valid
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+
+@lru_cache()
+def get_auth_service() -> AuthService:
+    return AuthService()
+
+
+async def get_current_tenant(request: Request, token: Optional[str] = Depends(optional_oauth2_scheme)) -> str:
+    """Who the per-tenant limits and fair share apply to: the user, or the client IP when anonymous."""
+    if token:
+        user = await get_auth_service().get_current_user_by_token(token)
+        if user is None:
+            raise AppBaseException("Credenciales inválidas", status_code=status.HTTP_401_UNAUTHORIZED)
+        return f"user:{user.email}"
+    return f"anon:{request.client.host if request.client else 'unknown'}"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, TIMESTAMP, func
+from sqlalchemy import JSON, Column, String, Boolean, TIMESTAMP, Index, Uuid, func, true
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base
 import uuid
@@ -6,13 +6,21 @@ from sqlalchemy.dialects.postgresql import JSONB
 
 Base = declarative_base()
 
+# Postgres types, with generic fallbacks so the table also works on SQLite (benchmarks, local runs)
+DOCUMENT_ID_TYPE = UUID(as_uuid=True).with_variant(Uuid(), "sqlite")
+FIELDS_TYPE = JSONB().with_variant(JSON(), "sqlite")
+
 class Document(Base):
     __tablename__ = "document"
+    __table_args__ = (
+        # Supports keyset pagination on (created, document_id), newest first
+        Index("ix_document_created_document_id", "created", "document_id"),
+    )
 
-    document_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    document_id = Column(DOCUMENT_ID_TYPE, primary_key=True, default=uuid.uuid4)
     type = Column(String(255), nullable=True)
-    fields = Column(JSONB, nullable=True)
+    fields = Column(FIELDS_TYPE, nullable=True)
     file_name = Column(String(200), nullable=True)
     is_anonymized = Column(Boolean, nullable=True)
     created = Column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
-    enabled = Column(Boolean, server_default="true", nullable=False)
\ No newline at end of file
+    enabled = Column(Boolean, server_default=true(), nullable=False)
@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, ForeignKey, Index, Integer, LargeBinary, String, Text, TIMESTAMP, Uuid
+from app.core.domain.document import Base
+
+# Portable column types (no JSONB / postgresql.UUID): the job queue also runs on SQLite
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ExtractionJob(Base):
+    __tablename__ = "extraction_job"
+    __table_args__ = (
+        # Workers look for the oldest claimable job
+        Index("ix_extraction_job_status_created", "status", "created"),
+    )
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    TERMINAL = (DONE, FAILED)
+
+    job_id = Column(Uuid, primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, default=QUEUED)
+    file_count = Column(Integer, nullable=False, default=0)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String(100), nullable=True)
+    # Who submitted it: its page quota and fair share apply when the job runs
+    tenant = Column(String(255), nullable=True)
+    # A running job whose lease expired belongs to a dead worker and is claimed again
+    lease_until = Column(TIMESTAMP(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    created = Column(TIMESTAMP(timezone=True), default=utcnow, nullable=False)
+    started = Column(TIMESTAMP(timezone=True), nullable=True)
+    finished = Column(TIMESTAMP(timezone=True), nullable=True)
+
+
+class ExtractionJobFile(Base):
+    __tablename__ = "extraction_job_file"
+
+    job_id = Column(Uuid, ForeignKey("extraction_job.job_id", ondelete="CASCADE"), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    file_name = Column(String(200), nullable=True)
+    content = Column(LargeBinary, nullable=False)
+
+
+class ExtractionJobEvent(Base):
+    __tablename__ = "extraction_job_event"
+
+    job_id = Column(Uuid, ForeignKey("extraction_job.job_id", ondelete="CASCADE"), primary_key=True)
+    seq = Column(Integer, primary_key=True)
+    # JSON body of the SSE event, exactly as /analyze/upload would have sent it
+    data = Column(Text, nullable=False)
+    created = Column(TIMESTAMP(timezone=True), default=utcnow, nullable=False)
+
+
+class ExtractionJobCheckpoint(Base):
+    __tablename__ = "extraction_job_checkpoint"
+
+    job_id = Column(Uuid, ForeignKey("extraction_job.job_id", ondelete="CASCADE"), primary_key=True)
+    # "<file position>:<first page>:<page count>" of the extraction unit (whole file or shard)
+    unit_key = Column(String(100), primary_key=True)
+    # JSON list of page results, with document_index relative to the unit's first page
+    results = Column(Text, nullable=False)
+    created = Column(TIMESTAMP(timezone=True), default=utcnow, nullable=False)
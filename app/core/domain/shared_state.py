@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Float, Index, Integer, String, Text
+from app.core.domain.document import Base
+
+
+class SharedState(Base):
+    """Rows of the database SharedStore: one JSON value per key, shared by every worker process."""
+
+    __tablename__ = "shared_state"
+    __table_args__ = (
+        Index("ix_shared_state_expires", "expires"),
+    )
+
+    key = Column(String(255), primary_key=True)
+    value = Column(Text, nullable=False)
+    # Bumped on every write; updates are compare-and-swap on it
+    version = Column(Integer, nullable=False, default=0)
+    # Unix time (shared clock across processes), NULL = never expires
+    expires = Column(Float, nullable=True)
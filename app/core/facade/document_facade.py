@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import List
-from dto.document import DocumentRequest
+from typing import AsyncIterator, List, Optional
+from dto.document import DocumentPage, DocumentRequest
 from dto.universal_dto import BaseOperacionResponse
 
 
@@ -11,7 +11,19 @@ class DocumentFacade(ABC):
         pass
 
     @abstractmethod
-    async def list(self) -> List[dict]:
+    async def list(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_fields: bool = True,
+        type: Optional[str] = None,
+        is_anonymized: Optional[bool] = None,
+        enabled: Optional[bool] = None,
+    ) -> DocumentPage:
+        pass
+
+    @abstractmethod
+    def export(self, format: str, **filters) -> AsyncIterator[str]:
         pass
 
     @abstractmethod
@@ -1,38 +1,124 @@
-from typing import List
+import base64
+import csv
+import io
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
 from app.core.facade.document_facade import DocumentFacade
 from app.core.services.document_service import DocumentService
-from dto.document import DocumentRequest
+from core.exceptions import AppBaseException
+from dto.document import DocumentPage, DocumentRequest
 from dto.universal_dto import BaseOperacionResponse
+from utl.json_util import JsonUtil
 
 
 class DocumentFacadeImpl(DocumentFacade):
 
+    CSV_COLUMNS = ["id", "fileName", "detectedType", "created", "isEncrypted"]
+    CSV_CHUNK_SIZE = 64 * 1024
+
     def __init__(self, document_service: DocumentService):
         self.document_service = document_service
 
     async def save(self, t: List[DocumentRequest]) -> BaseOperacionResponse:
         try:
-            for tt in t:
-                await self.document_service.save(tt)
+            # One transaction for the whole batch: all documents are saved or none is
+            await self.document_service.save_all(t)
             return BaseOperacionResponse(codigo="200", mensaje="Documentos guardados correctamente")
         except Exception as e:
             print(f"DEBUG: Error in facade save: {e}")
             return BaseOperacionResponse(codigo="500", mensaje=f"Error al guardar documentos: {e}")
 
-    async def list(self) -> List[dict]:
-        docs = await self.document_service.find_all()
+    async def list(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        include_fields: bool = True,
+        type: Optional[str] = None,
+        is_anonymized: Optional[bool] = None,
+        enabled: Optional[bool] = None,
+    ) -> DocumentPage:
+        # One extra row tells whether there is a next page without a COUNT query
+        docs = await self.document_service.find_page(
+            limit + 1,
+            after=self._decode_cursor(cursor) if cursor else None,
+            include_fields=include_fields,
+            type=type,
+            is_anonymized=is_anonymized,
+            enabled=enabled,
+        )
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = self._encode_cursor(docs[-1].created, docs[-1].document_id)
+
+        items = [self._to_item(doc, include_fields) for doc in docs]
+        return DocumentPage(items=items, next_cursor=next_cursor)
+
+    async def export(self, format: str, **filters) -> AsyncIterator[str]:
+        if format == "csv":
+            async for chunk in self._export_csv(**filters):
+                yield chunk
+            return
+        async for doc in self.document_service.stream_all(**filters):
+            yield JsonUtil.dumps(self._to_item(doc, True), default=str) + "\n"
+
+    async def _export_csv(self, **filters) -> AsyncIterator[str]:
+        # One column per field label; the label set is computed by the database up front
+        labels = await self.document_service.find_field_labels(**filters)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.CSV_COLUMNS + labels)
+
+        async for doc in self.document_service.stream_all(**filters):
+            item = self._to_item(doc, False)
+            values = self._field_values(doc.fields)
+            writer.writerow([item[column] for column in self.CSV_COLUMNS] + [values.get(label, "") for label in labels])
+            if buffer.tell() >= self.CSV_CHUNK_SIZE:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    def _field_values(self, fields: Any) -> dict:
+        if isinstance(fields, dict):
+            pairs = fields.items()
+        elif isinstance(fields, list):
+            pairs = [(f.get("label"), f.get("value")) for f in fields if isinstance(f, dict)]
+        else:
+            pairs = []
+        values = {}
+        for label, value in pairs:
+            if value is None:
+                value = ""
+            elif isinstance(value, (dict, list)):
+                value = JsonUtil.dumps(value)
+            values[label] = value
+        return values
+
+    def _to_item(self, doc, include_fields: bool) -> dict:
         # Transform entity to dictionary/DTO
-        return [
-            {
-                "id": str(doc.document_id),
-                "fileName": doc.file_name,
-                "detectedType": doc.type,
-                "fields": doc.fields,
-                "created": doc.created.strftime("%Y-%m-%d %H:%M:%S") if doc.created else None,
-                "isEncrypted": doc.is_anonymized # Assuming using same flag
-            }
-            for doc in docs
-        ]
+        item = {
+            "id": str(doc.document_id),
+            "fileName": doc.file_name,
+            "detectedType": doc.type,
+            "created": doc.created.strftime("%Y-%m-%d %H:%M:%S") if doc.created else None,
+            "isEncrypted": doc.is_anonymized # Assuming using same flag
+        }
+        if include_fields:
+            item["fields"] = doc.fields
+        return item
+
+    def _encode_cursor(self, created: datetime, document_id: uuid.UUID) -> str:
+        raw = f"{created.isoformat()}|{document_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def _decode_cursor(self, cursor: str) -> tuple[datetime, uuid.UUID]:
+        try:
+            created, document_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+            return datetime.fromisoformat(created), uuid.UUID(document_id)
+        except ValueError:
+            raise AppBaseException("Cursor de paginación inválido", status_code=400)
 
     async def delete(self, id: str) -> BaseOperacionResponse:
         try:
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
 from app.core.domain.document import Document
 
 
@@ -8,10 +11,34 @@ class DocumentRepository(ABC):
     async def save(self, doc: Document) -> Document:
         pass
 
+    @abstractmethod
+    async def save_all(self, docs: list[Document]) -> list:
+        pass
+
     @abstractmethod
     async def find_all(self) -> list[Document]:
         pass
 
+    @abstractmethod
+    async def find_page(
+        self,
+        limit: int,
+        after: Optional[tuple[datetime, UUID]] = None,
+        include_fields: bool = True,
+        type: Optional[str] = None,
+        is_anonymized: Optional[bool] = None,
+        enabled: Optional[bool] = None,
+    ) -> list:
+        pass
+
+    @abstractmethod
+    def stream_all(self, batch_size: int = 500, **filters) -> AsyncIterator:
+        pass
+
+    @abstractmethod
+    async def find_field_labels(self, **filters) -> list[str]:
+        pass
+
     @abstractmethod
     async def find_by_id(self, id) -> Document | None:
         pass
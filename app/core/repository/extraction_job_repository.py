@@ -0,0 +1,72 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from app.core.domain.extraction_job import ExtractionJob
+
+
+class ExtractionJobRepository(ABC):
+
+    @abstractmethod
+    async def create(self, files: list[tuple[str, bytes]], tenant: Optional[str] = None) -> ExtractionJob:
+        pass
+
+    @abstractmethod
+    async def find_by_id(self, job_id: UUID) -> Optional[ExtractionJob]:
+        pass
+
+    @abstractmethod
+    async def find_files(self, job_id: UUID) -> list[tuple[str, bytes]]:
+        pass
+
+    @abstractmethod
+    async def has_files(self, job_id: UUID) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete_files(self, job_id: UUID) -> None:
+        pass
+
+    @abstractmethod
+    async def claim_next(self, worker_id: str, lease_until: datetime, max_attempts: int) -> Optional[ExtractionJob]:
+        pass
+
+    @abstractmethod
+    async def renew_lease(self, job_id: UUID, worker_id: str, lease_until: datetime) -> bool:
+        pass
+
+    @abstractmethod
+    async def release(self, job_id: UUID, worker_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def finish(self, job_id: UUID, worker_id: str, status: str, error: Optional[str] = None) -> bool:
+        pass
+
+    @abstractmethod
+    async def add_events(self, job_id: UUID, first_seq: int, events: list[str]) -> None:
+        pass
+
+    @abstractmethod
+    async def find_events(self, job_id: UUID, after_seq: int = -1, limit: Optional[int] = None) -> list[tuple[int, str]]:
+        pass
+
+    @abstractmethod
+    async def reset_events(self, job_id: UUID) -> int:
+        pass
+
+    @abstractmethod
+    async def requeue(self, job_id: UUID) -> bool:
+        pass
+
+    @abstractmethod
+    async def find_checkpoints(self, job_id: UUID) -> dict[str, list[dict]]:
+        pass
+
+    @abstractmethod
+    async def save_checkpoint(self, job_id: UUID, unit_key: str, results: list[dict]) -> None:
+        pass
+
+    @abstractmethod
+    async def delete_checkpoints(self, job_id: UUID) -> None:
+        pass
@@ -1,11 +1,26 @@
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Optional
+from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.domain.document import Document
 from app.core.repository.document_repository import DocumentRepository
-from sqlalchemy import select
+from config.metrics_config import STAGE_SECONDS
+from sqlalchemy import func, insert, select, tuple_, union
 
 
 class DocumentRepositoryImpl(DocumentRepository):
 
+    # Everything but the (potentially large) JSONB fields column
+    LIST_COLUMNS = (
+        Document.document_id,
+        Document.type,
+        Document.file_name,
+        Document.is_anonymized,
+        Document.created,
+        Document.enabled,
+    )
+
     def __init__(self, db: AsyncSession):
         self.db = db
 
@@ -23,10 +38,108 @@ class DocumentRepositoryImpl(DocumentRepository):
             print(f"DEBUG: Error in repository save: {e}")
             raise e
 
+    async def save_all(self, docs: list[Document]) -> list:
+        """Inserts every document in one transaction with a multi-row INSERT ... RETURNING.
+        Either all rows are stored or none is. Returns the generated ids in input order."""
+        if not docs:
+            return []
+        rows = [
+            {
+                "document_id": doc.document_id or uuid.uuid4(),
+                "type": doc.type,
+                "fields": doc.fields,
+                "file_name": doc.file_name,
+                "is_anonymized": doc.is_anonymized,
+            }
+            for doc in docs
+        ]
+        try:
+            with STAGE_SECONDS.time(stage="db_save"):
+                result = await self.db.execute(
+                    insert(Document).returning(Document.document_id, sort_by_parameter_order=True),
+                    rows
+                )
+                ids = result.scalars().all()
+                await self.db.commit()
+            return ids
+        except Exception:
+            await self.db.rollback()
+            raise
+
     async def find_all(self) -> list[Document]:
         result = await self.db.execute(select(Document).order_by(Document.created.desc()))
         return result.scalars().all()
 
+    async def find_page(
+        self,
+        limit: int,
+        after: Optional[tuple[datetime, UUID]] = None,
+        include_fields: bool = True,
+        type: Optional[str] = None,
+        is_anonymized: Optional[bool] = None,
+        enabled: Optional[bool] = None,
+    ) -> list:
+        """
+        Keyset pagination, newest first: returns up to `limit` rows strictly after the
+        (created, document_id) cursor. Rows expose the same attributes as Document;
+        `fields` is only loaded when `include_fields` is set.
+        """
+        columns = list(self.LIST_COLUMNS)
+        if include_fields:
+            columns.append(Document.fields)
+
+        stmt = select(*columns)
+        if after is not None:
+            stmt = stmt.where(tuple_(Document.created, Document.document_id) < tuple_(*after))
+        stmt = self._filter(stmt, type=type, is_anonymized=is_anonymized, enabled=enabled)
+        stmt = stmt.order_by(Document.created.desc(), Document.document_id.desc()).limit(limit)
+
+        result = await self.db.execute(stmt)
+        return result.all()
+
+    async def stream_all(self, batch_size: int = 500, **filters) -> AsyncIterator:
+        """Streams every matching row through a server-side cursor, `batch_size` rows at a time."""
+        stmt = self._filter(select(*self.LIST_COLUMNS, Document.fields), **filters)
+        stmt = stmt.order_by(Document.created.desc(), Document.document_id.desc()).execution_options(yield_per=batch_size)
+        result = await self.db.stream(stmt)
+        async for row in result:
+            yield row
+
+    async def find_field_labels(self, **filters) -> list[str]:
+        """Distinct field labels across the matching documents, computed in the database on
+        Postgres (jsonb functions) and from the streamed rows elsewhere (SQLite)."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return await self._collect_field_labels(**filters)
+        # fields is normally a list of {"label", "value"}; older rows store a plain object
+        element = func.jsonb_array_elements(Document.fields).column_valued("element")
+        from_list = select(element.op("->>")("label").label("label")).select_from(Document).where(func.jsonb_typeof(Document.fields) == "array")
+        key = func.jsonb_object_keys(Document.fields).column_valued("key")
+        from_object = select(key.label("label")).select_from(Document).where(func.jsonb_typeof(Document.fields) == "object")
+
+        labels = union(self._filter(from_list, **filters), self._filter(from_object, **filters)).subquery()
+        result = await self.db.execute(select(labels.c.label).where(labels.c.label.is_not(None)).order_by(labels.c.label))
+        return list(result.scalars().all())
+
+    async def _collect_field_labels(self, batch_size: int = 500, **filters) -> list[str]:
+        stmt = self._filter(select(Document.fields), **filters).execution_options(yield_per=batch_size)
+        labels = set()
+        async for fields in await self.db.stream_scalars(stmt):
+            if isinstance(fields, list):
+                labels.update(f.get("label") for f in fields if isinstance(f, dict))
+            elif isinstance(fields, dict):
+                labels.update(fields)
+        # Same as ->> on Postgres: labels come back as text, missing ones are left out
+        return sorted({str(label) for label in labels if label is not None})
+
+    def _filter(self, stmt, type: Optional[str] = None, is_anonymized: Optional[bool] = None, enabled: Optional[bool] = None):
+        if type is not None:
+            stmt = stmt.where(Document.type == type)
+        if is_anonymized is not None:
+            stmt = stmt.where(Document.is_anonymized == is_anonymized)
+        if enabled is not None:
+            stmt = stmt.where(Document.enabled == enabled)
+        return stmt
+
     async def find_by_id(self, id):
         result = await self.db.execute(
             select(Document).where(Document.document_id == id)
@@ -0,0 +1,195 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import and_, delete, exists, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.domain.extraction_job import ExtractionJob, ExtractionJobCheckpoint, ExtractionJobEvent, ExtractionJobFile, utcnow
+from app.core.repository.extraction_job_repository import ExtractionJobRepository
+from utl.json_util import JsonUtil
+
+
+class ExtractionJobRepositoryImpl(ExtractionJobRepository):
+
+    # Candidates fetched per claim attempt; losing the race on all of them just means "try later"
+    CLAIM_CANDIDATES = 5
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, files: list[tuple[str, bytes]], tenant: Optional[str] = None) -> ExtractionJob:
+        job = ExtractionJob(status=ExtractionJob.QUEUED, file_count=len(files), tenant=tenant)
+        try:
+            self.db.add(job)
+            await self.db.flush()
+            if files:
+                await self.db.execute(insert(ExtractionJobFile), [
+                    {"job_id": job.job_id, "position": i, "file_name": name, "content": content}
+                    for i, (name, content) in enumerate(files)
+                ])
+            await self.db.commit()
+            return job
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def find_by_id(self, job_id: UUID) -> Optional[ExtractionJob]:
+        return await self.db.get(ExtractionJob, job_id, populate_existing=True)
+
+    async def find_files(self, job_id: UUID) -> list[tuple[str, bytes]]:
+        result = await self.db.execute(
+            select(ExtractionJobFile.file_name, ExtractionJobFile.content)
+            .where(ExtractionJobFile.job_id == job_id)
+            .order_by(ExtractionJobFile.position)
+        )
+        return [(name, content) for name, content in result.all()]
+
+    async def has_files(self, job_id: UUID) -> bool:
+        # EXISTS instead of find_files: the blobs themselves are never read
+        return bool(await self.db.scalar(select(exists().where(ExtractionJobFile.job_id == job_id))))
+
+    async def delete_files(self, job_id: UUID) -> None:
+        await self.db.execute(delete(ExtractionJobFile).where(ExtractionJobFile.job_id == job_id))
+        await self.db.commit()
+
+    async def claim_next(self, worker_id: str, lease_until: datetime, max_attempts: int) -> Optional[ExtractionJob]:
+        """
+        Takes the oldest queued job, or a running one whose worker stopped renewing its lease.
+        The claim is a conditional UPDATE, so two workers (or processes) never get the same
+        job even on databases without SKIP LOCKED. Jobs that already used `max_attempts`
+        are marked failed instead of being handed out again.
+        """
+        now = utcnow()
+        claimable = or_(
+            ExtractionJob.status == ExtractionJob.QUEUED,
+            and_(ExtractionJob.status == ExtractionJob.RUNNING, ExtractionJob.lease_until < now),
+        )
+        result = await self.db.execute(
+            select(ExtractionJob.job_id, ExtractionJob.attempts)
+            .where(claimable)
+            .order_by(ExtractionJob.created)
+            .limit(self.CLAIM_CANDIDATES)
+            .with_for_update(skip_locked=True)
+        )
+        candidates = result.all()
+
+        for job_id, attempts in candidates:
+            if attempts >= max_attempts:
+                await self.db.execute(
+                    update(ExtractionJob)
+                    .where(ExtractionJob.job_id == job_id, claimable)
+                    .values(status=ExtractionJob.FAILED, finished=now, lease_until=None, error="Se agotaron los reintentos del trabajo")
+                )
+                continue
+
+            claimed = await self.db.execute(
+                update(ExtractionJob)
+                .where(ExtractionJob.job_id == job_id, ExtractionJob.attempts == attempts, claimable)
+                .values(
+                    status=ExtractionJob.RUNNING,
+                    attempts=attempts + 1,
+                    worker_id=worker_id,
+                    lease_until=lease_until,
+                    started=func.coalesce(ExtractionJob.started, now),
+                )
+            )
+            if claimed.rowcount == 1:
+                await self.db.commit()
+                return await self.find_by_id(job_id)
+
+        await self.db.commit()
+        return None
+
+    async def renew_lease(self, job_id: UUID, worker_id: str, lease_until: datetime) -> bool:
+        result = await self.db.execute(
+            update(ExtractionJob)
+            .where(ExtractionJob.job_id == job_id, ExtractionJob.worker_id == worker_id, ExtractionJob.status == ExtractionJob.RUNNING)
+            .values(lease_until=lease_until)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def release(self, job_id: UUID, worker_id: str) -> bool:
+        """Hands a job back to the queue without counting the interrupted attempt (graceful shutdown)."""
+        result = await self.db.execute(
+            update(ExtractionJob)
+            .where(ExtractionJob.job_id == job_id, ExtractionJob.worker_id == worker_id, ExtractionJob.status == ExtractionJob.RUNNING)
+            .values(status=ExtractionJob.QUEUED, attempts=ExtractionJob.attempts - 1, worker_id=None, lease_until=None)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def finish(self, job_id: UUID, worker_id: str, status: str, error: Optional[str] = None) -> bool:
+        # Guarded by worker_id: a worker that lost its lease must not overwrite the new owner's outcome
+        result = await self.db.execute(
+            update(ExtractionJob)
+            .where(ExtractionJob.job_id == job_id, ExtractionJob.worker_id == worker_id, ExtractionJob.status == ExtractionJob.RUNNING)
+            .values(status=status, error=error, finished=utcnow(), lease_until=None)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def add_events(self, job_id: UUID, first_seq: int, events: list[str]) -> None:
+        if not events:
+            return
+        now = utcnow()
+        await self.db.execute(insert(ExtractionJobEvent), [
+            {"job_id": job_id, "seq": first_seq + i, "data": data, "created": now}
+            for i, data in enumerate(events)
+        ])
+        await self.db.commit()
+
+    async def find_events(self, job_id: UUID, after_seq: int = -1, limit: Optional[int] = None) -> list[tuple[int, str]]:
+        stmt = (
+            select(ExtractionJobEvent.seq, ExtractionJobEvent.data)
+            .where(ExtractionJobEvent.job_id == job_id, ExtractionJobEvent.seq > after_seq)
+            .order_by(ExtractionJobEvent.seq)
+        )
+        if limit:
+            stmt = stmt.limit(limit)
+        result = await self.db.execute(stmt)
+        return [(seq, data) for seq, data in result.all()]
+
+    async def reset_events(self, job_id: UUID) -> int:
+        """Drops the events of a previous attempt. Returns the next seq, which keeps growing
+        so clients that are tailing the job never see a number twice."""
+        last = await self.db.scalar(select(func.max(ExtractionJobEvent.seq)).where(ExtractionJobEvent.job_id == job_id))
+        await self.db.execute(delete(ExtractionJobEvent).where(ExtractionJobEvent.job_id == job_id))
+        await self.db.commit()
+        return 0 if last is None else last + 1
+
+    async def requeue(self, job_id: UUID) -> bool:
+        """Puts a finished job back in the queue with a fresh attempt budget."""
+        result = await self.db.execute(
+            update(ExtractionJob)
+            .where(ExtractionJob.job_id == job_id, ExtractionJob.status.in_(ExtractionJob.TERMINAL))
+            .values(status=ExtractionJob.QUEUED, attempts=0, worker_id=None, lease_until=None, error=None, finished=None)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def find_checkpoints(self, job_id: UUID) -> dict[str, list[dict]]:
+        result = await self.db.execute(
+            select(ExtractionJobCheckpoint.unit_key, ExtractionJobCheckpoint.results)
+            .where(ExtractionJobCheckpoint.job_id == job_id)
+        )
+        return {unit_key: JsonUtil.loads(results) for unit_key, results in result.all()}
+
+    async def save_checkpoint(self, job_id: UUID, unit_key: str, results: list[dict]) -> None:
+        # Delete + insert instead of a dialect-specific upsert
+        try:
+            await self.db.execute(
+                delete(ExtractionJobCheckpoint)
+                .where(ExtractionJobCheckpoint.job_id == job_id, ExtractionJobCheckpoint.unit_key == unit_key)
+            )
+            await self.db.execute(insert(ExtractionJobCheckpoint).values(
+                job_id=job_id, unit_key=unit_key, results=JsonUtil.dumps(results), created=utcnow()
+            ))
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+    async def delete_checkpoints(self, job_id: UUID) -> None:
+        await self.db.execute(delete(ExtractionJobCheckpoint).where(ExtractionJobCheckpoint.job_id == job_id))
+        await self.db.commit()
+
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from typing import Any, AsyncIterable, Dict, List, Optional, Union
 from fastapi import UploadFile
+from app.core.services.extraction_checkpoint import ExtractionCheckpoint
 
 class AnalyzeService(ABC):
 
@@ -9,5 +10,12 @@ class AnalyzeService(ABC):
         pass
 
     @abstractmethod
-    async def upload_stream(self, files_data: List[Dict[str, Any]]):
+    async def upload_stream(
+        self,
+        files_data: Union[List[Dict[str, Any]], AsyncIterable[UploadFile]],
+        incremental: bool = False,
+        checkpoint: Optional[ExtractionCheckpoint] = None,
+        tenant: Optional[str] = None,
+        wait_for_quota: bool = False,
+    ):
         pass
\ No newline at end of file
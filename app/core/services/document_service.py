@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import List
 
 from dto.document import DocumentRequest
 from dto.universal_dto import BaseOperacionResponse
@@ -10,10 +11,26 @@ class DocumentService(ABC):
     async def save(self, request: DocumentRequest):
         pass
 
+    @abstractmethod
+    async def save_all(self, requests: List[DocumentRequest]):
+        pass
+
     @abstractmethod
     async def find_all(self):
         pass
 
+    @abstractmethod
+    async def find_page(self, limit: int, after=None, include_fields: bool = True, **filters):
+        pass
+
+    @abstractmethod
+    def stream_all(self, **filters):
+        pass
+
+    @abstractmethod
+    async def find_field_labels(self, **filters):
+        pass
+
     @abstractmethod
     async def delete(self, id: str):
         pass
@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+
+class ExtractionCheckpoint(ABC):
+    """Extracted pages of each unit of one batch, so a retry only re-runs the pages that failed."""
+
+    @abstractmethod
+    async def get(self, unit_key: str) -> Optional[List[dict]]:
+        pass
+
+    @abstractmethod
+    async def put(self, unit_key: str, results: List[dict]) -> None:
+        pass
@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List, Optional, Tuple
+from uuid import UUID
+from dto.extraction_job import ExtractionJobResponse
+
+
+class ExtractionJobService(ABC):
+
+    @abstractmethod
+    async def submit(self, files: List[Tuple[str, bytes]], tenant: Optional[str] = None) -> ExtractionJobResponse:
+        pass
+
+    @abstractmethod
+    async def retry(self, job_id: UUID) -> ExtractionJobResponse:
+        pass
+
+    @abstractmethod
+    async def get(self, job_id: UUID) -> ExtractionJobResponse:
+        pass
+
+    @abstractmethod
+    def events(self, job_id: UUID, after_seq: int = -1) -> AsyncIterator[str]:
+        pass
+
+    @abstractmethod
+    async def run_next(self, worker_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def wait_for_submission(self, timeout: float) -> None:
+        pass
@@ -1,21 +1,39 @@
 import base64
-import json
 import asyncio
-from io import BytesIO
-import fitz
-from typing import Any, Dict, List
+import math
+import time
+import uuid
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from fastapi import UploadFile
+from starlette.requests import ClientDisconnect
 
 from app.core.services.analyze_service import AnalyzeService
+from app.core.services.extraction_checkpoint import ExtractionCheckpoint
 from app.integration.extraction_engine import ExtractionEngine
-from core.exceptions import AppBaseException
-from utl.file_util import FileUtil
+from app.integration.rate_scheduler import current_owner
+from app.integration.single_flight import SingleFlight
+from app.integration.tenant_limiter import TenantLimiter
+from config.config import settings
+from config.executor_config import run_cpu
+from config.metrics_config import ERRORS_TOTAL, PAGES_TOTAL, STAGE_SECONDS
+from core.exceptions import AppBaseException, TooManyRequestsException
+from utl.file_util import FileDescriptor, FileUtil
+from utl.json_util import JsonUtil
+from utl.pdf_text_util import PdfTextUtil
 
 
 class AnalyzeServiceImpl(AnalyzeService):
 
-    def __init__(self, extraction_engine: ExtractionEngine):
+    def __init__(
+        self,
+        extraction_engine: ExtractionEngine,
+        preparations: Optional[SingleFlight] = None,
+        tenant_limiter: Optional[TenantLimiter] = None,
+    ):
         self.extraction_engine = extraction_engine
+        # Shares the CPU-bound preparation between concurrent uploads of the same bytes
+        self.preparations = preparations
+        self.tenant_limiter = tenant_limiter
 
     async def upload(self, t: List[UploadFile]) -> List[Dict[str, Any]]:
         # This synchronous-looking method (returning full list) can also benefit from optimization
@@ -39,127 +57,523 @@ class AnalyzeServiceImpl(AnalyzeService):
                  pass 
         return results
 
-    async def upload_stream(self, files_data: List[Dict[str, Any]]):
+    async def upload_stream(
+        self,
+        files_data: Union[List[Dict[str, Any]], AsyncIterable[UploadFile]],
+        incremental: bool = False,
+        checkpoint: Optional[ExtractionCheckpoint] = None,
+        tenant: Optional[str] = None,
+        wait_for_quota: bool = False,
+    ):
+        """
+        Streams SSE events for the uploaded files. By default the extracted pages are sent
+        together in a final `response` event; with `incremental=True` every page is sent as
+        its own `document` event as soon as its file completes, followed by a `summary` event.
+        With a `checkpoint`, pages of units (files or shards) that already succeeded in a
+        previous run of the same batch are reused and only the failed pages are extracted again.
+        With a `tenant`, its pages-per-minute quota is charged file by file before preparation
+        and its model calls share the tenant's fair share in the scheduler. A file over quota is
+        skipped, or with `wait_for_quota` (background jobs, nobody to retry them) held until
+        the budget refills.
+        """
         all_docs_tasks = []
-        total_files = len(files_data)
-        
-        # 1. Prepare all documents and calculate global indices
-        current_global_page_index = 1
-        for idx, file_data in enumerate(files_data):
-            filename = file_data.get("filename")
-            content = file_data.get("content")
-            
-            yield self._build_sse_event({"thinking": f"Preparando archivo {idx + 1}/{total_files}: {filename}...\n"})
-            
-            doc_prep = self.prepare_document_for_llm(content, filename)
-            
-            if not doc_prep:
-                 yield self._build_sse_event({"thinking": f"[WARN] Archivo {filename} no soportado o vacío\n"})
-                 continue
+        total_files = len(files_data) if isinstance(files_data, list) else None
+        # LLM calls are queued under the tenant (or, when unknown, the batch) so the scheduler can interleave them fairly
+        owner = tenant or uuid.uuid4().hex
 
-            page_count = doc_prep["page_count"]
-            start_index = current_global_page_index
-            
-            # Schedule task for the entire document, passing page info
-            task = self.extraction_engine.extract_single_document(
-                doc_prep["base64"], 
-                doc_prep["mime_type"], 
-                page_count,
-                start_index
-            )
-            all_docs_tasks.append((task, filename, page_count))
-            
-            # Increment global index for next file
-            current_global_page_index += page_count
+        try:
+            # 1. Prepare documents as they arrive and start extracting them right away,
+            # so the LLM works on the first file while the rest is still uploading
+            current_global_page_index = 1
+            idx = 0
+            try:
+                async for filename, content in self._iter_files(files_data):
+                    idx += 1
+                    progress = f"{idx}/{total_files}" if total_files else f"{idx}"
+                    yield self._build_sse_event({"thinking": f"Preparando archivo {progress}: {filename}...\n"})
 
-        if not all_docs_tasks:
-             yield self._build_sse_event({"thinking": "[ERROR] No se encontraron documentos válidos.\n"})
-             return
+                    try:
+                        descriptor, doc_prep = await self._prepare(content, filename, tenant, wait_for_quota)
+                    except TooManyRequestsException as e:
+                        yield self._build_sse_event({"thinking": f"[WARN] Archivo {filename} omitido: {e.message}\n"})
+                        continue
+                    finally:
+                        del content
 
-        total_files_to_process = len(all_docs_tasks)
-        yield self._build_sse_event({"thinking": f"Analizando {total_files_to_process} archivos en paralelo...\n"})
+                    if descriptor.needs_password:
+                        ERRORS_TOTAL.inc(type="password_protected")
+                        yield self._build_sse_event({"thinking": f"[WARN] Archivo {filename} está protegido con contraseña\n"})
+                        continue
 
-        # 2. Run in parallel
-        try:
-            completed_files_count = 0
-            documents = []
-
-            # Extract futures and map them back to metadata
-            futures = [t[0] for t in all_docs_tasks]
-            metadata_map = {hash(f): (t[1], t[2]) for f, t in zip(futures, all_docs_tasks)}
-
-            for future in asyncio.as_completed(futures):
-                results = await future # This is now a LIST of page dicts
-                completed_files_count += 1
-                
-                fname, p_count = metadata_map.get(hash(future), ("Documento", 1))
-                yield self._build_sse_event({"thinking": f"Archivo '{fname}' ({p_count} pág) completado ({completed_files_count}/{total_files_to_process})\n"})
-                
-                # Check for errors in the first result of the list if it's a list with error
-                if isinstance(results, list) and len(results) > 0 and results[0].get("error"):
-                    yield self._build_sse_event({"thinking": f"[ERROR] {fname}: {results[0].get('error')}\n"})
-                else:
-                    # results is a list of page objects
+                    if not doc_prep:
+                         ERRORS_TOTAL.inc(type="unsupported_file")
+                         yield self._build_sse_event({"thinking": f"[WARN] Archivo {filename} no soportado o vacío\n"})
+                         continue
+
+                    page_count = doc_prep["page_count"]
+                    start_index = current_global_page_index
+
+                    if doc_prep.get("text_pages"):
+                        yield self._build_sse_event({"thinking": f"{filename}: {doc_prep['text_pages']}/{page_count} páginas con capa de texto\n"})
+
+                    # Schedule task for the entire document, passing page info.
+                    # The task copies the current context, so it carries the batch owner
+                    owner_token = current_owner.set(owner)
+                    task = asyncio.ensure_future(self._run_extraction(
+                        self._extract_document(doc_prep, start_index, checkpoint, file_key=str(idx)),
+                        filename,
+                        page_count
+                    ))
+                    current_owner.reset(owner_token)
+                    all_docs_tasks.append(task)
+
+                    # Increment global index for next file
+                    current_global_page_index += page_count
+            except AppBaseException as e:
+                yield self._build_sse_event({"error": e.message})
+                return
+            except ClientDisconnect:
+                return
+
+            if not all_docs_tasks:
+                 yield self._build_sse_event({"thinking": "[ERROR] No se encontraron documentos válidos.\n"})
+                 return
+
+            total_files_to_process = len(all_docs_tasks)
+            yield self._build_sse_event({"thinking": f"Analizando {total_files_to_process} archivos en paralelo...\n"})
+
+            # 2. Run in parallel
+            try:
+                completed_files_count = 0
+                documents = []
+                emitted_count = 0
+                error_count = 0
+
+                for future in asyncio.as_completed(all_docs_tasks):
+                    fname, p_count, results = await future # results is a LIST of page dicts
+                    completed_files_count += 1
+
+                    yield self._build_sse_event({"thinking": f"Archivo '{fname}' ({p_count} pág) completado ({completed_files_count}/{total_files_to_process})\n"})
+
+                    # results is a list of page objects; failed documents/shards come back as error entries
                     for page_result in results:
+                        if page_result.get("error"):
+                            error_count += 1
+                            PAGES_TOTAL.inc(page_result.get("page_count") or 1, outcome="error")
+                            yield self._build_sse_event({"thinking": f"[ERROR] {fname}{self._describe_pages(page_result)}: {page_result.get('error')}\n"})
+                            continue
                         doc_obj = {
                             "document_index": page_result.get("document_index"),
                             "document_name": page_result.get("document_name") or f"{fname} - Pág {page_result.get('document_index')}",
                             "fields": page_result.get("fields", {})
                         }
-                        documents.append(doc_obj)
-                        # Optional: yield individual page completion if desired
-                        # yield self._build_sse_event({"thinking": f"Pagina {doc_obj['document_index']} extraída.\n"})
+                        PAGES_TOTAL.inc(outcome="ok")
+                        if incremental:
+                            # document_index is the page's position in the upload (numbered locally, not taken
+                            # from the model), so clients can slot pages in order as they arrive
+                            emitted_count += 1
+                            yield self._build_sse_event({"document": {**doc_obj, "file_name": fname}})
+                        else:
+                            documents.append(doc_obj)
 
-            # 3. Send Final JSON (sorted by document_index to keep order)
-            documents.sort(key=lambda x: x.get("document_index", 0))
-            final_payload = json.dumps({"documents": documents})
-            yield self._build_sse_event({"response": final_payload})
+                # 3. Send Final JSON (sorted by document_index to keep order)
+                if incremental:
+                    yield self._build_sse_event({"summary": {
+                        "files": total_files_to_process,
+                        "documents": emitted_count,
+                        "errors": error_count,
+                    }})
+                else:
+                    documents.sort(key=lambda x: x.get("document_index", 0))
+                    # The existing clients expect `response` as a JSON *string*: encode the
+                    # documents once and splice the escaped string into the event
+                    final_payload = JsonUtil.dumps({"documents": documents})
+                    yield self._build_sse_raw_event("response", JsonUtil.dumps(final_payload))
 
-        except Exception as e:
-            print(f"Critical Error during parallel extraction: {e}")
-            yield self._build_sse_event({"error": f"Error crítico: {str(e)}"})
+            except Exception as e:
+                print(f"Critical Error during parallel extraction: {e}")
+                yield self._build_sse_event({"error": f"Error crítico: {str(e)}"})
+                return
+
+            yield self._build_sse_event({"thinking": "Análisis finalizado."})
+        finally:
+            # Client went away or the stream failed: don't keep paying for orphaned extractions
+            for task in all_docs_tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _iter_files(self, files_data: Union[List[Dict[str, Any]], AsyncIterable[UploadFile]]) -> AsyncIterator[Tuple[str, bytes]]:
+        """Yields (filename, content) pairs, reading each upload only when it is its turn."""
+        if isinstance(files_data, list):
+            for file_data in files_data:
+                yield file_data.get("filename"), file_data.get("content")
             return
 
-        yield self._build_sse_event({"thinking": "Análisis finalizado."})
+        async for upload in files_data:
+            try:
+                with STAGE_SECONDS.time(stage="file_read"):
+                    content = await upload.read()
+            finally:
+                await upload.close()
+            yield upload.filename, content
+
+    async def _prepare(
+        self, content: bytes, filename: str, tenant: Optional[str] = None, wait_for_quota: bool = False,
+    ) -> Tuple[FileDescriptor, Optional[Dict[str, Any]]]:
+        descriptor = None
+        if tenant and self.tenant_limiter is not None and self.tenant_limiter.pages_enabled:
+            # Pages are charged before anything is encoded: a file over quota costs only its inspection
+            descriptor, timings = await run_cpu(inspect_document, content)
+            STAGE_SECONDS.observe(timings["validation"], stage="validation")
+            if descriptor.is_valid and not descriptor.needs_password:
+                retry_after = await self.tenant_limiter.reserve_pages(tenant, descriptor.page_count or 1)
+                while retry_after is not None and wait_for_quota:
+                    await asyncio.sleep(retry_after)
+                    retry_after = await self.tenant_limiter.reserve_pages(tenant, descriptor.page_count or 1)
+                if retry_after is not None:
+                    raise TooManyRequestsException(f"cuota de páginas por minuto agotada, reintentar en {math.ceil(retry_after)}s", retry_after)
+
+        async def prepare():
+            # PyMuPDF/Pillow parsing and base64 run in the CPU executor, off the event loop
+            inspected, doc_prep, timings = await run_cpu(inspect_and_prepare_document, content, filename, descriptor)
+            for stage, seconds in timings.items():
+                STAGE_SECONDS.observe(seconds, stage=stage)
+            return inspected, doc_prep
+
+        if self.preparations is None:
+            return await prepare()
+        # Keyed by the upload itself: its hash is cheaper than a SHA-256 and exact
+        return await self.preparations.do(content, prepare)
+
+    async def _extract_document(
+        self,
+        doc_prep: Dict[str, Any],
+        start_index: int,
+        checkpoint: Optional[ExtractionCheckpoint] = None,
+        file_key: str = "0",
+    ) -> List[dict]:
+        shards = doc_prep.get("shards")
+        if not shards:
+            return await self._checkpointed(
+                checkpoint,
+                f"{file_key}:0:{doc_prep['page_count']}",
+                start_index,
+                lambda: self.extraction_engine.extract_single_document(
+                    doc_prep["base64"],
+                    doc_prep["mime_type"],
+                    doc_prep["page_count"],
+                    start_index
+                ),
+                self._page_extractor(doc_prep),
+            )
+
+        # Long PDFs: every shard is an independent call, merged back in page order
+        tasks = [
+            asyncio.ensure_future(self._checkpointed(
+                checkpoint,
+                f"{file_key}:{shard['page_offset']}:{shard['page_count']}",
+                start_index + shard["page_offset"],
+                lambda shard=shard: self._extract_shard(shard, shard.get("mime_type", doc_prep["mime_type"]), start_index + shard["page_offset"]),
+                self._page_extractor(shard, doc_prep["mime_type"]),
+            ))
+            for shard in shards
+        ]
+        try:
+            shard_results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        # Every shard is kept, failed ones as error entries carrying their page range
+        merged = []
+        for results in shard_results:
+            merged.extend(results)
+        return merged
+
+    async def _checkpointed(
+        self,
+        checkpoint: Optional[ExtractionCheckpoint],
+        unit_key: str,
+        start_index: int,
+        extract: Callable[[], Awaitable[List[dict]]],
+        extract_pages: Optional[Callable[[int, int, int], Awaitable[List[dict]]]] = None,
+    ) -> List[dict]:
+        """
+        Runs one extraction unit, or replays it from the checkpoint. Units are checkpointed as
+        soon as they return any valid page, with indices relative to the unit like the extraction
+        cache; on replay only the pages still in error go back to the model, through
+        `extract_pages(page_offset, page_count, start_index)` (the whole unit without it).
+        """
+        if checkpoint is None:
+            return self._number_pages(await extract(), start_index)
+
+        stored = await checkpoint.get(unit_key)
+        if stored is None:
+            results = self._number_pages(await extract(), start_index)
+        else:
+            stored = self._shift_indices(stored, start_index)
+            if not self._is_error(stored):
+                return stored
+            if extract_pages is None:
+                results = self._number_pages(await extract(), start_index)
+            else:
+                results = await self._retry_failed_pages(stored, start_index, extract_pages)
+
+        if self._has_pages(results) and results != stored:
+            await checkpoint.put(unit_key, self._shift_indices(results, -start_index))
+        return results
+
+    async def _retry_failed_pages(
+        self,
+        stored: List[dict],
+        start_index: int,
+        extract_pages: Callable[[int, int, int], Awaitable[List[dict]]],
+    ) -> List[dict]:
+        """Extracts again the page ranges of the error entries of a checkpointed unit, keeping its valid pages."""
+        async def retry(result: dict) -> List[dict]:
+            first, count = result["document_index"], result.get("page_count") or 1
+            results = self._number_pages(await extract_pages(first - start_index, count, first), first)
+            if count > 1 and len(results) == 1 and results[0].get("error") and not results[0].get("page_count"):
+                # The whole call failed again: the error still stands for the whole range
+                results = [{**results[0], "page_count": count}]
+            return results
+
+        failed = [result for result in stored if result.get("error")]
+        retried = iter(await asyncio.gather(*(retry(result) for result in failed)))
+        merged = []
+        for result in stored:
+            merged.extend(next(retried) if result.get("error") else [result])
+        return merged
+
+    def _page_extractor(self, unit: Dict[str, Any], mime_type: Optional[str] = None) -> Optional[Callable[[int, int, int], Awaitable[List[dict]]]]:
+        """Extraction of a page range of a PDF or text unit, None for units that can't be sliced."""
+        mime_type = unit.get("mime_type", mime_type)
+        if "local_fields" in unit or mime_type not in ("application/pdf", "text/plain"):
+            return None
+
+        async def extract_pages(page_offset: int, page_count: int, start_index: int) -> List[dict]:
+            data = await run_cpu(slice_unit, unit["base64"], mime_type, page_offset, page_count)
+            return await self.extraction_engine.extract_single_document(data, mime_type, page_count, start_index)
+        return extract_pages
+
+    def _number_pages(self, results: List[dict], start_index: int) -> List[dict]:
+        """
+        Sets document_index from each entry's position in the unit instead of trusting the
+        index the model echoed from the prompt. Error entries take the pages they stand for.
+        """
+        numbered = []
+        position = start_index
+        for result in results:
+            numbered.append({**result, "document_index": position})
+            position += (result.get("page_count") or 1) if result.get("error") else 1
+        return numbered
+
+    def _shift_indices(self, results: List[dict], offset: int) -> List[dict]:
+        return [
+            {**result, "document_index": result["document_index"] + offset}
+            if isinstance(result.get("document_index"), int) else result
+            for result in results
+        ]
+
+    async def _extract_shard(self, shard: Dict[str, Any], mime_type: str, start_index: int) -> List[dict]:
+        if "local_fields" in shard:
+            # Extracted from the text layer during preparation, no model call
+            return [
+                {"document_index": start_index + i, "document_name": None, "fields": fields}
+                for i, fields in enumerate(shard["local_fields"])
+            ]
+        for _ in range(settings.PDF_SHARD_MAX_RETRIES + 1):
+            results = await self.extraction_engine.extract_single_document(shard["base64"], mime_type, shard["page_count"], start_index)
+            # Valid pages are kept even next to per-page errors; only a call that produced nothing is retried
+            if self._has_pages(results):
+                return results
+        if len(results) == 1 and not results[0].get("page_count"):
+            # The whole call failed: keep the page range on the error so the client knows which pages are missing
+            return [{**results[0], "page_count": shard["page_count"]}]
+        return results
+
+    def _is_error(self, results: List[dict]) -> bool:
+        return not results or any(result.get("error") for result in results)
+
+    def _has_pages(self, results: List[dict]) -> bool:
+        return any(not result.get("error") for result in results)
+
+    def _describe_pages(self, result: Dict[str, Any]) -> str:
+        page_count = result.get("page_count")
+        start = result.get("document_index")
+        if not page_count or start is None:
+            return ""
+        return f" (pág {start}-{start + page_count - 1})"
+
+    async def _run_extraction(self, extraction: Awaitable[List[dict]], filename: str, page_count: int) -> Tuple[str, int, List[dict]]:
+        return filename, page_count, await extraction
 
 
     def _build_sse_event(self, data: Dict[str, Any]) -> str:
-        return f"data: {json.dumps(data)}\n\n"
+        return f"data: {JsonUtil.dumps(data)}\n\n"
+
+    def _build_sse_raw_event(self, key: str, raw_json: str) -> str:
+        """Builds a single-key event around an already serialized JSON value, without re-encoding it."""
+        return f'data: {{"{key}":{raw_json}}}\n\n'
 
-    def prepare_document_for_llm(self, content: bytes, filename: str) -> Dict[str, Any]:
+    def prepare_document_for_llm(self, content: bytes, filename: str, descriptor: Optional[FileDescriptor] = None) -> Dict[str, Any]:
         """Returns base64, mime_type, and page_count for the document."""
-        if FileUtil.is_valid_pdf(content):
+        return prepare_document(content, filename, descriptor)
+
+
+    def to_base64_from_bytes(self, content: bytes, filename: str) -> List[str]:
+        # Implementation kept for compatibility with 'upload' method if needed,
+        # but renamed or refactored. For now, I'll redirect it.
+        doc = self.prepare_document_for_llm(content, filename)
+        return [doc["base64"]] if doc else []
+
+
+def prepare_document(content: bytes, filename: str, descriptor: Optional[FileDescriptor] = None) -> Dict[str, Any]:
+    """Returns base64, mime_type, and page_count for the document.
+    `descriptor` is the result of FileUtil.inspect, computed here when not provided.
+    Module-level (not a method) so it can run in a process pool."""
+    descriptor = descriptor or FileUtil.inspect(content)
+    if not descriptor.is_valid:
+        return None
+
+    if descriptor.kind == "pdf":
+        page_count = descriptor.page_count
+        if settings.PDF_TEXT_TRIAGE in ("llm", "heuristic"):
             try:
-                doc = fitz.open(stream=BytesIO(content), filetype="pdf")
-                page_count = doc.page_count
-                doc.close()
+                units = triage_pdf(content, settings.PDF_TEXT_TRIAGE)
+                if units is not None:
+                    return {
+                        "base64": None,
+                        "mime_type": "application/pdf",
+                        "page_count": page_count,
+                        "shards": units,
+                        "text_pages": sum(unit["page_count"] for unit in units if unit.get("mime_type") != "application/pdf"),
+                    }
+            except Exception as e:
+                # Triage is an optimization: fall back to sending the PDF itself
+                print(f"Error reading text layer of {filename}: {e}")
+
+        try:
+            shard_size = settings.PDF_SHARD_PAGES
+            if shard_size and page_count > shard_size:
                 return {
-                    "base64": base64.b64encode(content).decode("utf-8"),
+                    "base64": None,
                     "mime_type": "application/pdf",
-                    "page_count": page_count
+                    "page_count": page_count,
+                    "shards": [
+                        {"base64": FileUtil.to_base64(data), "page_count": count, "page_offset": offset}
+                        for offset, count, data in FileUtil.split_pdf(content, shard_size)
+                    ]
                 }
+        except Exception as e:
+            # Sharding is an optimization: fall back to sending the whole document
+            print(f"Error splitting {filename}: {e}")
+
+        return {
+            "base64": base64.b64encode(content).decode("utf-8"),
+            "mime_type": "application/pdf",
+            "page_count": page_count
+        }
+
+    elif descriptor.kind == "image":
+        mime_type = descriptor.mime_type
+
+        if settings.IMAGE_OPTIMIZE_ENABLED:
+            try:
+                content, mime_type = FileUtil.optimize_image(
+                    content,
+                    max_long_edge=settings.IMAGE_MAX_LONG_EDGE,
+                    max_dpi=settings.IMAGE_MAX_DPI,
+                    output_format=settings.IMAGE_OUTPUT_FORMAT,
+                    quality=settings.IMAGE_QUALITY
+                )
             except Exception as e:
-                print(f"Error counting pages: {e}")
-                return None
-                
-        elif FileUtil.is_valid_image(content):
-            mime_type = "image/jpeg"
-            if filename.lower().endswith(".png"):
-                mime_type = "image/png"
-            elif filename.lower().endswith(".webp"):
-                mime_type = "image/webp"
-            
-            return {
-                "base64": base64.b64encode(content).decode("utf-8"),
-                "mime_type": mime_type,
-                "page_count": 1
-            }
+                # Fall back to the original upload rather than dropping the file
+                print(f"Error optimizing image {filename}: {e}")
+        
+        return {
+            "base64": base64.b64encode(content).decode("utf-8"),
+            "mime_type": mime_type,
+            "page_count": 1
+        }
+    return None
+
+
+def slice_unit(base64_data: str, mime_type: str, page_offset: int, page_count: int) -> str:
+    """Base64 of a page range of a PDF or text/plain unit, for retrying only its failed pages.
+    Module-level (not a method) so it can run in a process pool."""
+    if mime_type == "text/plain":
+        pages = PdfTextUtil.split_pages(base64.b64decode(base64_data).decode("utf-8"))
+        text = PdfTextUtil.join_pages(pages[page_offset:page_offset + page_count])
+        return FileUtil.to_base64(text.encode("utf-8"))
+    [(_, _, data)] = FileUtil.extract_pdf_pages(base64.b64decode(base64_data), [(page_offset, page_count)])
+    return FileUtil.to_base64(data)
+
+
+def triage_pdf(content: bytes, mode: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Splits a PDF into runs of consecutive pages by kind. Pages with a usable text layer
+    become text/plain units (mode "llm") or locally extracted fields (mode "heuristic");
+    scanned pages stay PDF. Runs are capped at PDF_SHARD_PAGES pages. Returns the units in
+    the same shape as shards, or None when no page has text (the PDF is sent as is).
+    """
+    pages = PdfTextUtil.extract_pages(
+        content, settings.TEXT_LAYER_MIN_CHARS, settings.TEXT_LAYER_MAX_IMAGE_COVERAGE, fields=mode == "heuristic",
+    )
+    usable = [page["usable"] for page in pages]
+    if not any(usable):
         return None
 
+    max_run = settings.PDF_SHARD_PAGES or len(pages)
+    runs = []  # [is_text, first_page_offset, page_count]
+    for offset, is_text in enumerate(usable):
+        if runs and runs[-1][0] == is_text and runs[-1][2] < max_run:
+            runs[-1][2] += 1
+        else:
+            runs.append([is_text, offset, 1])
 
-    def to_base64_from_bytes(self, content: bytes, filename: str) -> List[str]:
-        # Implementation kept for compatibility with 'upload' method if needed,
-        # but renamed or refactored. For now, I'll redirect it.
-        doc = self.prepare_document_for_llm(content, filename)
-        return [doc["base64"]] if doc else []
+    scanned = {
+        first: data
+        for first, _, data in FileUtil.extract_pdf_pages(content, [(first, count) for is_text, first, count in runs if not is_text])
+    }
+
+    units = []
+    for is_text, first, count in runs:
+        unit = {"page_count": count, "page_offset": first}
+        run_pages = pages[first:first + count]
+        if not is_text:
+            unit.update(base64=FileUtil.to_base64(scanned[first]), mime_type="application/pdf")
+        elif mode == "heuristic":
+            unit.update(local_fields=[PdfTextUtil.page_fields(page) for page in run_pages], mime_type="text/plain")
+        else:
+            text = PdfTextUtil.join_pages([page["text"] for page in run_pages])
+            unit.update(base64=FileUtil.to_base64(text.encode("utf-8")), mime_type="text/plain")
+        units.append(unit)
+    return units
+
+
+def inspect_document(content: bytes) -> Tuple[FileDescriptor, Dict[str, float]]:
+    started = time.perf_counter()
+    descriptor = FileUtil.inspect(content)
+    return descriptor, {"validation": time.perf_counter() - started}
+
+
+def inspect_and_prepare_document(
+    content: bytes,
+    filename: str,
+    descriptor: Optional[FileDescriptor] = None,
+) -> Tuple[FileDescriptor, Optional[Dict[str, Any]], Dict[str, float]]:
+    """Inspection + preparation in a single executor hop (inspection is skipped when
+    `descriptor` is given). Stage timings are returned rather than recorded here, since
+    this may run in a worker process."""
+    timings = {}
+    if descriptor is None:
+        descriptor, timings = inspect_document(content)
+    if descriptor.needs_password:
+        return descriptor, None, timings
+    started = time.perf_counter()
+    doc_prep = prepare_document(content, filename, descriptor)
+    timings["prepare"] = time.perf_counter() - started
+    return descriptor, doc_prep, timings
 
@@ -1,7 +1,9 @@
 
+from typing import List
 from app.core.domain.document import Document
 from app.core.repository.document_repository import DocumentRepository
 from app.core.services.document_service import DocumentService
+from config.config import settings
 from config.mapper import Mapper
 from dto.document import DocumentRequest
 
@@ -13,16 +15,32 @@ class DocumentServiceImpl(DocumentService):
         self.document_repository = document_repository
 
     async def save(self, t: DocumentRequest):
+        await self.document_repository.save(self._to_entity(t))
+
+    async def save_all(self, t: List[DocumentRequest]):
+        return await self.document_repository.save_all([self._to_entity(tt) for tt in t])
+
+    def _to_entity(self, t: DocumentRequest) -> Document:
         document = Mapper.to_entity(t, Document)
         document.fields = [field.model_dump() for field in t.fields]
         document.type = t.detectedType   
         document.file_name = t.fileName
         document.is_anonymized = t.isAnonymized 
-        await self.document_repository.save(document)
+        return document
 
     async def find_all(self):
         return await self.document_repository.find_all()
 
+    async def find_page(self, limit: int, after=None, include_fields: bool = True, **filters):
+        return await self.document_repository.find_page(limit, after=after, include_fields=include_fields, **filters)
+
+    async def stream_all(self, **filters):
+        async for doc in self.document_repository.stream_all(batch_size=settings.DOCUMENT_EXPORT_BATCH_SIZE, **filters):
+            yield doc
+
+    async def find_field_labels(self, **filters):
+        return await self.document_repository.find_field_labels(**filters)
+
     async def delete(self, id: str):
         return await self.document_repository.delete(id)
 
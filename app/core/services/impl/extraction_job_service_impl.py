@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.domain.extraction_job import ExtractionJob, utcnow
+from app.core.repository.extraction_job_repository import ExtractionJobRepository
+from app.core.repository.impl.extraction_job_repository_impl import ExtractionJobRepositoryImpl
+from app.core.services.analyze_service import AnalyzeService
+from app.core.services.extraction_checkpoint import ExtractionCheckpoint
+from app.core.services.extraction_job_service import ExtractionJobService
+from core.exceptions import AppBaseException, NotFoundException
+from dto.extraction_job import ExtractionJobResponse
+from utl.json_util import JsonUtil
+
+logger = logging.getLogger("app.core.extraction_jobs")
+
+
+class JobExtractionCheckpoint(ExtractionCheckpoint):
+    """Checkpoints of one job: loaded once when the job starts, written as each unit returns pages."""
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], job_id: UUID, stored: Dict[str, List[dict]]):
+        self.session_factory = session_factory
+        self.job_id = job_id
+        self.stored = stored
+        self.reused = 0
+
+    async def get(self, unit_key: str) -> Optional[List[dict]]:
+        results = self.stored.get(unit_key)
+        if results is not None:
+            self.reused += 1
+        return results
+
+    async def put(self, unit_key: str, results: List[dict]) -> None:
+        try:
+            async with self.session_factory() as db:
+                await ExtractionJobRepositoryImpl(db).save_checkpoint(self.job_id, unit_key, results)
+            self.stored[unit_key] = results
+        except Exception as e:
+            # Losing a checkpoint only costs a re-extraction on retry; never fail the job for it
+            logger.warning(f"Could not checkpoint {unit_key} of job {self.job_id}: {e}")
+
+
+class ExtractionJobServiceImpl(ExtractionJobService):
+    """
+    Extraction as background jobs. Uploads are stored with the job; a worker claims the job,
+    runs the regular `upload_stream` pipeline (incremental mode) and stores every SSE event,
+    so clients can poll the job or re-attach to its event stream at any time. Jobs survive
+    restarts: a job whose worker stops renewing its lease is claimed again. The work is
+    charged to the submitting tenant: its page quota (waited for, not skipped) and its fair
+    share of the model calls.
+    """
+
+    # Comment line sent on idle event streams so proxies don't drop the connection
+    KEEPALIVE_SECONDS = 15
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        analyze_service: AnalyzeService,
+        lease_seconds: int = 120,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        flush_interval: float = 0.5,
+    ):
+        self.session_factory = session_factory
+        self.analyze_service = analyze_service
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.flush_interval = flush_interval
+        self._submitted: Optional[asyncio.Event] = None
+
+    def _repository(self, db: AsyncSession) -> ExtractionJobRepository:
+        return ExtractionJobRepositoryImpl(db)
+
+    async def submit(self, files: List[Tuple[str, bytes]], tenant: Optional[str] = None) -> ExtractionJobResponse:
+        async with self.session_factory() as db:
+            job = await self._repository(db).create(files, tenant)
+            response = self._to_response(job)
+        # In-process workers start right away instead of at their next poll
+        self._submission_event().set()
+        return response
+
+    async def retry(self, job_id: UUID) -> ExtractionJobResponse:
+        """Runs a finished job again. Pages that succeeded are replayed from their checkpoints,
+        so only the failed pages/shards go back to the model."""
+        async with self.session_factory() as db:
+            repository = self._repository(db)
+            job = await repository.find_by_id(job_id)
+            if job is None:
+                raise NotFoundException("Trabajo no encontrado")
+            if job.status not in ExtractionJob.TERMINAL:
+                raise AppBaseException("El trabajo todavía está en proceso", status_code=409)
+            if not await repository.has_files(job_id):
+                raise AppBaseException("El trabajo terminó sin errores; no hay nada que reintentar", status_code=409)
+            if not await repository.requeue(job_id):
+                raise AppBaseException("El trabajo ya fue reencolado", status_code=409)
+            job = await repository.find_by_id(job_id)
+            response = self._to_response(job)
+        self._submission_event().set()
+        return response
+
+    async def get(self, job_id: UUID) -> ExtractionJobResponse:
+        async with self.session_factory() as db:
+            repository = self._repository(db)
+            job = await repository.find_by_id(job_id)
+            if job is None:
+                raise NotFoundException("Trabajo no encontrado")
+            events = await repository.find_events(job_id)
+
+        response = self._to_response(job)
+        for _, data in events:
+            event = JsonUtil.loads(data)
+            if "document" in event:
+                response.documents.append(event["document"])
+            elif "summary" in event:
+                response.summary = event["summary"]
+            elif "error" in event:
+                response.errors.append(event["error"])
+            elif str(event.get("thinking", "")).startswith("[ERROR]"):
+                response.errors.append(event["thinking"].strip())
+        response.documents.sort(key=lambda doc: doc.get("document_index") or 0)
+        return response
+
+    async def events(self, job_id: UUID, after_seq: int = -1) -> AsyncIterator[str]:
+        """SSE stream of the job: stored events after `after_seq`, then new ones as they arrive,
+        ending with a `job` event once the job is finished. Each event carries its seq as `id`."""
+        idle_since = time.monotonic()
+        while True:
+            async with self.session_factory() as db:
+                repository = self._repository(db)
+                # Status before events: once it reads terminal, every event is already stored
+                job = await repository.find_by_id(job_id)
+                if job is None:
+                    raise NotFoundException("Trabajo no encontrado")
+                rows = await repository.find_events(job_id, after_seq)
+
+            for seq, data in rows:
+                yield f"id: {seq}\ndata: {data}\n\n"
+                after_seq = seq
+
+            if job.status in ExtractionJob.TERMINAL and not rows:
+                yield f"data: {JsonUtil.dumps({'job': {'status': job.status, 'error': job.error}})}\n\n"
+                return
+
+            if rows:
+                idle_since = time.monotonic()
+            else:
+                if time.monotonic() - idle_since >= self.KEEPALIVE_SECONDS:
+                    yield ": keepalive\n\n"
+                    idle_since = time.monotonic()
+                await asyncio.sleep(self.poll_interval)
+
+    async def wait_for_submission(self, timeout: float) -> None:
+        event = self._submission_event()
+        # asyncio.wait instead of wait_for: a cancellation must always reach the worker
+        waiter = asyncio.ensure_future(event.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        finally:
+            waiter.cancel()
+        event.clear()
+
+    async def run_next(self, worker_id: str) -> bool:
+        """Claims one job and runs it to the end. Returns False when the queue is empty."""
+        async with self.session_factory() as db:
+            job = await self._repository(db).claim_next(worker_id, self._lease_until(), self.max_attempts)
+        if job is None:
+            return False
+
+        logger.info(f"Worker {worker_id} running job {job.job_id} (attempt {job.attempts})")
+        await self._run(job, worker_id)
+        return True
+
+    async def _run(self, job: ExtractionJob, worker_id: str):
+        async with self.session_factory() as db:
+            repository = self._repository(db)
+            seq = await repository.reset_events(job.job_id)
+            files = await repository.find_files(job.job_id)
+            checkpoint = JobExtractionCheckpoint(self.session_factory, job.job_id, await repository.find_checkpoints(job.job_id))
+
+        heartbeat = asyncio.create_task(self._keep_lease(job.job_id, worker_id))
+        status, error, summary = ExtractionJob.DONE, None, None
+        pending = [JsonUtil.dumps({"restart": {"attempt": job.attempts}})] if job.attempts > 1 else []
+        try:
+            async with self.session_factory() as db:
+                repository = self._repository(db)
+                last_flush = time.monotonic()
+                files_data = [{"filename": name, "content": content} for name, content in files]
+                del files
+
+                async for event in self.analyze_service.upload_stream(
+                    files_data, incremental=True, checkpoint=checkpoint, tenant=job.tenant, wait_for_quota=True,
+                ):
+                    # upload_stream yields ready-made SSE frames: "data: {...}\n\n"
+                    data = event.strip()[len("data: "):]
+                    payload = JsonUtil.loads(data)
+                    if "error" in payload:
+                        status, error = ExtractionJob.FAILED, payload["error"]
+                    summary = payload.get("summary", summary)
+
+                    pending.append(data)
+                    if time.monotonic() - last_flush >= self.flush_interval:
+                        await repository.add_events(job.job_id, seq, pending)
+                        seq += len(pending)
+                        pending = []
+                        last_flush = time.monotonic()
+                await repository.add_events(job.job_id, seq, pending)
+        except asyncio.CancelledError:
+            # Worker shutting down: hand the job back instead of waiting for the lease to expire
+            heartbeat.cancel()
+            async with self.session_factory() as db:
+                await self._repository(db).release(job.job_id, worker_id)
+            logger.info(f"Job {job.job_id} released by {worker_id}")
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {e}", exc_info=True)
+            status, error = ExtractionJob.FAILED, f"Error crítico: {e}"
+        finally:
+            heartbeat.cancel()
+
+        async with self.session_factory() as db:
+            repository = self._repository(db)
+            if not await repository.finish(job.job_id, worker_id, status, error):
+                logger.warning(f"Job {job.job_id} lease lost by {worker_id}; result discarded")
+                return
+            if checkpoint.reused:
+                logger.info(f"Job {job.job_id}: {checkpoint.reused} units reused from checkpoints")
+            # Uploads and checkpoints are only needed to run the job again
+            if status == ExtractionJob.DONE and summary and not summary.get("errors"):
+                await repository.delete_files(job.job_id)
+                await repository.delete_checkpoints(job.job_id)
+
+    async def _keep_lease(self, job_id: UUID, worker_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with self.session_factory() as db:
+                    await self._repository(db).renew_lease(job_id, worker_id, self._lease_until())
+            except Exception as e:
+                logger.warning(f"Could not renew lease of job {job_id}: {e}")
+
+    def _lease_until(self):
+        return utcnow() + timedelta(seconds=self.lease_seconds)
+
+    def _submission_event(self) -> asyncio.Event:
+        if self._submitted is None:
+            self._submitted = asyncio.Event()
+        return self._submitted
+
+    def _to_response(self, job: ExtractionJob) -> ExtractionJobResponse:
+        return ExtractionJobResponse(
+            job_id=job.job_id,
+            status=job.status,
+            attempts=job.attempts or 0,
+            file_count=job.file_count or 0,
+            created=job.created,
+            started=job.started,
+            finished=job.finished,
+            error=job.error,
+        )
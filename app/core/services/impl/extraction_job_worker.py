@@ -0,0 +1,54 @@
+import asyncio
+import logging
+import os
+import socket
+from typing import List
+
+from app.core.services.extraction_job_service import ExtractionJobService
+
+logger = logging.getLogger("app.core.extraction_jobs")
+
+
+class ExtractionJobWorkerPool:
+    """`workers` asyncio tasks draining the extraction job queue. Runs on its own with
+    `python worker.py` or inside the API process (JOB_WORKERS > 0). While the queue stays
+    empty the poll interval doubles up to `max_poll_interval`; a job submitted to the same
+    process wakes the workers at once."""
+
+    def __init__(self, job_service: ExtractionJobService, workers: int = 2, poll_interval: float = 1.0, max_poll_interval: float = 10.0):
+        self.job_service = job_service
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(max_poll_interval, poll_interval)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if self._tasks:
+            return
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = [asyncio.create_task(self._work(f"{prefix}:{i}")) for i in range(self.workers)]
+
+    # Time given to running jobs to hand themselves back to the queue on stop
+    STOP_TIMEOUT_SECONDS = 10
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.wait(self._tasks, timeout=self.STOP_TIMEOUT_SECONDS)
+        self._tasks = []
+
+    async def _work(self, worker_id: str):
+        interval = self.poll_interval
+        while True:
+            try:
+                ran = await self.job_service.run_next(worker_id)
+            except Exception as e:
+                # Database hiccup: back off and keep the worker alive
+                logger.warning(f"Worker {worker_id} could not claim a job: {e}")
+                ran = False
+            if ran:
+                interval = self.poll_interval
+            else:
+                await self.job_service.wait_for_submission(interval)
+                interval = min(interval * 2, self.max_poll_interval)
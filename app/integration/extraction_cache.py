@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class ExtractionCache(ABC):
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[list[dict]]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: list[dict]) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        pass
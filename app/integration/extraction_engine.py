@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import AsyncIterator
 
 
 class ExtractionEngine(ABC):
@@ -11,3 +12,12 @@ class ExtractionEngine(ABC):
     async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
         pass
 
+    async def extract_document_stream(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> AsyncIterator[dict]:
+        """Yields pages (or error entries) as they become available. Engines that cannot
+        stream yield them all once `extract_single_document` returns."""
+        for result in await self.extract_single_document(base64_data, mime_type, page_count, start_index):
+            yield result
+
+    async def warmup(self):
+        """Optional: prepare clients/connections before the first request."""
+        pass
@@ -0,0 +1,52 @@
+import copy
+import hashlib
+
+from app.integration.extraction_cache import ExtractionCache
+from app.integration.extraction_engine import ExtractionEngine
+
+
+class CachedExtractionEngine(ExtractionEngine):
+    """
+    Content-addressed cache in front of another ExtractionEngine. Results are keyed by
+    the SHA-256 of the document payload, the model name and the prompt version, and are
+    stored with page indices relative to the document so they can be reused at any
+    position of a batch.
+    """
+
+    def __init__(self, engine: ExtractionEngine, cache: ExtractionCache, model_name: str, prompt_version: str):
+        self.engine = engine
+        self.cache = cache
+        self.model_name = model_name
+        self.prompt_version = prompt_version
+
+    def cache_key(self, base64_data: str, mime_type: str) -> str:
+        # base64 maps one-to-one to the raw bytes, so hashing it avoids decoding the payload
+        digest = hashlib.sha256(base64_data.encode("ascii")).hexdigest()
+        return f"{self.model_name}:{self.prompt_version}:{mime_type}:{digest}"
+
+    async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
+        key = self.cache_key(base64_data, mime_type)
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return self._shift(cached, start_index)
+
+        results = await self.engine.extract_single_document(base64_data, mime_type, page_count, start_index)
+
+        # Errors (quota, invalid JSON, ...) are transient and must not be replayed
+        if results and not any(isinstance(r, dict) and r.get("error") for r in results):
+            await self.cache.set(key, self._shift(results, -start_index))
+        return results
+
+    async def warmup(self):
+        await self.engine.warmup()
+
+    async def extract_stream(self, documents_data: list[dict]):
+        return await self.engine.extract_stream(documents_data)
+
+    def _shift(self, results: list[dict], offset: int) -> list[dict]:
+        shifted = copy.deepcopy(results)
+        for item in shifted:
+            if isinstance(item, dict) and isinstance(item.get("document_index"), int):
+                item["document_index"] += offset
+        return shifted
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.integration.extraction_cache import ExtractionCache
+from app.integration.shared_store import SharedStore
+from config.metrics_config import CACHE_LOOKUPS_TOTAL
+from utl.json_util import JsonUtil
+
+logger = logging.getLogger("app.integration.extraction_cache")
+
+
+class ExtractionCacheImpl(ExtractionCache):
+    """
+    Two-tier cache for extraction results: an in-process LRU in front of a SQLite file.
+    Both tiers expire entries after `ttl_seconds` and are bounded by entry count.
+
+    With a `store` the second tier is the shared store instead of the SQLite file, so workers
+    on different nodes reuse each other's results; there it is bounded by the TTL only.
+    """
+
+    STORE_KEY = "extraction_cache:{key}"
+
+    # Disk tier is trimmed every N writes instead of on every insert
+    PRUNE_EVERY = 100
+
+    def __init__(self, memory_entries: int = 512, disk_entries: int = 50000, ttl_seconds: int = 7 * 24 * 3600, path: str = "", store: Optional[SharedStore] = None):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._memory: "OrderedDict[str, tuple[float, list[dict]]]" = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._store = store
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._writes_since_prune = 0
+        if path and store is None:
+            self._open_disk_tier(path)
+
+    def _open_disk_tier(self, path: str):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS ix_extraction_cache_accessed ON extraction_cache (accessed)")
+            db.commit()
+            self._db = db
+        except (sqlite3.Error, OSError) as e:
+            # Read-only filesystems (e.g. serverless) still get the memory tier
+            logger.warning(f"Extraction cache disk tier disabled ({path}): {e}")
+
+    async def get(self, key: str) -> Optional[list[dict]]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            created, value = entry
+            if now - created < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                CACHE_LOOKUPS_TOTAL.inc(result="memory_hit")
+                return value
+            del self._memory[key]
+
+        if self._store is not None:
+            entry = await self._store.get(self.STORE_KEY.format(key=key))
+            if entry is not None:
+                self._remember(key, entry["created"], entry["value"])
+                self._counters["shared_hits"] += 1
+                CACHE_LOOKUPS_TOTAL.inc(result="shared_hit")
+                return entry["value"]
+
+        if self._db is not None:
+            row = await asyncio.to_thread(self._disk_get, key, now)
+            if row is not None:
+                created, value = row
+                self._remember(key, created, value)
+                self._counters["disk_hits"] += 1
+                CACHE_LOOKUPS_TOTAL.inc(result="disk_hit")
+                return value
+
+        self._counters["misses"] += 1
+        CACHE_LOOKUPS_TOTAL.inc(result="miss")
+        return None
+
+    async def set(self, key: str, value: list[dict]) -> None:
+        now = time.time()
+        self._remember(key, now, value)
+        self._counters["stores"] += 1
+        if self._store is not None:
+            await self._store.set(self.STORE_KEY.format(key=key), {"created": now, "value": value}, ttl_seconds=self.ttl_seconds)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, JsonUtil.dumps(value), now)
+
+    def stats(self) -> dict:
+        lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["shared_hits"] + self._counters["misses"]
+        hits = lookups - self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self._memory),
+            "disk_enabled": self._db is not None,
+            "shared_enabled": self._store is not None,
+        }
+
+    def _remember(self, key: str, created: float, value: list[dict]):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[tuple[float, list[dict]]]:
+        with self._db_lock:
+            row = self._db.execute("SELECT value, created FROM extraction_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, created = row
+            if now - created >= self.ttl_seconds:
+                self._db.execute("DELETE FROM extraction_cache WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE extraction_cache SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+        return created, JsonUtil.loads(value)
+
+    def _disk_set(self, key: str, value: str, now: float):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.PRUNE_EVERY:
+                self._writes_since_prune = 0
+                self._disk_prune(now)
+            self._db.commit()
+
+    def _disk_prune(self, now: float):
+        expired = self._db.execute("DELETE FROM extraction_cache WHERE created < ?", (now - self.ttl_seconds,)).rowcount
+        overflow = self._db.execute(
+            "DELETE FROM extraction_cache WHERE key IN ("
+            " SELECT key FROM extraction_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.disk_entries,),
+        ).rowcount
+        self._counters["evictions"] += expired + overflow
@@ -1,21 +1,24 @@
 import json
-import asyncio
-import google.generativeai as genai
+import time
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+
 from app.integration.extraction_engine import ExtractionEngine
+from app.integration.impl.gemini_client_pool import GeminiClientPool
+from app.integration.rate_scheduler import RateScheduler
+from app.integration.resilience import QUOTA_EXHAUSTED, CircuitOpenError, Resilience, classify
 from config.config import settings
+from config.metrics_config import ERRORS_TOTAL, LLM_CALL_SECONDS, LLM_FIRST_PAGE_SECONDS, LLM_PAGE_SECONDS, STAGE_SECONDS
+from dto.extracted_page import ExtractedPage
+from utl.json_stream import INVALID_ELEMENT, JsonArrayStream
+from utl.json_util import JsonUtil
 
-# Configure Gemini once
-genai.configure(api_key=settings.LLM_API_KEY)
-
-class ExtractionEngineImpl(ExtractionEngine):
+# Prompts are templated once at import; only page_count/start_index vary per call.
+# NOTE: bump settings.LLM_PROMPT_VERSION when editing these prompts (invalidates the result cache)
+PROMPT_FOOTER = "\n\nSi el contenido es ilegible, devuelve el objeto igualmente con campos null. NO inventes datos."
 
-    async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
-        model = genai.GenerativeModel(settings.LLM_MODEL_NAME)
-        
-        is_pdf = mime_type == "application/pdf"
-        
-        if is_pdf:
-            prompt = f"""Analiza este documento por completo ({page_count} páginas). 
+PDF_PROMPT = """Analiza este documento por completo ({page_count} páginas). 
 Debes extraer TODOS los datos, tablas y campos de CADA PÁGINA por separado.
 
 Es CRITICO que devuelvas exactamente una lista (array) de JSON, donde cada objeto represente una página física del documento.
@@ -28,9 +31,9 @@ Formato requerido:
     "fields": {{ "campo": "valor" }}
   }},
   ... y así sucesivamente para las {page_count} páginas, incrementando el document_index.
-]"""
-        else:
-            prompt = f"""Analiza esta imagen. Extrae TODOS los datos, tablas y campos.
+]""" + PROMPT_FOOTER
+
+IMAGE_PROMPT = """Analiza esta imagen. Extrae TODOS los datos, tablas y campos.
 
 Es CRITICO que devuelvas exactamente una lista (array) de JSON con UN solo objeto.
 
@@ -41,69 +44,224 @@ Formato requerido:
     "document_name": "Nombre descriptivo de la imagen",
     "fields": {{ "campo": "valor" }}
   }}
-]"""
+]""" + PROMPT_FOOTER
+
+TEXT_PROMPT = """Este es el texto extraído de un documento ({page_count} páginas), en orden de lectura.
+Cada página empieza con una línea "=== Página N ===" y las celdas de una misma fila están separadas por tabuladores.
+Debes extraer TODOS los datos, tablas y campos de CADA PÁGINA por separado.
+
+Es CRITICO que devuelvas exactamente una lista (array) de JSON, donde cada objeto represente una página del documento.
+
+Formato requerido:
+[
+  {{
+    "document_index": {start_index}, 
+    "document_name": "Nombre descriptivo página 1",
+    "fields": {{ "campo": "valor" }}
+  }},
+  ... y así sucesivamente para las {page_count} páginas, incrementando el document_index.
+]""" + PROMPT_FOOTER
+
+
+class ExtractionEngineImpl(ExtractionEngine):
 
-        prompt += "\n\nSi el contenido es ilegible, devuelve el objeto igualmente con campos null. NO inventes datos."
+    # Rough input cost of the prompt itself, on top of the per-page estimate
+    PROMPT_TOKENS = 400
+    GENERATION_CONFIG = {"response_mime_type": "application/json"}
 
-        contents = [
+    def __init__(
+        self,
+        scheduler: RateScheduler | None = None,
+        client_pool: GeminiClientPool | None = None,
+        resilience: Resilience | None = None,
+    ):
+        self.scheduler = scheduler or RateScheduler()
+        self.client_pool = client_pool or GeminiClientPool(api_key=settings.LLM_API_KEY)
+        self.resilience = resilience or Resilience()
+
+    async def warmup(self):
+        await self.client_pool.warmup(settings.LLM_MODEL_NAME, self.GENERATION_CONFIG)
+
+    async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
+        # The service needs the whole file/shard anyway: one plain call, and the answer is parsed
+        # in one go. The incremental parser only runs when that fails (fences, truncation, a bad page)
+        model = self.client_pool.get(settings.LLM_MODEL_NAME, self.GENERATION_CONFIG)
+        contents = self._contents(base64_data, mime_type, page_count, start_index)
+
+        async def call():
+            return await model.generate_content_async(contents)
+
+        started = time.perf_counter()
+        try:
+            async with self.scheduler.slot(tokens=self._estimated_tokens(page_count)):
+                response = await self.resilience.call(call, endpoint=settings.LLM_MODEL_NAME, on_rate_limited=self.scheduler.penalize)
+        except CircuitOpenError as e:
+            return [self._circuit_open_error(e, start_index)]
+        except Exception as e:
+            if classify(e) == QUOTA_EXHAUSTED:
+                print(f"Daily Quota Exceeded: {e}")
+                raise e
+            print(f"Error processing documents starting at {start_index}: {e}")
+            return [{"document_index": start_index, "error": str(e)}]
+
+        elapsed = time.perf_counter() - started
+        self._observe_call(elapsed, mime_type, page_count)
+        LLM_FIRST_PAGE_SECONDS.observe(elapsed, backend="gemini")
+
+        parse_started = time.perf_counter()
+        text = self._chunk_text(response)
+        results = self._parse_answer(text, page_count, start_index)
+        STAGE_SECONDS.observe(time.perf_counter() - parse_started, stage="json_parse")
+        return results
+
+    async def extract_document_stream(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> AsyncIterator[dict]:
+        # Long-lived model from the pool: no per-call construction
+        model = self.client_pool.get(settings.LLM_MODEL_NAME, self.GENERATION_CONFIG)
+        contents = self._contents(base64_data, mime_type, page_count, start_index)
+
+        async def open_stream():
+            # Resolves with the first chunk, so rate limits and server errors surface here and are retried
+            return await model.generate_content_async(contents, stream=True)
+
+        started = time.perf_counter()
+        parser = JsonArrayStream()
+        parse_seconds = 0.0
+        received = False
+        emitted = 0
+        try:
+            # The slot is held until the answer is fully streamed (and across retries of the opening call)
+            async with self.scheduler.slot(tokens=self._estimated_tokens(page_count)):
+                # Retries with jittered backoff, Retry-After hints and a per-model circuit breaker;
+                # rate-limit waits also hold back every queued call, not just this one
+                response = await self.resilience.call(open_stream, endpoint=settings.LLM_MODEL_NAME, on_rate_limited=self.scheduler.penalize)
+                try:
+                    async for chunk in response:
+                        text = self._chunk_text(chunk)
+                        received = received or bool(text.strip())
+                        parse_started = time.perf_counter()
+                        items = parser.feed(text)
+                        parse_seconds += time.perf_counter() - parse_started
+                        for item in items:
+                            if emitted == 0:
+                                LLM_FIRST_PAGE_SECONDS.observe(time.perf_counter() - started, backend="gemini")
+                            yield self._validate_page(item, start_index + emitted)
+                            emitted += 1
+                except Exception as e:
+                    if not parser.started:
+                        raise
+                    # Connection dropped mid-answer: keep what arrived, the rest is reported below
+                    print(f"Stream interrupted for documents starting at {start_index}: {e}")
+        except CircuitOpenError as e:
+            yield self._circuit_open_error(e, start_index)
+            return
+        except Exception as e:
+            if classify(e) == QUOTA_EXHAUSTED:
+                print(f"Daily Quota Exceeded: {e}")
+                raise e
+            print(f"Error processing documents starting at {start_index}: {e}")
+            yield {"document_index": start_index, "error": str(e)}
+            return
+
+        self._observe_call(time.perf_counter() - started, mime_type, page_count)
+        STAGE_SECONDS.observe(parse_seconds, stage="json_parse")
+
+        if not received:
+            ERRORS_TOTAL.inc(type="empty_response")
+            yield {"document_index": start_index, "error": "Empty response"}
+            return
+        for result in self._finish_pages(parser, emitted, page_count, start_index):
+            yield result
+
+    def _contents(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list:
+        if mime_type == "application/pdf":
+            template = PDF_PROMPT
+        elif mime_type == "text/plain":
+            # Text layer of born-digital PDF pages (see PDF_TEXT_TRIAGE)
+            template = TEXT_PROMPT
+        else:
+            template = IMAGE_PROMPT
+        prompt = template.format(page_count=page_count, start_index=start_index)
+
+        return [
             prompt,
             {"mime_type": mime_type, "data": base64_data}
         ]
 
+    def _estimated_tokens(self, page_count: int) -> int:
+        return self.PROMPT_TOKENS + page_count * settings.LLM_ESTIMATED_TOKENS_PER_PAGE
+
+    def _observe_call(self, elapsed: float, mime_type: str, page_count: int):
+        STAGE_SECONDS.observe(elapsed, stage="llm")
+        LLM_CALL_SECONDS.observe(elapsed, backend="gemini", mime_type=mime_type)
+        LLM_PAGE_SECONDS.observe(elapsed / max(1, page_count), backend="gemini")
+
+    def _circuit_open_error(self, error: CircuitOpenError, start_index: int) -> dict:
+        return {"document_index": start_index, "error": f"Servicio de extracción no disponible temporalmente (reintentar en {error.retry_in:.0f}s)"}
+
+    def _parse_answer(self, text: str, page_count: int, start_index: int) -> list[dict]:
+        """Pages of a complete answer. A well-formed array (the usual case) is parsed at once;
+        anything else goes through the incremental parser to keep every page it can."""
+        if not text.strip():
+            ERRORS_TOTAL.inc(type="empty_response")
+            return [{"document_index": start_index, "error": "Empty response"}]
+        try:
+            items = JsonUtil.loads(text)
+        except json.JSONDecodeError:
+            items = None
+        if isinstance(items, dict):
+            items = [items]
+        if isinstance(items, list) and items:
+            return [self._validate_page(item, start_index + i) for i, item in enumerate(items)]
+
+        parser = JsonArrayStream()
+        results = [self._validate_page(item, start_index + i) for i, item in enumerate(parser.feed(text))]
+        return results + self._finish_pages(parser, len(results), page_count, start_index)
+
+    def _finish_pages(self, parser: JsonArrayStream, emitted: int, page_count: int, start_index: int) -> list[dict]:
+        """What follows the pages already taken from `parser` once the answer ended: a salvaged
+        last page and/or the error entry for the pages that never came."""
+        results = []
+        # A page cut off by a truncated answer is kept if at least its fields made it
+        for item in parser.finish():
+            if isinstance(item, dict) and "fields" in item:
+                results.append(self._validate_page(item, start_index + emitted))
+                emitted += 1
+
+        if emitted == 0:
+            ERRORS_TOTAL.inc(type="invalid_json")
+            results.append({"document_index": start_index, "error": "Invalid JSON response from LLM"})
+        elif parser.truncated and emitted < page_count:
+            ERRORS_TOTAL.inc(type="truncated_response")
+            missing = page_count - emitted
+            results.append({
+                "document_index": start_index + emitted,
+                "page_count": missing,
+                "error": f"Respuesta del modelo incompleta: faltan {missing} páginas",
+            })
+        return results
 
-        max_retries = 3
-        retry_delay = 2
-        
-        for attempt in range(max_retries):
-            try:
-                response = await model.generate_content_async(
-                    contents,
-                    generation_config={"response_mime_type": "application/json"}
-                )
-                
-                if response.text:
-                    text = response.text.strip()
-                    # Remove markdown code blocks if present
-                    if text.startswith("```"):
-                        lines = text.splitlines()
-                        if lines[0].startswith("```"):
-                            lines = lines[1:]
-                        if lines[-1].startswith("```"):
-                            lines = lines[:-1]
-                        text = "\n".join(lines).strip()
-                    
-                    try:
-                        result_data = json.loads(text)
-                    except json.JSONDecodeError:
-                        # Fallback for very simple errors or if there's trailing text
-                        print(f"JSON Decode Error for text: {text}")
-                        return [{"document_index": start_index, "error": "Invalid JSON response from LLM"}]
-
-                    # Force result to be a list if LLM returns a single object
-                    if isinstance(result_data, dict):
-                        return [result_data]
-                    return result_data
-                else:
-                    return [{"document_index": start_index, "error": "Empty response"}]
-
-
-            except Exception as e:
-                error_str = str(e)
-                if "FreeTier" in error_str or "PerDay" in error_str:
-                     print(f"Daily Quota Exceeded: {e}")
-                     raise e
-
-                if "429" in error_str or "ResourceExhausted" in error_str:
-                    if attempt < max_retries - 1:
-                        await asyncio.sleep(retry_delay)
-                        retry_delay *= 2
-                        continue
-                
-                print(f"Error processing documents starting at {start_index}: {e}")
-                return [{"document_index": start_index, "error": str(e)}]
-        
-        return [{"document_index": start_index, "error": "Max retries exceeded"}]
+    def _chunk_text(self, chunk) -> str:
+        try:
+            return chunk.text or ""
+        except ValueError:
+            # Chunks without text parts (e.g. only a finish reason)
+            return ""
 
+    def _validate_page(self, item, fallback_index: int) -> dict:
+        if item is INVALID_ELEMENT:
+            ERRORS_TOTAL.inc(type="invalid_page")
+            return {"document_index": fallback_index, "error": "Página con JSON inválido en la respuesta del modelo"}
+        if isinstance(item, dict):
+            # Missing or null: the prompt itself asks for null fields on unreadable pages
+            if item.get("document_index") is None:
+                item["document_index"] = fallback_index
+            if item.get("fields") is None:
+                item["fields"] = {}
+        try:
+            return ExtractedPage.model_validate(item).model_dump()
+        except ValidationError:
+            ERRORS_TOTAL.inc(type="invalid_page")
+            return {"document_index": fallback_index, "error": "Página con formato inválido en la respuesta del modelo"}
 
     async def extract_stream(self, documents_data: list[dict]):
         # Updated to match interface, though AnalyzeServiceImpl now uses extract_single_document directly in parallel
@@ -0,0 +1,87 @@
+import asyncio
+import hashlib
+import random
+import time
+from typing import Optional
+
+from app.integration.extraction_engine import ExtractionEngine
+from app.integration.rate_scheduler import RateScheduler
+from config.metrics_config import ERRORS_TOTAL, LLM_CALL_SECONDS, LLM_PAGE_SECONDS, STAGE_SECONDS
+
+
+class FakeExtractionEngine(ExtractionEngine):
+    """
+    Deterministic stand-in for the LLM, for load tests of /analyze/upload without quota.
+    Latency and failures are drawn from an RNG seeded with `seed` and the payload, so the
+    same document always gets the same latency, fields and outcome.
+
+    Latency distributions (mean `latency_ms` + `per_page_ms` per page):
+      "fixed"        exactly the mean
+      "uniform"      mean ± `jitter_ms`
+      "exponential"  long tail around the mean, like a busy remote API
+    """
+
+    DISTRIBUTIONS = ("fixed", "uniform", "exponential")
+
+    def __init__(
+        self,
+        scheduler: Optional[RateScheduler] = None,
+        latency_ms: int = 200,
+        per_page_ms: int = 0,
+        jitter_ms: int = 0,
+        distribution: str = "fixed",
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}', expected one of {self.DISTRIBUTIONS}")
+        self.scheduler = scheduler
+        self.latency_ms = latency_ms
+        self.per_page_ms = per_page_ms
+        self.jitter_ms = jitter_ms
+        self.distribution = distribution
+        self.error_rate = error_rate
+        self.seed = seed
+
+    async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
+        digest = hashlib.sha256(base64_data.encode("ascii")).hexdigest()
+        rng = random.Random(f"{self.seed}:{digest}")
+
+        delay = self._latency(rng, page_count) / 1000
+        failed = rng.random() < self.error_rate
+
+        started = time.perf_counter()
+        if self.scheduler is not None:
+            # Goes through the real admission control so its queueing shows up in benchmarks
+            async with self.scheduler.slot(tokens=page_count):
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(delay)
+        # Same series as the real model, so load tests exercise the dashboards too
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage="llm")
+        LLM_CALL_SECONDS.observe(elapsed, backend="fake", mime_type=mime_type)
+        LLM_PAGE_SECONDS.observe(elapsed / max(1, page_count), backend="fake")
+
+        if failed:
+            ERRORS_TOTAL.inc(type="simulated")
+            return [{"document_index": start_index, "error": "Simulated extraction error"}]
+        return [
+            {
+                "document_index": start_index + i,
+                "document_name": f"Documento simulado {digest[:8]} pág {i + 1}",
+                "fields": {"Hash": digest[:16], "Página": i + 1, "Tipo": mime_type},
+            }
+            for i in range(page_count)
+        ]
+
+    async def extract_stream(self, documents_data: list[dict]):
+        pass
+
+    def _latency(self, rng: random.Random, page_count: int) -> float:
+        mean = self.latency_ms + self.per_page_ms * page_count
+        if self.distribution == "uniform":
+            return max(0.0, rng.uniform(mean - self.jitter_ms, mean + self.jitter_ms))
+        if self.distribution == "exponential":
+            return rng.expovariate(1 / mean) if mean > 0 else 0.0
+        return float(mean)
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+from typing import Any, Optional
+
+import google.generativeai as genai
+
+from app.integration.impl.gemini_stub import StubGenerativeModel
+
+logger = logging.getLogger("app.integration.gemini_client_pool")
+
+
+class GeminiClientPool:
+    """
+    Long-lived GenerativeModel instances, one per (model name, generation config).
+    The SDK shares a single async gRPC client (one HTTP/2 channel) between them, so after
+    `warmup` no call pays for model construction or connection setup.
+    With `use_stub` the models are offline stubs that never touch the network.
+    """
+
+    # Startup must not hang on an unreachable API; the first request will retry anyway
+    WARMUP_TIMEOUT_SECONDS = 10
+
+    def __init__(self, api_key: str, use_stub: bool = False, stub_latency_ms: int = 0, stub_connect_ms: int = 0):
+        self.use_stub = use_stub
+        self.stub_latency_ms = stub_latency_ms
+        self.stub_connect_ms = stub_connect_ms
+        self._models: dict[tuple, Any] = {}
+        if not use_stub:
+            genai.configure(api_key=api_key)
+
+    def get(self, model_name: str, generation_config: Optional[dict] = None):
+        key = (model_name, tuple(sorted((generation_config or {}).items())))
+        model = self._models.get(key)
+        if model is None:
+            model = self._create(model_name, generation_config)
+            self._models[key] = model
+        return model
+
+    async def warmup(self, model_name: str, generation_config: Optional[dict] = None):
+        """Builds the model and opens its connection ahead of the first real request."""
+        model = self.get(model_name, generation_config)
+        try:
+            # count_tokens is free and forces the async client/channel to be created
+            await asyncio.wait_for(model.count_tokens_async("ping"), self.WARMUP_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Gemini warm-up failed for {model_name}: {e}")
+
+    def _create(self, model_name: str, generation_config: Optional[dict]):
+        if self.use_stub:
+            return StubGenerativeModel(model_name, latency_ms=self.stub_latency_ms, connect_ms=self.stub_connect_ms)
+        return genai.GenerativeModel(model_name, generation_config=generation_config)
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import re
+
+
+class StubResponse:
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class StubStreamResponse:
+    """Async iterable of text chunks, like the response of generate_content_async(stream=True)."""
+
+    def __init__(self, chunks: list[str], delay: float):
+        self.chunks = chunks
+        self.delay = delay
+
+    async def __aiter__(self):
+        for i, chunk in enumerate(self.chunks):
+            if i:
+                await asyncio.sleep(self.delay)
+            yield StubResponse(chunk)
+
+
+class StubGenerativeModel:
+    """
+    Offline stand-in for google.generativeai.GenerativeModel, for benchmarks and load tests.
+    Answers with one page object per requested page after `latency_ms`; the first call of
+    each instance also pays `connect_ms`, like opening a fresh connection would. With
+    `stream=True` the answer arrives one page per chunk, spread over the same latency.
+    """
+
+    PAGE_COUNT = re.compile(r"\((\d+) páginas\)")
+    START_INDEX = re.compile(r'"document_index":\s*(\d+)')
+
+    def __init__(self, model_name: str, latency_ms: int = 0, connect_ms: int = 0):
+        self.model_name = model_name
+        self.latency_ms = latency_ms
+        self.connect_ms = connect_ms
+        self._connected = False
+
+    async def _connect(self):
+        if not self._connected:
+            await asyncio.sleep(self.connect_ms / 1000)
+            self._connected = True
+
+    async def count_tokens_async(self, contents):
+        await self._connect()
+        return {"total_tokens": 1}
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False, **kwargs):
+        await self._connect()
+
+        prompt = contents[0] if isinstance(contents, list) else str(contents)
+        page_count = self.PAGE_COUNT.search(prompt)
+        start_index = self.START_INDEX.search(prompt)
+        page_count = int(page_count.group(1)) if page_count else 1
+        start_index = int(start_index.group(1)) if start_index else 1
+
+        pages = [
+            {
+                "document_index": start_index + i,
+                "document_name": f"Página simulada {start_index + i}",
+                "fields": {"Documento": "stub", "Página": start_index + i},
+            }
+            for i in range(page_count)
+        ]
+        if not stream:
+            await asyncio.sleep(self.latency_ms / 1000)
+            return StubResponse(json.dumps(pages, ensure_ascii=False))
+
+        # One chunk per page; the call returns with the first one, like the real client
+        chunks = [("," if i else "[") + json.dumps(page, ensure_ascii=False) for i, page in enumerate(pages)]
+        chunks[-1] += "]"
+        delay = self.latency_ms / 1000 / len(chunks)
+        await asyncio.sleep(delay)
+        return StubStreamResponse(chunks, delay)
@@ -0,0 +1,68 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.integration.shared_store import SharedStore, T, Updater
+
+
+class MemorySharedStore(SharedStore):
+    """
+    Dict in the current process: only "shared" by the coroutines of one worker. Fine for
+    development and single-process deployments; with several workers use the database store.
+    Values are kept as given, not copied.
+    """
+
+    # Expired keys are dropped every N writes (reads ignore them in between)
+    PURGE_EVERY = 1000
+
+    def __init__(self):
+        # key -> (expires at, or None, value)
+        self._data: Dict[str, Tuple[Optional[float], Any]] = {}
+        self._writes_since_purge = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._read(key, time.time())
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        self._write(key, value, ttl_seconds)
+
+    async def add(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        if self._read(key, time.time()) is not None:
+            return False
+        self._write(key, value, ttl_seconds)
+        return True
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def update(self, key: str, fn: Updater, ttl_seconds: Optional[float] = None) -> T:
+        # No await between the read and the write: atomic on the event loop
+        value, result = fn(self._read(key, time.time()))
+        if value is None:
+            self._data.pop(key, None)
+        else:
+            self._write(key, value, ttl_seconds)
+        return result
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "keys": len(self._data)}
+
+    def _read(self, key: str, now: float) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires is not None and expires <= now:
+            del self._data[key]
+            return None
+        return value
+
+    def _write(self, key: str, value: Any, ttl_seconds: Optional[float]):
+        now = time.time()
+        self._data[key] = (now + ttl_seconds if ttl_seconds else None, value)
+        self._writes_since_purge += 1
+        if self._writes_since_purge >= self.PURGE_EVERY:
+            self._writes_since_purge = 0
+            self._data = {
+                key: (expires, value) for key, (expires, value) in self._data.items()
+                if expires is None or expires > now
+            }
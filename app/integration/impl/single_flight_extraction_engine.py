@@ -0,0 +1,47 @@
+import copy
+from typing import Hashable, Optional
+
+from app.integration.extraction_engine import ExtractionEngine
+from app.integration.single_flight import SingleFlight
+
+
+class SingleFlightExtractionEngine(ExtractionEngine):
+    """
+    Concurrent requests for the same payload (a double-clicked upload, the same circular
+    uploaded by several users) share a single call to `engine`. The call is made with the
+    first caller's start index; every caller gets its own copy, shifted to its position.
+
+    The shared call runs in the first caller's context, so the rate scheduler queues and
+    charges it to that caller's tenant (`current_owner`): a follower from another tenant
+    waits behind the leader's fair share and is not charged for the call.
+    """
+
+    def __init__(self, engine: ExtractionEngine, flights: Optional[SingleFlight] = None):
+        self.engine = engine
+        self.flights = flights or SingleFlight("extraction")
+
+    def flight_key(self, base64_data: str, mime_type: str, page_count: int) -> Hashable:
+        # The payload itself, not a SHA-256 of it: flights only live while the call runs (the
+        # string is alive anyway), and the dict lookup's str hash is ~3x cheaper and exact
+        return mime_type, page_count, base64_data
+
+    async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
+        async def extract():
+            return start_index, await self.engine.extract_single_document(base64_data, mime_type, page_count, start_index)
+
+        leader_start, results = await self.flights.do(self.flight_key(base64_data, mime_type, page_count), extract)
+        # Always a copy, even at the leader's own index: callers may mutate what they get
+        return self._shift(results, start_index - leader_start)
+
+    async def warmup(self):
+        await self.engine.warmup()
+
+    async def extract_stream(self, documents_data: list[dict]):
+        return await self.engine.extract_stream(documents_data)
+
+    def _shift(self, results: list[dict], offset: int) -> list[dict]:
+        shifted = copy.deepcopy(results)
+        for item in shifted:
+            if isinstance(item, dict) and isinstance(item.get("document_index"), int):
+                item["document_index"] += offset
+        return shifted
@@ -0,0 +1,131 @@
+import time
+from typing import Any, Optional
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.domain.shared_state import SharedState
+from app.integration.shared_store import SharedStore, T, Updater
+from utl.json_util import JsonUtil
+
+
+class SqlSharedStore(SharedStore):
+    """
+    SharedStore on the application database (Postgres in production, SQLite locally), so
+    every worker process and node sees the same state. Only portable SQL is used: updates
+    are a compare-and-swap on the row version (retried when another process won the race)
+    and inserts rely on the primary key, the same way the job queue claims jobs.
+    """
+
+    # Expired rows are deleted every N writes of this process (reads ignore them in between)
+    PURGE_EVERY = 500
+    # Compare-and-swap retries before giving up on a heavily contended key
+    MAX_UPDATE_ATTEMPTS = 50
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+        self._writes_since_purge = 0
+        self._counters = {"reads": 0, "writes": 0, "conflicts": 0}
+
+    async def get(self, key: str) -> Optional[Any]:
+        self._counters["reads"] += 1
+        async with self.session_factory() as db:
+            row = (await db.execute(
+                select(SharedState.value, SharedState.expires).where(SharedState.key == key)
+            )).first()
+        if row is None or self._expired(row.expires, time.time()):
+            return None
+        return JsonUtil.loads(row.value)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        await self.update(key, lambda current: (value, None), ttl_seconds)
+
+    async def add(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        now = time.time()
+        values = {"value": JsonUtil.dumps(value), "version": 0, "expires": self._expires(now, ttl_seconds)}
+        async with self.session_factory() as db:
+            try:
+                await db.execute(insert(SharedState).values(key=key, **values))
+                await db.commit()
+                added = True
+            except IntegrityError:
+                await db.rollback()
+                # The key exists, but an expired row counts as missing
+                result = await db.execute(
+                    update(SharedState)
+                    .where(SharedState.key == key, SharedState.expires <= now)
+                    .values(**values)
+                )
+                await db.commit()
+                added = result.rowcount == 1
+        if added:
+            await self._wrote()
+        return added
+
+    async def delete(self, key: str) -> None:
+        async with self.session_factory() as db:
+            await db.execute(delete(SharedState).where(SharedState.key == key))
+            await db.commit()
+
+    async def update(self, key: str, fn: Updater, ttl_seconds: Optional[float] = None) -> T:
+        for _ in range(self.MAX_UPDATE_ATTEMPTS):
+            now = time.time()
+            async with self.session_factory() as db:
+                row = (await db.execute(
+                    select(SharedState.value, SharedState.version, SharedState.expires).where(SharedState.key == key)
+                )).first()
+                current = None if row is None or self._expired(row.expires, now) else JsonUtil.loads(row.value)
+                value, result = fn(current)
+
+                if row is None:
+                    if value is None:
+                        return result
+                    try:
+                        await db.execute(insert(SharedState).values(
+                            key=key, value=JsonUtil.dumps(value), version=0, expires=self._expires(now, ttl_seconds),
+                        ))
+                        await db.commit()
+                    except IntegrityError:
+                        # Another process created it first: start over from its value
+                        await db.rollback()
+                        self._counters["conflicts"] += 1
+                        continue
+                    await self._wrote()
+                    return result
+
+                same_version = (SharedState.key == key) & (SharedState.version == row.version)
+                if value is None:
+                    statement = delete(SharedState).where(same_version)
+                else:
+                    statement = update(SharedState).where(same_version).values(
+                        value=JsonUtil.dumps(value), version=row.version + 1, expires=self._expires(now, ttl_seconds),
+                    )
+                changed = await db.execute(statement)
+                await db.commit()
+                if changed.rowcount == 1:
+                    await self._wrote()
+                    return result
+                self._counters["conflicts"] += 1
+        raise RuntimeError(f"Shared store key '{key}' changed {self.MAX_UPDATE_ATTEMPTS} times while updating it")
+
+    def stats(self) -> dict:
+        return {"backend": "database", **self._counters}
+
+    async def _wrote(self):
+        self._counters["writes"] += 1
+        self._writes_since_purge += 1
+        if self._writes_since_purge < self.PURGE_EVERY:
+            return
+        self._writes_since_purge = 0
+        async with self.session_factory() as db:
+            await db.execute(delete(SharedState).where(SharedState.expires.is_not(None), SharedState.expires <= time.time()))
+            await db.commit()
+
+    @staticmethod
+    def _expires(now: float, ttl_seconds: Optional[float]) -> Optional[float]:
+        return now + ttl_seconds if ttl_seconds else None
+
+    @staticmethod
+    def _expired(expires: Optional[float], now: float) -> bool:
+        return expires is not None and expires <= now
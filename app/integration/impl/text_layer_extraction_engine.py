@@ -0,0 +1,54 @@
+import base64
+import logging
+from typing import Optional
+
+from app.integration.extraction_engine import ExtractionEngine
+from config.executor_config import run_cpu
+from utl.pdf_text_util import PdfTextUtil
+
+logger = logging.getLogger("app.integration.text_layer_engine")
+
+
+class TextLayerExtractionEngine(ExtractionEngine):
+    """
+    Extracts fields from the text layer of born-digital PDFs with a key-value heuristic,
+    without calling any model. Images and PDFs with a page below `min_chars` characters or
+    more than `max_image_coverage` of its area in images (scans, photos of paper) go to
+    `fallback`, or come back as an error when there is none.
+    """
+
+    def __init__(self, fallback: Optional[ExtractionEngine] = None, min_chars: int = 50, max_image_coverage: float = 0.3):
+        self.fallback = fallback
+        self.min_chars = min_chars
+        self.max_image_coverage = max_image_coverage
+
+    async def warmup(self):
+        if self.fallback:
+            await self.fallback.warmup()
+
+    async def extract_single_document(self, base64_data: str, mime_type: str, page_count: int, start_index: int) -> list[dict]:
+        if mime_type == "application/pdf":
+            try:
+                pages = await run_cpu(
+                    PdfTextUtil.extract_pages, base64.b64decode(base64_data), self.min_chars, self.max_image_coverage, fields=True,
+                )
+            except Exception as e:
+                logger.warning(f"Text layer unreadable for document at {start_index}: {e}")
+                pages = []
+
+            if pages and all(page["usable"] for page in pages):
+                return [
+                    {
+                        "document_index": start_index + i,
+                        "document_name": None,
+                        "fields": PdfTextUtil.page_fields(page),
+                    }
+                    for i, page in enumerate(pages)
+                ]
+
+        if self.fallback is None:
+            return [{"document_index": start_index, "error": "El documento no tiene capa de texto"}]
+        return await self.fallback.extract_single_document(base64_data, mime_type, page_count, start_index)
+
+    async def extract_stream(self, documents_data: list[dict]):
+        pass
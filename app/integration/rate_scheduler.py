@@ -0,0 +1,202 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# Identifies who is queueing work (the tenant, or one value per batch when it is unknown), used for fair queueing
+current_owner: ContextVar[str] = ContextVar("scheduler_owner", default="default")
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `per_minute / 60` tokens per second. 0 disables it."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    @property
+    def enabled(self) -> bool:
+        return self.capacity > 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they already are)."""
+        if not self.enabled:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        if self.enabled:
+            self.tokens -= min(amount, self.capacity)
+
+    def drain(self):
+        if self.enabled:
+            self.tokens = 0.0
+
+
+class RateScheduler:
+    """
+    Process-wide admission control for LLM calls.
+
+    Enforces a maximum number of in-flight calls plus requests-per-minute and
+    tokens-per-minute budgets. Waiters are queued per owner and served by weighted fair
+    queueing on their estimated tokens (start-time fair queueing), so one large batch cannot
+    starve concurrent requests and an owner with weight 2 gets twice the share of weight 1.
+    `max_in_flight_per_owner` (0 = no cap) keeps a single owner from holding every slot.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        max_in_flight_per_owner: int = 0,
+        weight_of: Optional[Callable[[str], float]] = None,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_in_flight_per_owner = max_in_flight_per_owner
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.weight_of = weight_of or (lambda owner: 1.0)
+
+        self._queues: "OrderedDict[str, Deque[Tuple[asyncio.Future, int]]]" = OrderedDict()
+        self._in_flight = 0
+        self._owner_in_flight: Dict[str, int] = {}
+        # Virtual finish time per owner and the start tag of the last dispatched call
+        self._finish_tags: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._counters = {"dispatched": 0, "penalties": 0, "wait_seconds": 0.0}
+
+    @asynccontextmanager
+    async def slot(self, tokens: int = 0, owner: Optional[str] = None):
+        owner = owner or current_owner.get()
+        await self.acquire(tokens, owner)
+        try:
+            yield
+        finally:
+            self.release(owner)
+
+    async def acquire(self, tokens: int = 0, owner: Optional[str] = None):
+        owner = owner or current_owner.get()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(owner, deque()).append((future, tokens))
+
+        started = time.monotonic()
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted right before the cancellation landed
+            if future.done() and not future.cancelled():
+                self.release(owner)
+            raise
+        self._counters["wait_seconds"] += time.monotonic() - started
+
+    def release(self, owner: Optional[str] = None):
+        owner = owner or current_owner.get()
+        self._in_flight -= 1
+        remaining = self._owner_in_flight.get(owner, 0) - 1
+        if remaining > 0:
+            self._owner_in_flight[owner] = remaining
+        else:
+            self._owner_in_flight.pop(owner, None)
+        self._dispatch()
+
+    def penalize(self, seconds: float):
+        """Stops dispatching for `seconds` (e.g. after a 429) and empties the request bucket."""
+        self._counters["penalties"] += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self.requests.drain()
+        self._schedule(seconds)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "max_in_flight_per_owner": self.max_in_flight_per_owner,
+            "owners_in_flight": len(self._owner_in_flight),
+            "queue_depth": self.queue_depth,
+            "queued_owners": len(self._queues),
+            "dispatched": self._counters["dispatched"],
+            "penalties": self._counters["penalties"],
+            "wait_seconds": round(self._counters["wait_seconds"], 3),
+        }
+
+    def _schedule(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self):
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule(self._paused_until - now)
+            return
+
+        while self._queues and self._in_flight < self.max_in_flight:
+            owner = self._next_owner()
+            if owner is None:
+                # Every waiting owner is at its own cap; a release will dispatch again
+                return
+            queue = self._queues[owner]
+            future, tokens = queue[0]
+            if future.cancelled():
+                queue.popleft()
+                if not queue:
+                    del self._queues[owner]
+                continue
+
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                self._schedule(wait)
+                return
+
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            queue.popleft()
+            if not queue:
+                del self._queues[owner]
+
+            # The owner's next call starts after this one "finishes" in virtual time, sooner for heavier weights
+            start_tag = max(self._finish_tags.get(owner, 0.0), self._virtual_time)
+            self._finish_tags[owner] = start_tag + max(1, tokens) / max(self.weight_of(owner), 0.01)
+            self._virtual_time = start_tag
+
+            self._in_flight += 1
+            self._owner_in_flight[owner] = self._owner_in_flight.get(owner, 0) + 1
+            self._counters["dispatched"] += 1
+            future.set_result(None)
+
+    def _next_owner(self) -> Optional[str]:
+        """Waiting owner (under its cap) with the smallest start tag; ties go to the longest waiting."""
+        best, best_tag = None, 0.0
+        for owner in self._queues:
+            if self.max_in_flight_per_owner and self._owner_in_flight.get(owner, 0) >= self.max_in_flight_per_owner:
+                continue
+            tag = max(self._finish_tags.get(owner, 0.0), self._virtual_time)
+            if best is None or tag < best_tag:
+                best, best_tag = owner, tag
+        # Owners that caught up with the virtual clock carry no state worth keeping
+        if len(self._finish_tags) > 1000:
+            self._finish_tags = {
+                owner: tag for owner, tag in self._finish_tags.items()
+                if tag > self._virtual_time or owner in self._queues
+            }
+        return best
@@ -0,0 +1,316 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from config.metrics_config import ERRORS_TOTAL, LLM_BACKOFF_SECONDS_TOTAL, LLM_RETRIES_TOTAL
+
+try:
+    from google.api_core import exceptions as google_exceptions
+except ImportError:  # optional: classification falls back to the error text
+    google_exceptions = None
+
+logger = logging.getLogger("app.integration.resilience")
+
+T = TypeVar("T")
+
+# Error kinds returned by `classify`
+RATE_LIMITED = "rate_limited"        # per-minute limits: retry after the hint / backoff
+QUOTA_EXHAUSTED = "quota_exhausted"  # daily / free-tier quota: retrying is pointless for hours
+TRANSIENT = "transient"              # 5xx, timeouts, dropped connections
+FATAL = "fatal"                      # bad request, auth, unknown: retrying won't help
+
+RETRY_IN = re.compile(r"retry in ([\d.]+)\s*s", re.IGNORECASE)
+RETRY_DELAY = re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)(?:\s*nanos:\s*(\d+))?", re.IGNORECASE)
+QUOTA_MARKERS = ("PerDay", "FreeTier")
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}, retry in {retry_in:.0f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+def classify(error: BaseException) -> str:
+    text = str(error)
+    if any(marker in text for marker in QUOTA_MARKERS):
+        return QUOTA_EXHAUSTED
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if google_exceptions is not None and isinstance(error, google_exceptions.GoogleAPICallError):
+        if isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)):
+            return RATE_LIMITED
+        if isinstance(error, (google_exceptions.ServerError, google_exceptions.DeadlineExceeded)):
+            return TRANSIENT
+        return FATAL
+    if "429" in text or "ResourceExhausted" in text:
+        return RATE_LIMITED
+    if any(code in text for code in ("500", "502", "503", "504", "Unavailable", "DeadlineExceeded")):
+        return TRANSIENT
+    return FATAL
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Server-provided retry hint: an HTTP Retry-After header, Gemini's RetryInfo
+    (`retry_delay { seconds: N }`) or its "Please retry in N s" message."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers:
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                pass  # HTTP-date form; fall through to the message
+
+    text = str(error)
+    match = RETRY_DELAY.search(text)
+    if match:
+        return int(match.group(1)) + int(match.group(2) or 0) / 1e9
+    match = RETRY_IN.search(text)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter: attempt n sleeps uniform(0, min(max_delay, base * 2**n))."""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures (or immediately through
+    `trip`), open -> half-open after the cool-down, where a single probe call decides
+    whether it closes again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, endpoint: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.endpoint = endpoint
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_until = 0.0
+        self._probing = False
+
+    def before_call(self):
+        if self.state == self.CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == self.OPEN and now >= self.opened_until:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        raise CircuitOpenError(self.endpoint, max(0.0, self.opened_until - now))
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trip(self.reset_timeout)
+
+    def abandon(self):
+        """The probe ended without telling anything about the endpoint (cancelled, bad request)."""
+        self._probing = False
+
+    def trip(self, seconds: float):
+        if self.state != self.OPEN:
+            logger.warning(f"Circuit for {self.endpoint} opened for {seconds:.0f}s")
+        self.state = self.OPEN
+        self.opened_until = max(self.opened_until, time.monotonic() + seconds)
+        self._probing = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "open_for_s": round(max(0.0, self.opened_until - time.monotonic()), 1) if self.state == self.OPEN else 0.0,
+        }
+
+
+class LatencyTracker:
+    """Recent call latencies, for the hedging threshold."""
+
+    def __init__(self, window: int = 200):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        # Too few samples to tell a slow call from a normal one
+        if len(self.samples) < 20:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Resilience:
+    """
+    Runs calls to remote endpoints with retries (full-jitter backoff, server hints first),
+    a circuit breaker per endpoint and optional hedging: when a call is slower than the
+    `hedge_percentile` of recent calls, a duplicate is started and the first to succeed wins.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        quota_open_seconds: float = 3600.0,
+        hedge_percentile: float = 0.0,
+        hedge_min_delay: float = 5.0,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.quota_open_seconds = quota_open_seconds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, LatencyTracker] = {}
+        self._counters = {
+            "calls": 0,
+            "attempts": 0,
+            "retries": 0,
+            "backoff_seconds": 0.0,
+            "rate_limited": 0,
+            "quota_exhausted": 0,
+            "transient_errors": 0,
+            "fatal_errors": 0,
+            "circuit_rejections": 0,
+            "hedges_started": 0,
+            "hedges_won": 0,
+        }
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, self.failure_threshold, self.reset_timeout)
+            self.breakers[endpoint] = breaker
+        return breaker
+
+    async def call(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        endpoint: str = "default",
+        on_rate_limited: Optional[Callable[[float], None]] = None,
+    ) -> T:
+        """Calls `fn` until it succeeds, fails with a non-retryable error or runs out of attempts.
+        `on_rate_limited(seconds)` is told about every rate-limit wait (e.g. to slow down a scheduler)."""
+        breaker = self.breaker(endpoint)
+        self._counters["calls"] += 1
+
+        for attempt in range(self.policy.max_attempts):
+            try:
+                breaker.before_call()
+            except CircuitOpenError:
+                self._counters["circuit_rejections"] += 1
+                ERRORS_TOTAL.inc(type="circuit_open")
+                raise
+
+            self._counters["attempts"] += 1
+            try:
+                result = await self._hedged(fn, endpoint)
+            except asyncio.CancelledError:
+                breaker.abandon()
+                raise
+            except Exception as e:
+                kind = classify(e)
+                hint = retry_after_seconds(e)
+                ERRORS_TOTAL.inc(type=kind)
+                if kind == QUOTA_EXHAUSTED:
+                    self._counters["quota_exhausted"] += 1
+                    # Fail fast for everyone until the quota comes back
+                    breaker.trip(max(hint or 0.0, self.quota_open_seconds))
+                    raise
+                if kind == FATAL:
+                    self._counters["fatal_errors"] += 1
+                    breaker.abandon()
+                    raise
+
+                if kind == RATE_LIMITED:
+                    # A 429 says the endpoint is up but busy: backoff handles it, the breaker must not open
+                    breaker.abandon()
+                    self._counters["rate_limited"] += 1
+                else:
+                    breaker.record_failure()
+                    self._counters["transient_errors"] += 1
+                if attempt == self.policy.max_attempts - 1:
+                    raise
+
+                # A server hint gets a little jitter too, so the waiting calls don't return in lockstep
+                delay = hint * random.uniform(1.0, 1.2) if hint is not None else self.policy.backoff(attempt)
+                delay = min(delay, max(self.policy.max_delay, hint or 0.0))
+                if kind == RATE_LIMITED and on_rate_limited is not None:
+                    on_rate_limited(delay)
+                self._counters["retries"] += 1
+                self._counters["backoff_seconds"] += delay
+                LLM_RETRIES_TOTAL.inc(reason=kind)
+                LLM_BACKOFF_SECONDS_TOTAL.inc(delay)
+                await asyncio.sleep(delay)
+                continue
+
+            breaker.record_success()
+            return result
+
+    async def _hedged(self, fn: Callable[[], Awaitable[T]], endpoint: str) -> T:
+        tracker = self.latencies.setdefault(endpoint, LatencyTracker())
+        threshold = tracker.percentile(self.hedge_percentile) if self.hedge_percentile else None
+        start = time.monotonic()
+        if threshold is None:
+            result = await fn()
+            tracker.record(time.monotonic() - start)
+            return result
+
+        primary = asyncio.ensure_future(fn())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=max(threshold, self.hedge_min_delay))
+            if not done:
+                self._counters["hedges_started"] += 1
+                tasks.add(asyncio.ensure_future(fn()))
+
+            # First success wins; if one copy fails, keep waiting for the other
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._counters["hedges_won"] += 1
+                        tracker.record(time.monotonic() - start)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            **{k: round(v, 2) if isinstance(v, float) else v for k, v in self._counters.items()},
+            "breakers": {endpoint: breaker.stats() for endpoint, breaker in self.breakers.items()},
+        }
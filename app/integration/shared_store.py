@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# fn(current value or None) -> (new value or None to delete, result for the caller)
+Updater = Callable[[Optional[Any]], Tuple[Optional[Any], T]]
+
+
+class SharedStore(ABC):
+    """
+    Key/value state that every worker process (and node) must see the same way: users,
+    rate-limit buckets, cached results. Values are JSON-serializable and expire after
+    `ttl_seconds` when one is given; an expired key reads as missing.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        pass
+
+    @abstractmethod
+    async def add(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """Stores `value` only if the key is missing; False when it already existed."""
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    async def update(self, key: str, fn: Updater, ttl_seconds: Optional[float] = None) -> T:
+        """
+        Atomic read-modify-write: `fn` may run more than once when another process changed
+        the key in between, so it must not have side effects.
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        pass
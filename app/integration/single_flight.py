@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+from config.metrics_config import SINGLE_FLIGHT_TOTAL
+
+T = TypeVar("T")
+
+
+class _Flight:
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller starts `fn`, callers that
+    arrive while it is running wait for the same result (or exception). The key is forgotten
+    as soon as the call finishes, so this deduplicates in-flight work only; it is not a cache.
+
+    A caller that goes away does not cancel the call for the others; the call is cancelled
+    when its last caller does.
+    """
+
+    def __init__(self, scope: str):
+        self.scope = scope
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._counters = {"leaders": 0, "shared": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self._counters["leaders"] += 1
+            SINGLE_FLIGHT_TOTAL.inc(scope=self.scope, role="leader")
+        else:
+            self._counters["shared"] += 1
+            SINGLE_FLIGHT_TOTAL.inc(scope=self.scope, role="shared")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        # Nobody may be left to retrieve it; avoid "exception was never retrieved" warnings
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "in_flight": len(self._flights)}
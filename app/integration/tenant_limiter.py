@@ -0,0 +1,105 @@
+import time
+from typing import Optional
+
+from app.integration.shared_store import SharedStore
+from config.metrics_config import TENANT_REJECTIONS_TOTAL
+
+ACTIVE_KEY = "tenant:{tenant}:uploads"
+BUDGET_KEY = "tenant:{tenant}:pages"
+
+
+class TenantLimiter:
+    """
+    Per-tenant admission for uploads, checked before any file is prepared: at most
+    `max_concurrent` uploads streaming at once, and a budget of `pages_per_minute`
+    (0 disables either). Both live in the shared store, so the limits hold across worker
+    processes instead of being multiplied by their number.
+
+    The page budget is a bucket refilled continuously that is allowed to go into debt: a
+    document larger than what is left is admitted when it fits the full budget, and the
+    tenant then waits until the debt is paid back. Every check answers None (admitted) or
+    the seconds after which retrying makes sense.
+    """
+
+    # No way to know when a running upload ends; clients are told to come back after this
+    BUSY_RETRY_AFTER_SECONDS = 5.0
+    # A worker killed mid-upload never calls `leave`; its count expires instead
+    ACTIVE_TTL_SECONDS = 3600
+
+    def __init__(self, store: SharedStore, max_concurrent: int = 0, pages_per_minute: int = 0):
+        self.store = store
+        self.max_concurrent = max_concurrent
+        self.pages_per_minute = pages_per_minute
+        # Uploads admitted by this process, for stats only
+        self._active_here = 0
+
+    @property
+    def pages_enabled(self) -> bool:
+        return self.pages_per_minute > 0
+
+    async def try_enter(self, tenant: str) -> Optional[float]:
+        """Admits a new upload, or returns the retry hint. Admitted uploads must `leave`."""
+        if self.pages_enabled:
+            pages = self._refill(await self.store.get(BUDGET_KEY.format(tenant=tenant)), time.time())
+            if pages <= 0:
+                TENANT_REJECTIONS_TOTAL.inc(reason="pages_quota")
+                return self._seconds_until(1 - pages)
+        if self.max_concurrent:
+            admitted = await self.store.update(ACTIVE_KEY.format(tenant=tenant), self._enter, self.ACTIVE_TTL_SECONDS)
+            if not admitted:
+                TENANT_REJECTIONS_TOTAL.inc(reason="concurrency")
+                return self.BUSY_RETRY_AFTER_SECONDS
+        self._active_here += 1
+        return None
+
+    async def leave(self, tenant: str):
+        self._active_here -= 1
+        if self.max_concurrent:
+            await self.store.update(ACTIVE_KEY.format(tenant=tenant), self._leave, self.ACTIVE_TTL_SECONDS)
+
+    async def reserve_pages(self, tenant: str, pages: int) -> Optional[float]:
+        if not self.pages_enabled:
+            return None
+        # Worst case the bucket ends `pages` in debt; once refilled it is the same as no bucket at all
+        ttl_seconds = self._seconds_until(self.pages_per_minute + pages)
+        retry_after = await self.store.update(
+            BUDGET_KEY.format(tenant=tenant), lambda bucket: self._reserve(bucket, pages), ttl_seconds,
+        )
+        if retry_after is not None:
+            TENANT_REJECTIONS_TOTAL.inc(reason="pages_quota")
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "pages_per_minute": self.pages_per_minute,
+            "active_uploads_this_worker": self._active_here,
+            "store": self.store.stats(),
+        }
+
+    def _enter(self, active: Optional[int]):
+        active = active or 0
+        if active >= self.max_concurrent:
+            return active, False
+        return active + 1, True
+
+    def _leave(self, active: Optional[int]):
+        remaining = (active or 0) - 1
+        return (remaining if remaining > 0 else None), None
+
+    def _refill(self, bucket: Optional[dict], now: float) -> float:
+        if bucket is None:
+            return float(self.pages_per_minute)
+        elapsed = max(0.0, now - bucket["updated"])
+        return min(float(self.pages_per_minute), bucket["pages"] + elapsed * self.pages_per_minute / 60)
+
+    def _reserve(self, bucket: Optional[dict], pages: int):
+        now = time.time()
+        available = self._refill(bucket, now)
+        needed = min(pages, self.pages_per_minute)
+        if available < needed:
+            return bucket, self._seconds_until(needed - available)
+        return {"pages": available - pages, "updated": now}, None
+
+    def _seconds_until(self, pages: float) -> float:
+        return pages * 60 / self.pages_per_minute
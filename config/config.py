@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -11,6 +11,138 @@ class Settings(BaseSettings):
     # LLM_BASE_URL no longer needed for Gemini by default, but kept or refactored if needed.
     # LLM_BASE_URL: str = "https://generativelanguage.googleapis.com" 
     LLM_MODEL_NAME: str = "gemini-2.5-flash"
+    # Bump whenever the extraction prompts change so cached results are not reused
+    LLM_PROMPT_VERSION: str = "1"
+
+    # Gemini admission control per process; the per-minute budgets are for the whole node and
+    # split between its WEB_WORKERS (0 disables a per-minute budget)
+    LLM_MAX_IN_FLIGHT: int = 8
+    LLM_REQUESTS_PER_MINUTE: int = 0
+    LLM_TOKENS_PER_MINUTE: int = 0
+    # Gemini bills ~258 tokens per PDF page / image, rounded up for the token budget estimate
+    LLM_ESTIMATED_TOKENS_PER_PAGE: int = 300
+
+    # Model call retries: exponential backoff with full jitter (server retry hints take precedence)
+    LLM_RETRY_MAX_ATTEMPTS: int = 4
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 30.0
+    # Circuit breaker per model: opens after N consecutive failures, or at once when the daily quota is gone
+    LLM_BREAKER_FAILURE_THRESHOLD: int = 5
+    LLM_BREAKER_RESET_SECONDS: float = 30.0
+    LLM_BREAKER_QUOTA_OPEN_SECONDS: float = 3600.0
+    # Hedging: duplicate a call slower than this percentile of recent calls (0 disables; costs quota)
+    LLM_HEDGE_PERCENTILE: float = 0.0
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 5.0
+
+    # Extraction backend: "gemini", "fake" (offline, for load tests) or "text_layer" (PDF text, no LLM)
+    EXTRACTION_BACKEND: str = "gemini"
+    # Backend for scans/images under "text_layer" (empty: they fail instead)
+    TEXT_LAYER_FALLBACK_BACKEND: str = "gemini"
+    # A PDF page needs at least this many text-layer characters to count as born-digital
+    TEXT_LAYER_MIN_CHARS: int = 50
+    # ...and images covering at most this share of it (scans with a stamped or OCR'd line stay PDF)
+    TEXT_LAYER_MAX_IMAGE_COVERAGE: float = 0.3
+    # "fake" backend: mean latency (+ per page), distribution ("fixed", "uniform", "exponential"), error rate and seed
+    FAKE_ENGINE_LATENCY_MS: int = 200
+    FAKE_ENGINE_PER_PAGE_MS: int = 0
+    FAKE_ENGINE_JITTER_MS: int = 0
+    FAKE_ENGINE_DISTRIBUTION: str = "fixed"
+    FAKE_ENGINE_ERROR_RATE: float = 0.0
+    FAKE_ENGINE_SEED: int = 0
+
+    # Open the Gemini connection at startup instead of on the first upload
+    LLM_WARMUP_ENABLED: bool = True
+    # Offline Gemini stub for benchmarks: no network, fixed latency per call / per new client
+    LLM_USE_STUB: bool = False
+    LLM_STUB_LATENCY_MS: int = 0
+    LLM_STUB_CONNECT_MS: int = 0
+
+    # PDFs longer than this are split into shards of this many pages and extracted concurrently (0 disables)
+    PDF_SHARD_PAGES: int = 10
+    # Born-digital PDF pages: "llm" sends their text layer to the model instead of the PDF,
+    # "heuristic" extracts them locally without the model, "off" sends every page as PDF
+    PDF_TEXT_TRIAGE: str = "llm"
+    # Extra attempts for a shard that came back with an error, without re-running the other shards
+    PDF_SHARD_MAX_RETRIES: int = 1
+
+    # Background extraction jobs (/analyze/jobs): workers inside the API process. Off by
+    # default so API processes don't poll the jobs table; run `python worker.py` instead
+    JOB_WORKERS: int = 0
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    # Idle workers double their poll interval up to this while the queue stays empty
+    JOB_MAX_POLL_INTERVAL_SECONDS: float = 10.0
+    # A running job whose worker hasn't renewed its lease for this long is picked up again
+    JOB_LEASE_SECONDS: int = 120
+    JOB_MAX_ATTEMPTS: int = 3
+    # Job events are written in batches at most this often
+    JOB_EVENT_FLUSH_SECONDS: float = 0.5
+
+    # Images are auto-rotated, downscaled and re-encoded before being sent to the LLM
+    IMAGE_OPTIMIZE_ENABLED: bool = True
+    IMAGE_MAX_LONG_EDGE: int = 2048
+    IMAGE_MAX_DPI: int = 300
+    IMAGE_OUTPUT_FORMAT: str = "WEBP"
+    IMAGE_QUALITY: int = 85
+
+    # Executor for CPU-bound document preparation: "thread", "process" or "inline" (0 workers = one per core)
+    CPU_EXECUTOR_KIND: str = "thread"
+    CPU_EXECUTOR_WORKERS: int = 0
+
+    # Database connection pool
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # "transaction": behind a transaction-mode pooler such as pgbouncer / Supabase :6543 (no prepared statement cache)
+    # "direct": straight to Postgres (:5432), asyncpg caches prepared statements
+    DB_POOLER_MODE: str = "transaction"
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
+    DOCUMENT_LIST_DEFAULT_LIMIT: int = 100
+    DOCUMENT_LIST_MAX_LIMIT: int = 500
+    # Rows fetched per round-trip by the server-side cursor of /document/export
+    DOCUMENT_EXPORT_BATCH_SIZE: int = 500
+
+    # Uploads are spooled in memory up to this size (bytes) and then moved to a temp file
+    UPLOAD_SPOOL_MAX_SIZE: int = 1024 * 1024
+    UPLOAD_MAX_FILES: int = 100
+
+    # Extraction result cache: in-process LRU + SQLite file (empty path disables the disk tier);
+    # EXTRACTION_CACHE_SHARED replaces the SQLite file with the shared store, for several nodes
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_SHARED: bool = False
+    EXTRACTION_CACHE_MEMORY_ENTRIES: int = 512
+    EXTRACTION_CACHE_DISK_ENTRIES: int = 50000
+    EXTRACTION_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    EXTRACTION_CACHE_PATH: str = ".cache/extraction_cache.sqlite3"
+
+    # Per-tenant limits (tenant = authenticated user, else client IP; 0 disables each limit):
+    # concurrent /analyze/upload streams, pages per minute and concurrent model calls
+    TENANT_MAX_CONCURRENT_UPLOADS: int = 0
+    TENANT_PAGES_PER_MINUTE: int = 0
+    TENANT_MAX_IN_FLIGHT: int = 0
+    # Fair-share weights for the model scheduler, e.g. {"user:ops@empresa.com": 3}; default 1
+    TENANT_WEIGHTS: Dict[str, float] = {}
+
+    # Concurrent uploads of the same bytes share one preparation and one model call
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # State shared by all worker processes (users, tenant quotas): "memory" only works with a
+    # single process, "database" keeps it in the app database
+    SHARED_STORE_BACKEND: str = "memory"
+
+    # Production server (python server.py): uvicorn worker processes (0 = one per core);
+    # each one runs its own event loop, CPU executor and JOB_WORKERS
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 8000
+    WEB_WORKERS: int = 1
+    # Create missing tables at startup; server.py does it once before starting the workers
+    DB_CREATE_TABLES_ON_STARTUP: bool = True
+
+    # Prometheus metrics: per-stage timings and counters, scraped from GET /metrics
+    METRICS_ENABLED: bool = False
 
     model_config = SettingsConfigDict(
         env_file=".env",
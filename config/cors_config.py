@@ -10,4 +10,6 @@ def setup_cors(app: FastAPI):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
-    )
\ No newline at end of file
+        # Lets browsers read the pagination cursor of /document/list
+        expose_headers=["X-Next-Cursor"],
+    )
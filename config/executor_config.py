@@ -0,0 +1,41 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Callable, Optional
+
+from config.config import settings
+
+
+@lru_cache()
+def get_cpu_executor() -> Optional[Executor]:
+    """
+    Pool used for CPU-heavy document work (PyMuPDF, Pillow, base64). Configured with
+    CPU_EXECUTOR_KIND ("thread", "process" or "inline" to run on the event loop) and
+    CPU_EXECUTOR_WORKERS (0 = one per core).
+    """
+    kind = settings.CPU_EXECUTOR_KIND.lower()
+    if kind == "inline":
+        return None
+
+    workers = settings.CPU_EXECUTOR_WORKERS or os.cpu_count() or 1
+    if kind == "process":
+        # spawn: forking a process that already runs an event loop and threads is unsafe
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cpu-worker")
+
+
+async def run_cpu(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Runs `fn` in the CPU executor. With a process pool, `fn` and its arguments must be picklable."""
+    executor = get_cpu_executor()
+    if executor is None:
+        return fn(*args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args, **kwargs))
+
+
+def shutdown_cpu_executor():
+    executor = get_cpu_executor()
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+    get_cpu_executor.cache_clear()
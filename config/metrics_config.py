@@ -0,0 +1,51 @@
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from config.config import settings
+from utl.metrics import MetricsRegistry
+
+metrics = MetricsRegistry(enabled=settings.METRICS_ENABLED)
+
+# Pipeline stages: file_read, validation, prepare (split/optimize/base64), llm, json_parse, db_save
+STAGE_SECONDS = metrics.histogram("analyze_stage_seconds", "Time spent in each stage of the analyze pipeline", ["stage"])
+LLM_CALL_SECONDS = metrics.histogram("llm_call_seconds", "Extraction model latency per call, retries included", ["backend", "mime_type"])
+LLM_FIRST_PAGE_SECONDS = metrics.histogram("llm_first_page_seconds", "Time until the first page of a streamed model answer", ["backend"])
+LLM_PAGE_SECONDS = metrics.histogram("llm_page_seconds", "Extraction model latency per call divided by its pages", ["backend"])
+
+PAGES_TOTAL = metrics.counter("analyze_pages_total", "Pages processed by the analyze pipeline", ["outcome"])
+ERRORS_TOTAL = metrics.counter("analyze_errors_total", "Analyze pipeline errors", ["type"])
+LLM_RETRIES_TOTAL = metrics.counter("llm_retries_total", "Extraction model calls retried", ["reason"])
+LLM_BACKOFF_SECONDS_TOTAL = metrics.counter("llm_backoff_seconds_total", "Time spent backing off between model retries")
+CACHE_LOOKUPS_TOTAL = metrics.counter("extraction_cache_lookups_total", "Extraction cache lookups", ["result"])
+TENANT_REJECTIONS_TOTAL = metrics.counter("tenant_rejections_total", "Uploads or files turned away by per-tenant limits", ["reason"])
+SINGLE_FLIGHT_TOTAL = metrics.counter("single_flight_calls_total", "Calls that started work (leader) or joined an identical in-flight call (shared)", ["scope", "role"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def setup_metrics(app: FastAPI):
+    if not settings.METRICS_ENABLED:
+        return
+
+    # Imported here: the dependencies pull in the whole service graph
+    from app.core.dependencies.dependencies_analyze import get_extraction_cache, get_rate_scheduler, get_resilience
+    from config.database_config import get_pool_stats
+
+    metrics.gauge("db_pool_connections", "Database pool connections", lambda: {
+        (state,): value for state, value in get_pool_stats().items() if state in ("size", "checked_out", "overflow", "checked_in")
+    }, ["state"])
+    metrics.gauge("llm_scheduler_calls", "Model calls in the rate scheduler", lambda: {
+        ("in_flight",): get_rate_scheduler().stats()["in_flight"],
+        ("queued",): get_rate_scheduler().stats()["queue_depth"],
+    }, ["state"])
+    metrics.gauge("llm_circuit_open", "1 while the circuit breaker of a model endpoint is open", lambda: {
+        (endpoint,): int(breaker.state != breaker.CLOSED) for endpoint, breaker in get_resilience().breakers.items()
+    }, ["endpoint"])
+    if settings.EXTRACTION_CACHE_ENABLED:
+        metrics.gauge("extraction_cache_memory_entries", "Entries in the in-process extraction cache", lambda: {
+            (): get_extraction_cache().stats()["memory_size"],
+        })
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics_endpoint():
+        return PlainTextResponse(metrics.expose(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,6 +3,8 @@ from fastapi import FastAPI
 from app.auth.api import router as auth_router
 from app.core.api import analyze_router, document_router
 from config.config import settings
+from config.database_config import get_pool_stats
+from config.metrics_config import setup_metrics
 from core.exceptions import setup_exception_handlers
 
 def setup_routes(app: FastAPI):
@@ -10,7 +12,12 @@ def setup_routes(app: FastAPI):
     app.include_router(analyze_router.router, prefix="/analyze", tags=["Analyze"])
     app.include_router(document_router.router, prefix="/document", tags=["Document"])
     setup_exception_handlers(app)
+    setup_metrics(app)
     
     @app.get("/")
     async def root():
-        return {"message": f"Welcome to {settings.PROJECT_NAME}"}
\ No newline at end of file
+        return {"message": f"Welcome to {settings.PROJECT_NAME}"}
+
+    @app.get("/health/db")
+    async def db_health():
+        return get_pool_stats()
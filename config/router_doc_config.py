@@ -1,9 +1,22 @@
+from typing import Any
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from config.config import settings
+from utl.json_util import JsonUtil
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with JsonUtil: orjson when installed, stdlib json for what orjson
+    can't encode (integers beyond 64 bits) instead of a 500."""
+
+    def render(self, content: Any) -> bytes:
+        return JsonUtil.dumps_bytes(content)
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url=f"/docs",
     redoc_url=f"/redoc",
+    default_response_class=FastJSONResponse,
 )
@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+from app.integration.impl.memory_shared_store import MemorySharedStore
+from app.integration.impl.sql_shared_store import SqlSharedStore
+from app.integration.shared_store import SharedStore
+from config.config import settings
+from config.database_config import AsyncSessionLocal
+
+
+@lru_cache()
+def get_shared_store() -> SharedStore:
+    """
+    State every worker process must agree on (users, tenant quotas, optionally the extraction
+    cache). SHARED_STORE_BACKEND: "memory" (this process only) or "database" (the app database).
+    """
+    backend = settings.SHARED_STORE_BACKEND.lower()
+    if backend == "memory":
+        return MemorySharedStore()
+    if backend == "database":
+        return SqlSharedStore(AsyncSessionLocal)
+    raise ValueError(f"Unknown shared store backend '{settings.SHARED_STORE_BACKEND}', expected 'memory' or 'database'")
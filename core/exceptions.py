@@ -2,22 +2,31 @@
 from fastapi import Request, status, FastAPI
 from fastapi.responses import JSONResponse
 import logging
+import math
+from typing import Dict, Optional
 
 logger = logging.getLogger("app.core.exceptions")
 
 class AppBaseException(Exception):
-    def __init__(self, message: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR):
+    def __init__(self, message: str, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR, headers: Optional[Dict[str, str]] = None):
         self.message = message
         self.status_code = status_code
+        self.headers = headers
 
 class NotFoundException(AppBaseException):
     def __init__(self, message: str = "Resource not found"):
         super().__init__(message, status_code=status.HTTP_404_NOT_FOUND)
 
+class TooManyRequestsException(AppBaseException):
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message, status_code=status.HTTP_429_TOO_MANY_REQUESTS, headers={"Retry-After": str(math.ceil(retry_after))})
+        self.retry_after = retry_after
+
 async def app_exception_handler(request: Request, exc: AppBaseException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.message},
+        headers=exc.headers,
     )
 
 async def global_exception_handler(request: Request, exc: Exception):
@@ -14,4 +14,9 @@ class DocumentRequest(BaseModel):
     isEncrypted: Optional[bool] = None
 
     class Config:
-        orm_mode = True 
\ No newline at end of file
+        orm_mode = True
+
+
+class DocumentPage(BaseModel):
+    items: List[dict]
+    next_cursor: Optional[str] = None
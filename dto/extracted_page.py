@@ -0,0 +1,9 @@
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class ExtractedPage(BaseModel):
+    """One page object of the extraction model's JSON output."""
+    document_index: int
+    document_name: Optional[str] = None
+    fields: Dict[str, Any] = Field(default_factory=dict)
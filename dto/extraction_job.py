@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import List, Optional
+from uuid import UUID
+from pydantic import BaseModel
+
+
+class ExtractionJobResponse(BaseModel):
+    job_id: UUID
+    status: str
+    attempts: int = 0
+    file_count: int = 0
+    created: Optional[datetime] = None
+    started: Optional[datetime] = None
+    finished: Optional[datetime] = None
+    error: Optional[str] = None
+    # Filled from the job's events: pages extracted so far, page-level errors and the final summary
+    documents: List[dict] = []
+    errors: List[str] = []
+    summary: Optional[dict] = None
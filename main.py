@@ -1,9 +1,15 @@
 from app.core.domain.document import Base
+from app.core.domain import extraction_job  # noqa: F401  (registers the job tables on Base)
+from app.core.domain import shared_state  # noqa: F401  (registers the shared store table on Base)
 from config.app_logging import setup_logging
 from config.router_doc_config import app
 from config.cors_config import setup_cors
 from config.router_config import setup_routes
 from config.database_config import engine
+from config.config import settings
+from config.executor_config import shutdown_cpu_executor
+from app.core.dependencies.dependencies_analyze import get_extraction_engine
+from app.core.dependencies.dependencies_job import get_extraction_job_worker_pool
 from sqlalchemy.ext.asyncio import AsyncSession
 
 setup_logging()
@@ -13,11 +19,27 @@ setup_routes(app)
 async def init_models():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all only adds indexes along with new tables; make sure existing tables get them too
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
 
 @app.on_event("startup")
 async def on_startup():
-    await init_models()
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        await init_models()
+    if settings.LLM_WARMUP_ENABLED:
+        await get_extraction_engine().warmup()
+    if settings.JOB_WORKERS > 0:
+        get_extraction_job_worker_pool().start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Running jobs are handed back to the queue for another worker
+    await get_extraction_job_worker_pool().stop()
+    shutdown_cpu_executor()
 
 if __name__ == "__main__":
+    # Development server with auto-reload; production runs `python server.py`
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
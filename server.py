@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import os
+import sys
+
+import uvicorn
+
+from config.app_logging import setup_logging
+from config.config import settings
+
+# Production entrypoint: WEB_WORKERS uvicorn processes behind one port, no auto-reload.
+# Usage: python server.py [workers]   (0 = one per core)
+
+logger = logging.getLogger("app.server")
+
+
+def main():
+    setup_logging()
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else settings.WEB_WORKERS
+    workers = workers or os.cpu_count() or 1
+
+    if workers > 1 and settings.SHARED_STORE_BACKEND.lower() == "memory":
+        logger.warning(
+            "SHARED_STORE_BACKEND=memory with %s workers: users and tenant limits are not shared "
+            "between them, set SHARED_STORE_BACKEND=database", workers,
+        )
+
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        # Once, here: concurrent CREATE TABLE from every worker races on Postgres
+        from config.database_config import engine
+        from main import init_models
+
+        async def create_tables():
+            await init_models()
+            await engine.dispose()
+        asyncio.run(create_tables())
+
+    # Workers are spawned processes that read their settings from the environment again
+    os.environ["WEB_WORKERS"] = str(workers)
+    os.environ["DB_CREATE_TABLES_ON_STARTUP"] = "false"
+    if settings.CPU_EXECUTOR_KIND.lower() == "process" and not settings.CPU_EXECUTOR_WORKERS:
+        # One process pool per worker: share the cores instead of each taking all of them
+        os.environ["CPU_EXECUTOR_WORKERS"] = str(max(1, (os.cpu_count() or 1) // workers))
+
+    uvicorn.run(
+        "main:app",
+        host=settings.WEB_HOST,
+        port=settings.WEB_PORT,
+        workers=workers,
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    main()
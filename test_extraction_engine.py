@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+
+os.environ.setdefault("LLM_API_KEY", "test")
+
+from app.integration.impl.extraction_engine_impl import ExtractionEngineImpl
+from app.integration.impl.gemini_client_pool import GeminiClientPool
+from app.integration.impl.gemini_stub import StubResponse, StubStreamResponse
+
+# The model is told to answer unreadable pages with null fields; those pages must come
+# through as pages (empty fields, local index), not as "Página con formato inválido".
+PAGES = [
+    {"document_index": 1, "document_name": "Factura", "fields": {"Total": "100.00"}},
+    {"document_index": None, "document_name": "Ilegible", "fields": None},
+    {"document_index": 3, "document_name": None, "fields": {"RUC": "20123456789"}},
+]
+
+
+class ChunkedModel:
+    """Answers with PAGES, one page object per chunk when streaming."""
+
+    async def generate_content_async(self, contents, stream=False, **kwargs):
+        if not stream:
+            return StubResponse(json.dumps(PAGES))
+        chunks = [("," if i else "[") + json.dumps(page) for i, page in enumerate(PAGES)]
+        chunks[-1] += "]"
+        return StubStreamResponse(chunks, 0)
+
+
+class ChunkedPool(GeminiClientPool):
+
+    def __init__(self):
+        super().__init__(api_key="test", use_stub=True)
+
+    def get(self, model_name, generation_config=None):
+        return ChunkedModel()
+
+
+def check_pages(results):
+    assert [r.get("error") for r in results] == [None, None, None]
+    assert [r["document_index"] for r in results] == [1, 2, 3]
+    assert results[1]["fields"] == {}
+    assert results[1]["document_name"] == "Ilegible"
+    assert results[2]["fields"] == {"RUC": "20123456789"}
+
+
+def test_streamed_array_with_null_index_and_fields():
+    engine = ExtractionEngineImpl(client_pool=ChunkedPool())
+
+    async def collect():
+        return [page async for page in engine.extract_document_stream("", "application/pdf", len(PAGES), 1)]
+
+    check_pages(asyncio.run(collect()))
+
+
+def test_whole_answer_with_null_index_and_fields():
+    engine = ExtractionEngineImpl(client_pool=ChunkedPool())
+    check_pages(asyncio.run(engine.extract_single_document("", "application/pdf", len(PAGES), 1)))
+
+
+if __name__ == "__main__":
+    test_streamed_array_with_null_index_and_fields()
+    test_whole_answer_with_null_index_and_fields()
+    print("OK")
@@ -0,0 +1,45 @@
+import json
+import os
+
+os.environ.setdefault("LLM_API_KEY", "test")
+
+from fastapi.testclient import TestClient
+
+from config.router_doc_config import FastJSONResponse, app
+from utl.json_util import JsonUtil
+
+# Unquoted numeric IDs from the model (accounts, CCI) can exceed 64 bits; orjson loads them as
+# floats and refuses to dump them. They must keep every digit and never 500 a response.
+BIG = 12345678901234567890123
+CCI = 98765432109876543210
+
+
+def test_loads_keeps_every_digit():
+    text = '{"Cuenta": 12345678901234567890123, "CCI": 98765432109876543210, "Total": 10.5}'
+    assert JsonUtil.loads(text) == {"Cuenta": BIG, "CCI": CCI, "Total": 10.5}
+    assert JsonUtil.loads(text.encode("utf-8"))["CCI"] == CCI
+
+
+def test_dumps_big_integers():
+    data = {"fields": {"Cuenta": BIG, "CCI": CCI, "Titular": "Año 2024"}}
+    assert json.loads(JsonUtil.dumps(data)) == data
+    assert json.loads(JsonUtil.dumps_bytes(data)) == data
+    assert "Año" in JsonUtil.dumps(data)
+
+
+def test_default_response_class_renders_big_integers():
+    @app.get("/_test/big-int")
+    async def big_int():
+        return {"CCI": CCI}
+
+    response = TestClient(app).get("/_test/big-int")
+    assert response.status_code == 200
+    assert response.text == '{"CCI":98765432109876543210}'
+    assert FastJSONResponse({"CCI": CCI}).body == b'{"CCI":98765432109876543210}'
+
+
+if __name__ == "__main__":
+    test_loads_keeps_every_digit()
+    test_dumps_big_integers()
+    test_default_response_class_renders_big_integers()
+    print("OK")
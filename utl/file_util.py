@@ -1,8 +1,41 @@
+import asyncio
 import base64
 import fitz  # PyMuPDF
 import io
-from PIL import Image, UnidentifiedImageError
+from typing import Optional
+from PIL import Image, ImageOps, UnidentifiedImageError
 from fastapi import UploadFile
+from pydantic import BaseModel
+
+
+class FileDescriptor(BaseModel):
+    """Result of inspecting an uploaded file once; reused by every later preparation step."""
+    kind: str  # "pdf", "image" or "unknown"
+    mime_type: Optional[str] = None
+    size: int = 0
+    page_count: int = 0
+    width: Optional[int] = None
+    height: Optional[int] = None
+    is_encrypted: bool = False
+    needs_password: bool = False
+    is_valid: bool = False
+
+
+# Image.info keys that carry metadata; a file with any of them is never returned as uploaded
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "icc_profile", "comment", "photoshop")
+
+# (prefix, mime type) pairs; WebP is checked separately because of the RIFF container
+MAGIC_NUMBERS = [
+    (b"%PDF-", "application/pdf"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"BM", "image/bmp"),
+]
+
 
 class FileUtil:
 
@@ -10,30 +43,133 @@ class FileUtil:
     def to_base64(data: bytes) -> str:
         return base64.b64encode(data).decode("utf-8")
 
+    @staticmethod
+    def sniff_mime_type(data: bytes) -> Optional[str]:
+        """Detects the mime type from the file's magic bytes (never from its name)."""
+        if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+            return "image/webp"
+        for prefix, mime_type in MAGIC_NUMBERS:
+            if data.startswith(prefix):
+                return mime_type
+        return None
+
+    @staticmethod
+    def inspect(data: bytes) -> FileDescriptor:
+        """
+        Opens the file once and describes it: kind, sniffed mime type, page count,
+        dimensions and encryption. Images are only parsed up to their header; decoding
+        the pixels is left to whoever actually needs them.
+        """
+        mime_type = FileUtil.sniff_mime_type(data)
+        descriptor = FileDescriptor(kind="unknown", mime_type=mime_type, size=len(data))
+
+        if mime_type == "application/pdf":
+            descriptor.kind = "pdf"
+            try:
+                with fitz.open(stream=data, filetype="pdf") as doc:
+                    descriptor.is_encrypted = bool(doc.is_encrypted or doc.needs_pass)
+                    descriptor.needs_password = bool(doc.needs_pass)
+                    descriptor.page_count = doc.page_count
+                    if doc.page_count > 0 and not doc.needs_pass:
+                        rect = doc[0].rect
+                        descriptor.width, descriptor.height = int(rect.width), int(rect.height)
+                descriptor.is_valid = descriptor.page_count > 0
+            except Exception:
+                descriptor.is_valid = False
+            return descriptor
+
+        if mime_type is not None:
+            try:
+                with Image.open(io.BytesIO(data)) as img:
+                    descriptor.kind = "image"
+                    descriptor.mime_type = Image.MIME.get(img.format, mime_type)
+                    descriptor.width, descriptor.height = img.size
+                    descriptor.page_count = 1
+                    descriptor.is_valid = True
+            except (UnidentifiedImageError, IOError):
+                descriptor.is_valid = False
+        return descriptor
+
+    @staticmethod
+    async def inspect_async(data: bytes) -> FileDescriptor:
+        """Same as `inspect`, in a worker thread so PyMuPDF/Pillow parsing doesn't block the event loop."""
+        return await asyncio.to_thread(FileUtil.inspect, data)
+
     @staticmethod
     def is_valid_pdf(data: bytes) -> bool:
-        try:
-            # Check for PDF magic number %PDF-
-            if not data.startswith(b"%PDF-"):
-                return False
-                
-            # Intentar abrir el PDF con PyMuPDF desde el stream de bytes
-            doc = fitz.open(stream=data, filetype="pdf")
-            if doc.page_count > 0:
-                doc.close()
-                return True
-            doc.close()
-            return False
-        except Exception:
-            return False
+        descriptor = FileUtil.inspect(data)
+        return descriptor.kind == "pdf" and descriptor.is_valid
 
+    @staticmethod
+    def split_pdf(data: bytes, pages_per_shard: int) -> list[tuple[int, int, bytes]]:
+        """Splits a PDF into sub-documents of at most `pages_per_shard` pages.
+        Returns (first_page_offset, page_count, pdf_bytes) tuples in page order."""
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            page_count = doc.page_count
+        ranges = [(first, min(pages_per_shard, page_count - first)) for first in range(0, page_count, pages_per_shard)]
+        return FileUtil.extract_pdf_pages(data, ranges)
+
+    @staticmethod
+    def extract_pdf_pages(data: bytes, ranges: list[tuple[int, int]]) -> list[tuple[int, int, bytes]]:
+        """Copies each (first_page_offset, page_count) range into its own PDF.
+        Returns (first_page_offset, page_count, pdf_bytes) tuples in the order given.
+        The output is deterministic (no fresh /ID), so equal inputs give equal shards for
+        the extraction cache and single-flight keys."""
+        parts = []
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            for first, count in ranges:
+                with fitz.open() as part:
+                    part.insert_pdf(doc, from_page=first, to_page=first + count - 1)
+                    parts.append((first, count, part.tobytes(garbage=3, deflate=True, no_new_id=True)))
+        return parts
 
     @staticmethod
     def is_valid_image(data: bytes) -> bool:
-        try:
-            img = Image.open(io.BytesIO(data))
-            img.verify() 
-            return True
-        except (UnidentifiedImageError, IOError):
-            return False
+        descriptor = FileUtil.inspect(data)
+        return descriptor.kind == "image" and descriptor.is_valid
+
+    @staticmethod
+    def optimize_image(data: bytes, max_long_edge: int = 2048, max_dpi: int = 0, output_format: str = "WEBP", quality: int = 85) -> tuple[bytes, str]:
+        """
+        Prepares a photo/scan for the LLM: applies the EXIF orientation, caps the resolution
+        (long edge in pixels and, when the file declares it, DPI) and re-encodes it without
+        metadata. Returns (image_bytes, mime_type); the original bytes are kept only when nothing
+        had to change, re-encoding would not make the file smaller and the original carries no
+        metadata (EXIF can hold GPS coordinates and device serials).
+        """
+        output_format = output_format.upper()
+        with Image.open(io.BytesIO(data)) as original:
+            original_mime = Image.MIME.get(original.format, "image/jpeg")
+            dpi = original.info.get("dpi")
+            img = ImageOps.exif_transpose(original)
+            rotated = img.size != original.size or original.getexif().get(0x0112, 1) != 1
+            has_metadata = (
+                bool(original.getexif())
+                or any(key in original.info for key in METADATA_KEYS)
+                or bool(getattr(original, "text", None))
+            )
+
+            scale = 1.0
+            long_edge = max(img.size)
+            if max_long_edge and long_edge > max_long_edge:
+                scale = max_long_edge / long_edge
+            if max_dpi and dpi and dpi[0] and dpi[0] > max_dpi:
+                scale = min(scale, max_dpi / float(dpi[0]))
+            if scale < 1.0:
+                new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+                img = img.resize(new_size, Image.LANCZOS)
+
+            has_alpha = img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info
+            if output_format == "WEBP" and has_alpha:
+                img = img.convert("RGBA")
+            elif img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+
+            out = io.BytesIO()
+            # No exif/icc arguments: the re-encoded file carries no metadata
+            img.save(out, format=output_format, quality=quality)
 
+        optimized = out.getvalue()
+        if scale >= 1.0 and not rotated and not has_metadata and len(optimized) >= len(data):
+            return data, original_mime
+        return optimized, Image.MIME.get(output_format, "image/jpeg")
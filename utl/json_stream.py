@@ -0,0 +1,131 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+from utl.json_util import JsonUtil
+
+CLOSERS = {"{": "}", "[": "]"}
+
+# Returned by `feed` in place of an element that is not valid JSON, so positions are kept
+INVALID_ELEMENT = object()
+
+
+class JsonArrayStream:
+    """
+    Incremental parser for a JSON array of objects that arrives in chunks, as model output
+    does. `feed` returns every element that closed within the chunk, so it can be used before
+    the array is complete; `finish` tries to salvage an element cut off by a truncated stream.
+
+    Anything before the opening bracket (markdown fences, prose) is skipped, a single
+    top-level object is accepted as a one-element array, and an element that fails to parse
+    comes back as INVALID_ELEMENT without losing the ones around it.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.invalid = 0
+        self.salvaged = 0
+        self._single_object = False
+        self._element: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # Buffer length and open containers right before the last comma inside the current element
+        self._safe_point: Optional[Tuple[int, Tuple[str, ...]]] = None
+
+    @property
+    def truncated(self) -> bool:
+        """True while the array (or the current element) is still open."""
+        return self.started and not self.finished
+
+    def feed(self, text: str) -> List[Any]:
+        items = []
+        for char in text:
+            if self.finished:
+                break
+            if not self._stack:
+                self._between_elements(char)
+                continue
+
+            self._element.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in CLOSERS:
+                self._stack.append(char)
+            elif char in "}]":
+                self._stack.pop()
+                if not self._stack:
+                    items.append(self._parse("".join(self._element)))
+                    self._reset_element()
+                    if self._single_object:
+                        self.finished = True
+            elif char == ",":
+                self._safe_point = (len(self._element) - 1, tuple(self._stack))
+        return items
+
+    def finish(self) -> List[Any]:
+        """Call once the stream ended: returns the salvaged last element, if any."""
+        if not self._stack:
+            return []
+        text = "".join(self._element)
+        candidates = []
+        if not self._in_string:
+            # Cut right after a complete value: just close what is open
+            candidates.append(text.rstrip().rstrip(",:") + self._closers(self._stack))
+        if self._safe_point is not None:
+            # Drop the member that was being written when the stream stopped
+            length, stack = self._safe_point
+            candidates.append(text[:length] + self._closers(stack))
+        self._reset_element()
+
+        for candidate in candidates:
+            try:
+                item = JsonUtil.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            self.salvaged += 1
+            return [item]
+        return []
+
+    def _between_elements(self, char: str):
+        if not self.started:
+            if char == "[":
+                self.started = True
+            elif char == "{":
+                self.started = True
+                self._single_object = True
+                self._open_element(char)
+            return
+        if char in CLOSERS:
+            self._open_element(char)
+        elif char == "]":
+            self.finished = True
+
+    def _open_element(self, char: str):
+        self._element.append(char)
+        self._stack.append(char)
+
+    def _reset_element(self):
+        self._element = []
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._safe_point = None
+
+    def _parse(self, text: str) -> Any:
+        try:
+            return JsonUtil.loads(text)
+        except json.JSONDecodeError:
+            self.invalid += 1
+            return INVALID_ELEMENT
+
+    @staticmethod
+    def _closers(stack) -> str:
+        return "".join(CLOSERS[opener] for opener in reversed(stack))
@@ -0,0 +1,51 @@
+import json
+from typing import Any, Callable, Optional
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the standard library
+    orjson = None
+
+# orjson only handles 64-bit integers: longer ones (account numbers, CCI) load as floats and
+# fail to dump. 20 digits is the first length that can exceed the range. Every digit maps to
+# "0" and anything else to a space, so a long number is a run of zeros (C speed, unlike a regex)
+DIGITS_AS_ZEROS = bytes(0x30 if 0x30 <= byte <= 0x39 else 0x20 for byte in range(256))
+LONG_NUMBER = b"0" * 20
+
+
+class JsonUtil:
+    """JSON (de)serialization for the hot paths: orjson when installed, stdlib json otherwise.
+    Both backends emit compact UTF-8 JSON (no ASCII escaping). Integers beyond 64 bits, which
+    orjson cannot represent, go through stdlib json so they keep every digit."""
+
+    @staticmethod
+    def backend() -> str:
+        return "orjson" if orjson is not None else "json"
+
+    @staticmethod
+    def dumps_bytes(data: Any, default: Optional[Callable[[Any], Any]] = None) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS)
+            except TypeError:
+                # Integer over 64 bits (or a type `default` can't handle: stdlib raises it again)
+                pass
+        return json.dumps(data, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def dumps(data: Any, default: Optional[Callable[[Any], Any]] = None) -> str:
+        if orjson is not None:
+            try:
+                return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+            except TypeError:
+                pass
+        return json.dumps(data, default=default, ensure_ascii=False, separators=(",", ":"))
+
+    @staticmethod
+    def loads(data: str | bytes) -> Any:
+        """Raises json.JSONDecodeError on invalid input with either backend."""
+        if orjson is not None:
+            raw = data.encode("utf-8", "surrogatepass") if isinstance(data, str) else data
+            if LONG_NUMBER not in raw.translate(DIGITS_AS_ZEROS):
+                return orjson.loads(raw)
+        return json.loads(data)
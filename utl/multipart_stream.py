@@ -0,0 +1,137 @@
+import asyncio
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, List, Optional, Tuple
+
+from fastapi import Request, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.datastructures import Headers
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ModuleNotFoundError:
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from core.exceptions import AppBaseException
+
+
+class MultipartFileStream:
+    """
+    Parses a multipart/form-data body incrementally and yields every file part as an
+    UploadFile as soon as its closing boundary arrives. Each file is spooled to disk
+    past `spool_max_size`, so the request body is never fully held in memory and the
+    consumer can start working on the first file while the rest is still uploading.
+    """
+
+    def __init__(self, request: Request, field_name: str = "files", spool_max_size: int = 1024 * 1024, max_files: int = 100):
+        self.request = request
+        self.field_name = field_name
+        self.spool_max_size = spool_max_size
+        self.max_files = max_files
+
+        _, params = parse_options_header(request.headers.get("content-type", ""))
+        self.boundary = params.get(b"boundary")
+        if not self.boundary:
+            raise AppBaseException("Se esperaba un cuerpo multipart/form-data.", status_code=400)
+
+        # Set once the request body has been fully consumed (or the upload aborted)
+        self.done = asyncio.Event()
+
+        self._header_name = b""
+        self._header_value = b""
+        self._part_headers: List[Tuple[bytes, bytes]] = []
+        self._part_disposition: Optional[bytes] = None
+        self._current: Optional[UploadFile] = None
+        self._pending_writes: List[Tuple[UploadFile, bytes]] = []
+        self._finished: List[UploadFile] = []
+        self._files_count = 0
+
+    def on_part_begin(self) -> None:
+        self._part_headers = []
+        self._part_disposition = None
+        self._current = None
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def on_header_end(self) -> None:
+        name = self._header_name.lower()
+        if name == b"content-disposition":
+            self._part_disposition = self._header_value
+        self._part_headers.append((name, self._header_value))
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._part_disposition)
+        field_name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        if field_name != self.field_name or b"filename" not in options:
+            # Plain form fields and unrelated file fields are ignored
+            return
+
+        self._files_count += 1
+        if self._files_count > self.max_files:
+            raise AppBaseException(f"Demasiados archivos. Máximo permitido: {self.max_files}.", status_code=400)
+
+        self._current = UploadFile(
+            file=SpooledTemporaryFile(max_size=self.spool_max_size),
+            size=0,
+            filename=options[b"filename"].decode("utf-8", errors="replace"),
+            headers=Headers(raw=self._part_headers),
+        )
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._current is not None:
+            self._pending_writes.append((self._current, data[start:end]))
+
+    def on_part_end(self) -> None:
+        if self._current is not None:
+            self._finished.append(self._current)
+            self._current = None
+
+    async def __aiter__(self) -> AsyncIterator[UploadFile]:
+        parser = MultipartParser(self.boundary, {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        })
+
+        try:
+            async for chunk in self.request.stream():
+                parser.write(chunk)
+                # UploadFile.write moves to a threadpool once the spool rolls over to disk
+                for upload, data in self._pending_writes:
+                    await upload.write(data)
+                self._pending_writes.clear()
+
+                finished, self._finished = self._finished, []
+                for upload in finished:
+                    await upload.seek(0)
+                    yield upload
+            parser.finalize()
+        finally:
+            if self._current is not None:
+                await self._current.close()
+            self.done.set()
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that does not listen for client disconnects until the multipart
+    body has been consumed. The default implementation reads from `receive` concurrently
+    with the body iterator, which would steal request body chunks from the parser.
+    """
+
+    def __init__(self, content, upload_stream: MultipartFileStream, **kwargs):
+        super().__init__(content, **kwargs)
+        self.upload_stream = upload_stream
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await self.upload_stream.done.wait()
+        await super().listen_for_disconnect(receive)
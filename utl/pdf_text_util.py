@@ -0,0 +1,146 @@
+import re
+
+import fitz  # PyMuPDF
+
+
+# "Label: value" / "Label - value"; labels are short and don't start with a digit
+KEY_VALUE = re.compile(r"^\s*([^\d\W][^:]{0,59}?)\s*[:：]\s*(.*)$")
+# More unmapped glyphs than this means the font has no usable ToUnicode map
+MAX_REPLACEMENT_RATIO = 0.05
+# Spans further apart than this (points) on the same line are treated as separate cells
+CELL_GAP = 12.0
+# Page separator of the text sent to the model (see `join_pages`)
+PAGE_HEADER = re.compile(r"(?:^|\n\n)=== Página \d+ ===\n")
+
+
+class PdfTextUtil:
+    """Reads the text layer of born-digital PDFs (no OCR, no LLM)."""
+
+    @staticmethod
+    def page_lines(page: "fitz.Page") -> list[list[str]]:
+        """
+        Lines of the page in reading order, each split into cells: spans on the same
+        baseline are merged across blocks, and a wide horizontal gap starts a new cell.
+        """
+        rows: dict[int, list[tuple[float, float, str]]] = {}
+        for block in page.get_text("dict", flags=fitz.TEXT_PRESERVE_WHITESPACE)["blocks"]:
+            for line in block.get("lines", []):
+                for span in line["spans"]:
+                    text = span["text"].strip()
+                    if not text:
+                        continue
+                    x0, y0, x1, y1 = span["bbox"]
+                    # Rounded baseline, so spans of the same visual line share a row
+                    rows.setdefault(round(y1 / 3), []).append((x0, x1, text))
+
+        lines = []
+        for key in sorted(rows):
+            cells: list[str] = []
+            last_x1 = None
+            for x0, x1, text in sorted(rows[key]):
+                if last_x1 is not None and x0 - last_x1 < CELL_GAP:
+                    cells[-1] = f"{cells[-1]} {text}"
+                else:
+                    cells.append(text)
+                last_x1 = x1
+            lines.append(cells)
+        return lines
+
+    @staticmethod
+    def extract_fields(lines: list[list[str]]) -> dict:
+        """
+        Key-value heuristic over `page_lines`: "Label: value" in one cell, a label cell
+        followed by its value cell, or a "Label:" line whose value is the next line.
+        Repeated labels get a numeric suffix instead of overwriting each other.
+        """
+        fields: dict = {}
+
+        def put(label: str, value: str):
+            label = label.strip().rstrip(":").strip()
+            key, n = label, 2
+            while key in fields:
+                key, n = f"{label} ({n})", n + 1
+            fields[key] = value.strip() or None
+
+        pending_label = None
+        for cells in lines:
+            if pending_label is not None:
+                put(pending_label, " ".join(cells))
+                pending_label = None
+                continue
+
+            i = 0
+            while i < len(cells):
+                match = KEY_VALUE.match(cells[i])
+                if not match:
+                    i += 1
+                    continue
+                label, value = match.groups()
+                if not value and i + 1 < len(cells):
+                    value = cells[i + 1]
+                    i += 1
+                if value:
+                    put(label, value)
+                elif len(cells) == 1:
+                    pending_label = label
+                i += 1
+        return fields
+
+    @staticmethod
+    def has_readable_text(page: dict, min_chars: int) -> bool:
+        """Enough characters, and not mostly glyphs without a Unicode mapping."""
+        if page["chars"] < min_chars:
+            return False
+        return page["text"].count("\ufffd") / page["chars"] <= MAX_REPLACEMENT_RATIO
+
+    @staticmethod
+    def image_coverage(page: "fitz.Page") -> float:
+        """Share of the page area covered by images (overlaps counted twice, capped at 1)."""
+        rect = page.rect
+        # get_images only lists the page resources: a cheap way out for pages without images
+        if rect.is_empty or not page.get_images():
+            return 0.0
+        covered = sum(abs(fitz.Rect(info["bbox"]) & rect) for info in page.get_image_info())
+        return min(1.0, covered / abs(rect))
+
+    @staticmethod
+    def join_pages(texts: list[str]) -> str:
+        """Text of several pages for the model, each after a "=== Página N ===" line."""
+        return "\n\n".join(f"=== Página {i + 1} ===\n{text}" for i, text in enumerate(texts))
+
+    @staticmethod
+    def split_pages(text: str) -> list[str]:
+        """Inverse of `join_pages`."""
+        return PAGE_HEADER.split(text)[1:]
+
+    @staticmethod
+    def page_fields(page: dict) -> dict:
+        """Heuristic fields of a page from `extract_pages`, or its raw text when nothing matched."""
+        return page["fields"] or {"Texto": page["text"]}
+
+    @staticmethod
+    def extract_pages(data: bytes, min_chars: int, max_image_coverage: float, fields: bool = False) -> list[dict]:
+        """
+        Per page: the text (one line per row, cells tab-separated), its length and whether it is
+        `usable` instead of the image/PDF route: readable text on at least `min_chars`
+        characters and at most `max_image_coverage` of the page in images (a scan with a
+        stamped header or an OCR'd footer has text too). Coverage is only measured for pages
+        that pass the text check, and the heuristic `fields` only computed when asked for.
+        """
+        pages = []
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            for page in doc:
+                lines = PdfTextUtil.page_lines(page)
+                result = {
+                    "text": "\n".join("\t".join(cells) for cells in lines),
+                    "chars": sum(len(cell) for cells in lines for cell in cells),
+                    "fields": None,
+                }
+                result["usable"] = (
+                    PdfTextUtil.has_readable_text(result, min_chars)
+                    and PdfTextUtil.image_coverage(page) <= max_image_coverage
+                )
+                if fields and result["usable"]:
+                    result["fields"] = PdfTextUtil.extract_fields(lines)
+                pages.append(result)
+        return pages
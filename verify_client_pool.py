@@ -0,0 +1,67 @@
+import asyncio
+import statistics
+import sys
+import time
+
+import google.generativeai as genai
+
+from app.integration.impl.extraction_engine_impl import ExtractionEngineImpl
+from app.integration.impl.gemini_client_pool import GeminiClientPool
+from app.integration.impl.gemini_stub import StubGenerativeModel
+from app.integration.rate_scheduler import RateScheduler
+from config.config import settings
+
+# Benchmark: per-call GenerativeModel construction vs. the shared GeminiClientPool. The real
+# SDK shares one gRPC client between models, so building a model per call costs only its
+# construction: the baseline builds a real genai.GenerativeModel (offline) for every call and
+# then answers from the stub; both sides pay LATENCY_MS per call and no connection cost.
+# Nothing hits Gemini.
+# Usage: python verify_client_pool.py [calls] [concurrency]
+
+LATENCY_MS = 40
+
+
+class PerCallClientPool(GeminiClientPool):
+    """Previous behaviour: a fresh GenerativeModel for every request."""
+
+    def get(self, model_name, generation_config=None):
+        genai.GenerativeModel(model_name, generation_config=generation_config)
+        return StubGenerativeModel(model_name, latency_ms=self.stub_latency_ms)
+
+
+async def run(pool: GeminiClientPool, calls: int, concurrency: int) -> dict:
+    engine = ExtractionEngineImpl(scheduler=RateScheduler(max_in_flight=concurrency), client_pool=pool)
+    await engine.warmup()
+
+    latencies = []
+
+    async def call(i: int):
+        start = time.perf_counter()
+        result = await engine.extract_single_document("", "application/pdf", 2, i * 2 + 1)
+        assert len(result) == 2 and result[0]["document_index"] == i * 2 + 1, result
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": calls,
+        "total_s": round(elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 1),
+    }
+
+
+async def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    for name, pool_class in [("per_call", PerCallClientPool), ("pooled", GeminiClientPool)]:
+        pool = pool_class(api_key=settings.LLM_API_KEY, use_stub=True, stub_latency_ms=LATENCY_MS)
+        print(f"{name:8s}: {await run(pool, calls, concurrency)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+import asyncio
+import io
+import statistics
+import time
+
+import fitz
+import httpx
+from PIL import Image
+
+from main import app
+from app.core.dependencies.dependencies_analyze import get_analyze_service
+from app.core.services.impl.analyze_service_impl import AnalyzeServiceImpl
+from config.config import settings
+from config.executor_config import shutdown_cpu_executor
+
+# Load test: p50/p99 latency of an unrelated endpoint ("/") while heavy uploads are
+# being prepared, for every CPU executor kind. No Gemini calls, no database.
+
+UPLOADS = 6
+FILES_PER_UPLOAD = 4
+
+
+class InstantExtractionEngine:
+    async def extract_single_document(self, base64_data, mime_type, page_count, start_index):
+        return [{"document_index": start_index + i, "fields": {}} for i in range(page_count)]
+
+
+def heavy_files() -> list[tuple[str, bytes, str]]:
+    photo = io.BytesIO()
+    Image.effect_noise((4032, 3024), 30).convert("RGB").save(photo, format="JPEG", quality=95)
+
+    doc = fitz.open()
+    for i in range(40):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Página {i} " + "lorem ipsum " * 200)
+    pdf = doc.tobytes()
+    doc.close()
+
+    files = []
+    for i in range(FILES_PER_UPLOAD):
+        if i % 2:
+            files.append((f"photo_{i}.jpg", photo.getvalue(), "image/jpeg"))
+        else:
+            files.append((f"contract_{i}.pdf", pdf, "application/pdf"))
+    return files
+
+
+async def measure(kind: str, files) -> dict:
+    settings.CPU_EXECUTOR_KIND = kind
+    shutdown_cpu_executor()
+
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def upload():
+            response = await client.post("/analyze/upload", files=[("files", f) for f in files])
+            assert response.status_code == 200
+
+        async def probe(stop: asyncio.Event):
+            while not stop.is_set():
+                # Measured from when the probe *should* have been sent, so time the event
+                # loop spends blocked before the request even starts is counted too
+                intended = time.perf_counter() + 0.01
+                await asyncio.sleep(0.01)
+                await client.get("/")
+                latencies.append((time.perf_counter() - intended) * 1000)
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(upload() for _ in range(UPLOADS)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await prober
+
+    latencies.sort()
+    return {
+        "kind": kind,
+        "uploads_s": round(elapsed, 2),
+        "probes": len(latencies),
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p99_ms": round(latencies[max(0, int(len(latencies) * 0.99) - 1)], 1),
+        "max_ms": round(latencies[-1], 1),
+    }
+
+
+async def main():
+    app.dependency_overrides[get_analyze_service] = lambda: AnalyzeServiceImpl(InstantExtractionEngine())
+    files = heavy_files()
+    for kind in ["inline", "thread", "process"]:
+        print(await measure(kind, files))
+    shutdown_cpu_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
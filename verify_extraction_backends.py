@@ -0,0 +1,61 @@
+import asyncio
+import sys
+import time
+
+import fitz
+import httpx
+
+from main import app
+from app.core.dependencies.dependencies_analyze import build_extraction_backend, get_analyze_service
+from app.core.services.impl.analyze_service_impl import AnalyzeServiceImpl
+from config.config import settings
+
+# End-to-end throughput of /analyze/upload with the offline backends (no Gemini quota, no database).
+# Usage: python verify_extraction_backends.py [uploads] [files_per_upload]
+
+
+def born_digital_pdf(pages: int) -> bytes:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((50, 60), f"FACTURA ELECTRONICA F001-{i:05d}")
+        page.insert_text((50, 90), "RUC: 20123456789")
+        page.insert_text((50, 110), "Fecha de emisión: 12/03/2024")
+        page.insert_text((50, 130), "Total: S/ 1,250.00")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+async def run(backend: str, uploads: int, files) -> dict:
+    engine = build_extraction_backend(backend)
+    app.dependency_overrides[get_analyze_service] = lambda: AnalyzeServiceImpl(engine)
+
+    pages = 0
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+        async def upload():
+            nonlocal pages
+            response = await client.post("/analyze/upload", params={"mode": "incremental"}, files=[("files", f) for f in files])
+            assert response.status_code == 200
+            pages += response.text.count('"document":')
+
+        start = time.perf_counter()
+        await asyncio.gather(*(upload() for _ in range(uploads)))
+        elapsed = time.perf_counter() - start
+
+    return {"backend": backend, "uploads": uploads, "pages": pages, "total_s": round(elapsed, 2), "pages_per_s": round(pages / elapsed, 1)}
+
+
+async def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    files_per_upload = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    files = [(f"factura_{i}.pdf", born_digital_pdf(3), "application/pdf") for i in range(files_per_upload)]
+
+    settings.EXTRACTION_CACHE_ENABLED = False
+    settings.TEXT_LAYER_FALLBACK_BACKEND = "fake"
+    for backend in ["fake", "text_layer"]:
+        print(await run(backend, uploads, files))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+import asyncio
+import io
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from config.config import settings
+from utl.file_util import FileUtil
+
+# Usage:
+#   python verify_image_preprocessing.py [image ...]            -> payload size / encode time only
+#   python verify_image_preprocessing.py --extract [image ...]  -> also compares Gemini fields (uses quota)
+
+
+def synthetic_receipt() -> bytes:
+    # 12 MP "phone photo" of a receipt, with noise so JPEG can't compress it to nothing
+    img = Image.effect_noise((4032, 3024), 25).convert("RGB")
+    draw = ImageDraw.Draw(img)
+    for i, line in enumerate(["FACTURA 001-000123", "RUC: 20123456789", "Fecha: 12/03/2024", "Total: S/ 1,250.00"]):
+        draw.text((400, 400 + i * 300), line, fill=(0, 0, 0))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=95)
+    return buf.getvalue()
+
+
+def field_agreement(a: list[dict], b: list[dict]) -> float:
+    fields_a = a[0].get("fields") or {} if a else {}
+    fields_b = b[0].get("fields") or {} if b else {}
+    keys = set(fields_a) | set(fields_b)
+    if not keys:
+        return 1.0
+    same = sum(1 for k in keys if str(fields_a.get(k)).strip().lower() == str(fields_b.get(k)).strip().lower())
+    return same / len(keys)
+
+
+async def main():
+    args = sys.argv[1:]
+    extract = "--extract" in args
+    paths = [a for a in args if a != "--extract"]
+    samples = [(p, open(p, "rb").read()) for p in paths] or [("synthetic_receipt.jpg", synthetic_receipt())]
+
+    engine = None
+    if extract:
+        from app.integration.impl.extraction_engine_impl import ExtractionEngineImpl
+        engine = ExtractionEngineImpl()
+
+    print(f"Settings: long_edge={settings.IMAGE_MAX_LONG_EDGE} dpi={settings.IMAGE_MAX_DPI} "
+          f"format={settings.IMAGE_OUTPUT_FORMAT} quality={settings.IMAGE_QUALITY}")
+    for name, data in samples:
+        start = time.perf_counter()
+        optimized, mime = FileUtil.optimize_image(
+            data,
+            max_long_edge=settings.IMAGE_MAX_LONG_EDGE,
+            max_dpi=settings.IMAGE_MAX_DPI,
+            output_format=settings.IMAGE_OUTPUT_FORMAT,
+            quality=settings.IMAGE_QUALITY,
+        )
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        ratio = len(optimized) / len(data)
+        print(f"{name}: {len(data) / 1e6:.2f} MB -> {len(optimized) / 1e6:.2f} MB ({ratio:.1%}, {mime}) in {elapsed_ms:.0f} ms")
+
+        if engine:
+            original_mime = Image.MIME.get(Image.open(io.BytesIO(data)).format, "image/jpeg")
+            for label, payload, payload_mime in [("original", data, original_mime), ("optimized", optimized, mime)]:
+                start = time.perf_counter()
+                result = await engine.extract_single_document(FileUtil.to_base64(payload), payload_mime, 1, 1)
+                print(f"  {label}: {time.perf_counter() - start:.1f}s -> {result}")
+                if label == "original":
+                    baseline = result
+            print(f"  field agreement: {field_agreement(baseline, result):.0%}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
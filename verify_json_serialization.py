@@ -0,0 +1,67 @@
+import json
+import time
+
+from utl.json_util import JsonUtil
+
+# Microbenchmark: final SSE event of a 100-page analysis, before (stdlib, encoded twice)
+# and after (JsonUtil), plus parsing of a model response of the same size.
+
+PAGES = 100
+FIELDS_PER_PAGE = 25
+ROUNDS = 50
+
+
+def realistic_documents() -> list[dict]:
+    return [
+        {
+            "document_index": page,
+            "document_name": f"Factura electrónica F001-{page:06d} - Página {page}",
+            "fields": {
+                **{f"Campo {i} del formulario": f"Valor extraído número {i} con tildes: áéíóú ñ" for i in range(FIELDS_PER_PAGE)},
+                "Detalle": [{"Descripción": f"Ítem {j}", "Cantidad": j, "Precio": 12.5 * j} for j in range(10)],
+                "Total": 1250.75,
+                "Observaciones": None,
+            },
+        }
+        for page in range(1, PAGES + 1)
+    ]
+
+
+def old_final_event(documents: list[dict]) -> str:
+    final_payload = json.dumps({"documents": documents})
+    return f"data: {json.dumps({'response': final_payload})}\n\n"
+
+
+def new_final_event(documents: list[dict]) -> str:
+    final_payload = JsonUtil.dumps({"documents": documents})
+    return f'data: {{"response":{JsonUtil.dumps(final_payload)}}}\n\n'
+
+
+def timed(fn, *args) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    documents = realistic_documents()
+    llm_text = json.dumps(documents, ensure_ascii=False, indent=2)
+
+    # Both events must decode to the same documents for the frontend
+    old, new = old_final_event(documents), new_final_event(documents)
+    assert json.loads(json.loads(old[6:])["response"]) == json.loads(json.loads(new[6:])["response"])
+
+    print(f"Backend: {JsonUtil.backend()} | {PAGES} pages, final event {len(old) / 1024:.0f} KB (stdlib) / {len(new) / 1024:.0f} KB (new)")
+    rows = [
+        ("final SSE event", timed(old_final_event, documents), timed(new_final_event, documents)),
+        ("parse LLM response", timed(json.loads, llm_text), timed(JsonUtil.loads, llm_text)),
+    ]
+    for name, before, after in rows:
+        print(f"{name:20s} stdlib {before:7.2f} ms -> {after:7.2f} ms ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
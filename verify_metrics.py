@@ -0,0 +1,38 @@
+import sys
+import time
+
+from utl.metrics import MetricsRegistry
+
+# Cost of the instrumentation itself: a labelled histogram observation and counter increment,
+# enabled vs. disabled, and the size/time of one /metrics scrape.
+# Usage: python verify_metrics.py [iterations]
+
+
+def bench(registry: MetricsRegistry, iterations: int) -> float:
+    histogram = registry.histogram("stage_seconds", "bench", ["stage"])
+    counter = registry.counter("pages_total", "bench", ["outcome"])
+    start = time.perf_counter()
+    for i in range(iterations):
+        histogram.observe(i % 100 / 1000, stage="llm")
+        counter.inc(outcome="ok")
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    disabled = bench(MetricsRegistry(enabled=False), iterations)
+    registry = MetricsRegistry(enabled=True)
+    enabled = bench(registry, iterations)
+
+    start = time.perf_counter()
+    text = registry.expose()
+    scrape_ms = (time.perf_counter() - start) * 1000
+
+    print(f"observe + inc, disabled: {disabled:.0f} ns")
+    print(f"observe + inc, enabled:  {enabled:.0f} ns")
+    print(f"scrape: {len(text)} bytes in {scrape_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
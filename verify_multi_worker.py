@@ -0,0 +1,113 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import fitz
+import httpx
+
+# Starts `python server.py N` (fake extraction backend, SQLite database) once per shared store
+# backend and checks what every worker process must agree on: a user created through one
+# worker can log in through the others, and a tenant limited to one concurrent upload gets
+# one, not one per worker. Then measures pages/s with several users uploading at once.
+# Usage: python verify_multi_worker.py [workers]
+
+PORT = 8765
+USERS = 16
+PAGES = 10
+
+
+def pdf(serie: int = 0) -> bytes:
+    doc = fitz.open()
+    for i in range(PAGES):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Factura F{serie:03d}-{i + 1} " + "Total: S/ 100.00 " * 40)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def start_server(workers: int, store: str, database: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "LLM_API_KEY": os.environ.get("LLM_API_KEY", "x"),
+        "DATABASE_URL": f"sqlite+aiosqlite:///{database}",
+        "SHARED_STORE_BACKEND": store,
+        "EXTRACTION_BACKEND": "fake",
+        "FAKE_ENGINE_LATENCY_MS": "500",
+        "TENANT_MAX_CONCURRENT_UPLOADS": "1",
+        "JOB_WORKERS": "0",
+        "WEB_PORT": str(PORT),
+        "LOG_LEVEL": "WARNING",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-W", "ignore", "server.py", str(workers)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+
+async def wait_ready(client: httpx.AsyncClient):
+    for _ in range(200):
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+async def run(workers: int, store: str) -> dict:
+    database = os.path.join(tempfile.mkdtemp(), "verify.db")
+    server = start_server(workers, store, database)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", timeout=None) as client:
+            await wait_ready(client)
+            document = pdf()
+
+            credentials = {"email": "ana@empresa.com", "password": "12345678"}
+            await client.post("/auth/signup", json=credentials)
+            logins = await asyncio.gather(*(client.post("/auth/login", json=credentials) for _ in range(40)))
+
+            # Anonymous: the tenant is the client IP, the same for all of them
+            uploads = await asyncio.gather(*(
+                client.post("/analyze/upload", files=[("files", ("f.pdf", document, "application/pdf"))])
+                for _ in range(8)
+            ))
+
+            users = [f"user{i}@empresa.com" for i in range(USERS)]
+            for email in users:
+                await client.post("/auth/signup", json={"email": email, "password": "12345678"})
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post(
+                    "/analyze/upload",
+                    files=[("files", (f"f{j}.pdf", pdf(i * 3 + j), "application/pdf")) for j in range(3)],
+                    headers={"Authorization": f"Bearer fake-token-{email}"},
+                )
+                for i, email in enumerate(users)
+            ))
+            elapsed = time.perf_counter() - start
+            pages = sum(r.text.count("document_index") for r in responses if r.status_code == 200)
+    finally:
+        server.terminate()
+        server.wait()
+
+    return {
+        "logins_ok": f"{sum(r.status_code == 200 for r in logins)}/{len(logins)}",
+        "same_tenant_admitted": f"{sum(r.status_code == 200 for r in uploads)}/{len(uploads)} (limit 1)",
+        "pages_per_s": round(pages / elapsed, 1),
+    }
+
+
+async def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    for store in ("memory", "database"):
+        print(f"{workers} workers, {store:8s} store: {await run(workers, store)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+import asyncio
+import sys
+import time
+
+from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable
+
+from app.core.dependencies.dependencies_analyze import get_resilience
+from app.integration.resilience import CircuitOpenError, Resilience, RetryPolicy
+
+# Burst of calls against a simulated endpoint that accepts CAPACITY requests per second and
+# answers the rest with 429. Compares the old fixed 2s -> 4s retry loop (3 attempts, lockstep)
+# with full-jitter backoff through get_resilience() (the shipped settings, circuit breaker
+# included), then shows the breaker failing fast on a dead endpoint.
+# Usage: python verify_resilience.py [calls]
+
+CAPACITY = 10
+LATENCY = 0.05
+
+
+class LimitedEndpoint:
+    def __init__(self):
+        self.window = int(time.monotonic())
+        self.used = 0
+        self.requests = 0
+
+    async def __call__(self):
+        self.requests += 1
+        now = int(time.monotonic())
+        if now != self.window:
+            self.window, self.used = now, 0
+        if self.used >= CAPACITY:
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        self.used += 1
+        await asyncio.sleep(LATENCY)
+        return "ok"
+
+
+async def fixed_retry(fn):
+    delay = 2
+    for attempt in range(3):
+        try:
+            return await fn()
+        except ResourceExhausted:
+            if attempt == 2:
+                raise
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+async def burst(name: str, run, calls: int):
+    endpoint = LimitedEndpoint()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run(endpoint) for _ in range(calls)), return_exceptions=True)
+    ok = sum(1 for r in results if r == "ok")
+    print(f"{name:12s}: {ok}/{calls} ok, {endpoint.requests} requests, {time.perf_counter() - start:.1f}s")
+
+
+async def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    await burst("fixed 2s/4s", lambda endpoint: fixed_retry(endpoint), calls)
+
+    resilience = get_resilience()
+    await burst("full jitter", lambda endpoint: resilience.call(endpoint, endpoint="limited"), calls)
+    stats = resilience.stats()
+    print(f"{'':12s}  retries={stats['retries']} backoff_seconds={stats['backoff_seconds']} circuit_rejections={stats['circuit_rejections']}")
+
+    async def down():
+        raise ServiceUnavailable("503 The service is currently unavailable.")
+
+    resilience = Resilience(RetryPolicy(max_attempts=3, base_delay=0.1), failure_threshold=5, reset_timeout=30)
+    start = time.perf_counter()
+    outcomes = []
+    for _ in range(20):
+        try:
+            await resilience.call(down, endpoint="down")
+        except CircuitOpenError:
+            outcomes.append("rejected")
+        except ServiceUnavailable:
+            outcomes.append("failed")
+    print(f"{'breaker':12s}: {outcomes.count('failed')} failed, {outcomes.count('rejected')} rejected fast in "
+          f"{time.perf_counter() - start:.1f}s -> {resilience.stats()['breakers']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
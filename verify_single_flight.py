@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import time
+
+import fitz
+
+from app.core.services.impl import analyze_service_impl
+from app.core.services.impl.analyze_service_impl import AnalyzeServiceImpl
+from app.integration.impl.fake_extraction_engine import FakeExtractionEngine
+from app.integration.impl.single_flight_extraction_engine import SingleFlightExtractionEngine
+from app.integration.single_flight import SingleFlight
+
+# The same 20-page PDF uploaded by N concurrent requests (double clicks, the same circular sent
+# by a whole office), with and without single-flight. Counts preparations and model calls.
+# Usage: python verify_single_flight.py [uploads]
+
+PAGES = 20
+
+
+class CountingEngine(FakeExtractionEngine):
+
+    def __init__(self):
+        super().__init__(latency_ms=300)
+        self.calls = 0
+
+    async def extract_single_document(self, base64_data, mime_type, page_count, start_index):
+        self.calls += 1
+        return await super().extract_single_document(base64_data, mime_type, page_count, start_index)
+
+
+def circular() -> bytes:
+    doc = fitz.open()
+    for i in range(PAGES):
+        page = doc.new_page()
+        page.insert_text((50, 50), f"Circular 042-2024 - Página {i + 1}")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+async def run(single_flight: bool, uploads: int) -> dict:
+    engine = CountingEngine()
+    preparations = None
+    if single_flight:
+        preparations = SingleFlight("prepare")
+        service = AnalyzeServiceImpl(SingleFlightExtractionEngine(engine), preparations=preparations)
+    else:
+        service = AnalyzeServiceImpl(engine)
+
+    prepared = 0
+    original = analyze_service_impl.inspect_and_prepare_document
+
+    def counting_prepare(*args):
+        nonlocal prepared
+        prepared += 1
+        return original(*args)
+
+    analyze_service_impl.inspect_and_prepare_document = counting_prepare
+    content = circular()
+
+    async def upload(i: int) -> int:
+        pages = 0
+        async for event in service.upload_stream([{"filename": f"circular_{i}.pdf", "content": content}], incremental=True):
+            pages += event.startswith('data: {"document"')
+        return pages
+
+    start = time.perf_counter()
+    pages = await asyncio.gather(*(upload(i) for i in range(uploads)))
+    elapsed = time.perf_counter() - start
+    analyze_service_impl.inspect_and_prepare_document = original
+
+    assert all(p == PAGES for p in pages), pages
+    return {"uploads": uploads, "preparations": prepared, "model_calls": engine.calls, "total_s": round(elapsed, 2)}
+
+
+async def main():
+    uploads = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    for name, enabled in [("independent", False), ("single_flight", True)]:
+        print(f"{name:13s}: {await run(enabled, uploads)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import random
+import sys
+import time
+
+from app.integration.impl.extraction_engine_impl import ExtractionEngineImpl
+from app.integration.impl.gemini_client_pool import GeminiClientPool
+from app.integration.impl.gemini_stub import StubResponse, StubStreamResponse
+from app.integration.rate_scheduler import RateScheduler
+from config.config import settings
+from utl.json_util import JsonUtil
+
+# Long PDFs (PAGES pages) against a simulated model whose answers sometimes go wrong the way
+# Gemini's do: cut off at the output token limit, or with one malformed page object. Compares
+# the previous parse of the whole response.text (json.loads or nothing) with the per-page
+# validated parse, on the complete answer (extract_single_document, what the service uses)
+# and streamed (extract_document_stream), and shows when the first page becomes available.
+# Usage: python verify_streaming_extraction.py [documents]
+
+PAGES = 30
+LATENCY_MS = 300
+
+
+class FlakyModel:
+    """One JSON page object per chunk; `mode` decides how the answer goes wrong."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+
+    def pages(self, start_index: int) -> list[str]:
+        pages = [
+            json.dumps({"document_index": start_index + i, "document_name": f"Pág {i + 1}", "fields": {"Total": i * 10, "Moneda": "PEN"}})
+            for i in range(PAGES)
+        ]
+        if self.mode == "malformed":
+            pages[PAGES // 2] = pages[PAGES // 2].replace('"Moneda": "PEN"', '"Moneda": PEN')
+        chunks = [("," if i else "[") + page for i, page in enumerate(pages)]
+        chunks[-1] += "]"
+        if self.mode == "truncated":
+            # Output token limit: the answer stops in the middle of a page
+            text = "".join(chunks)
+            cut = int(len(text) * 0.7)
+            chunks = [text[i:min(i + 200, cut)] for i in range(0, cut, 200)]
+        return chunks
+
+    async def generate_content_async(self, contents, stream=False, **kwargs):
+        start_index = int(contents[0].split('"document_index": ')[1].split(",")[0])
+        chunks = self.pages(start_index)
+        delay = LATENCY_MS / 1000 / len(chunks)
+        if not stream:
+            await asyncio.sleep(LATENCY_MS / 1000)
+            return StubResponse("".join(chunks))
+        await asyncio.sleep(delay)
+        return StubStreamResponse(chunks, delay)
+
+
+class FlakyPool(GeminiClientPool):
+
+    def __init__(self):
+        super().__init__(api_key=settings.LLM_API_KEY, use_stub=True)
+
+    def get(self, model_name, generation_config=None):
+        return FlakyModel(random.choice(["ok", "ok", "truncated", "malformed"]))
+
+
+async def whole_text(model: FlakyModel, start_index: int) -> list[dict]:
+    """Previous behaviour: wait for response.text, json.loads it, everything or nothing."""
+    response = await model.generate_content_async([f'"document_index": {start_index},'])
+    try:
+        return JsonUtil.loads(response.text)
+    except json.JSONDecodeError:
+        return [{"document_index": start_index, "error": "Invalid JSON response from LLM"}]
+
+
+async def run(name: str, documents: int) -> dict:
+    random.seed(7)
+    pool = FlakyPool()
+    engine = ExtractionEngineImpl(scheduler=RateScheduler(max_in_flight=documents), client_pool=pool)
+    first_page_ms = []
+    pages = errors = 0
+
+    async def document(i: int):
+        nonlocal pages, errors
+        start = time.perf_counter()
+        start_index = i * PAGES + 1
+        if name == "whole_text":
+            results = await whole_text(pool.get(settings.LLM_MODEL_NAME), start_index)
+            first_page_ms.append((time.perf_counter() - start) * 1000)
+        elif name == "validated":
+            results = await engine.extract_single_document("", "application/pdf", PAGES, start_index)
+            first_page_ms.append((time.perf_counter() - start) * 1000)
+        else:
+            results = []
+            async for result in engine.extract_document_stream("", "application/pdf", PAGES, start_index):
+                if not results:
+                    first_page_ms.append((time.perf_counter() - start) * 1000)
+                results.append(result)
+        pages += sum(1 for r in results if not r.get("error"))
+        errors += sum(1 for r in results if r.get("error"))
+
+    await asyncio.gather(*(document(i) for i in range(documents)))
+    first_page_ms.sort()
+    return {
+        "pages": f"{pages}/{documents * PAGES}",
+        "error_entries": errors,
+        "first_page_p50_ms": round(first_page_ms[len(first_page_ms) // 2], 1),
+    }
+
+
+async def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    for name in ("whole_text", "validated", "streamed"):
+        print(f"{name:10s}: {await run(name, documents)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+import asyncio
+import sys
+import time
+
+from app.integration.rate_scheduler import RateScheduler
+
+# A heavy tenant sends several large batches at once (one model call per PDF shard) while an
+# interactive user uploads a small PDF a moment later. Compares how long that upload takes when
+# the scheduler queues per batch (previous behaviour: the heavy tenant gets one share per
+# batch), per tenant, and per tenant with a cap on the slots one tenant may hold.
+# Usage: python verify_tenant_fairness.py [heavy_batches]
+
+MAX_IN_FLIGHT = 8
+CALLS_PER_BATCH = 40
+CALL_SECONDS = 0.3
+INTERACTIVE_CALLS = 4
+SHARD_TOKENS = 10 * 258
+
+
+async def call(scheduler: RateScheduler, owner: str, tokens: int) -> float:
+    start = time.perf_counter()
+    async with scheduler.slot(tokens, owner=owner):
+        waited = time.perf_counter() - start
+        await asyncio.sleep(CALL_SECONDS)
+    return waited
+
+
+async def run(name: str, batches: int) -> dict:
+    per_owner_cap = MAX_IN_FLIGHT - 2 if name == "tenant+cap" else 0
+    scheduler = RateScheduler(max_in_flight=MAX_IN_FLIGHT, max_in_flight_per_owner=per_owner_cap)
+
+    def heavy_owner(batch: int) -> str:
+        return f"batch-{batch}" if name == "batch" else "user:heavy@corp.com"
+
+    heavy = [
+        asyncio.create_task(call(scheduler, heavy_owner(batch), SHARD_TOKENS))
+        for batch in range(batches) for _ in range(CALLS_PER_BATCH)
+    ]
+    await asyncio.sleep(1)
+
+    start = time.perf_counter()
+    waits = await asyncio.gather(*(call(scheduler, "user:interactive@corp.com", SHARD_TOKENS) for _ in range(INTERACTIVE_CALLS)))
+    interactive = time.perf_counter() - start
+    await asyncio.gather(*heavy)
+    return {
+        "interactive_upload_ms": round(interactive * 1000),
+        "interactive_max_wait_ms": round(max(waits) * 1000),
+        "heavy_total_s": round(time.perf_counter() - start + 1, 1),
+    }
+
+
+async def main():
+    batches = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name in ("batch", "tenant", "tenant+cap"):
+        print(f"{name:10s}: {await run(name, batches)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+import asyncio
+import io
+import sys
+import time
+
+import fitz
+from PIL import Image
+
+from app.core.services.impl.analyze_service_impl import prepare_document
+from config.config import settings
+
+# Usage:
+#   python verify_text_triage.py [pdf ...]            -> payload size / preparation time per PDF_TEXT_TRIAGE mode
+#   python verify_text_triage.py --extract [pdf ...]  -> also times the Gemini calls (uses quota)
+
+
+def erp_invoice(pages: int = 12, scanned_every: int = 4) -> bytes:
+    """Born-digital invoice pages with an embedded logo, plus an image-only "scanned" page every few pages."""
+    logo = io.BytesIO()
+    Image.new("RGB", (600, 200), (20, 60, 160)).save(logo, format="PNG")
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        if scanned_every and i % scanned_every == scanned_every - 1:
+            scan = io.BytesIO()
+            Image.effect_noise((1240, 1754), 40).convert("RGB").save(scan, format="JPEG", quality=85)
+            page.insert_image(page.rect, stream=scan.getvalue())
+            continue
+        page.insert_image(fitz.Rect(40, 20, 240, 86), stream=logo.getvalue())
+        page.insert_text((50, 110), f"FACTURA ELECTRONICA F001-{i:06d}", fontsize=14)
+        for row, (label, value) in enumerate([("RUC", "20123456789"), ("Razón social", "ACME S.A.C."), ("Fecha de emisión", "12/03/2024"), ("Moneda", "Soles")]):
+            page.insert_text((50, 140 + row * 18), f"{label}: {value}")
+        for row in range(25):
+            page.insert_text((50, 240 + row * 16), f"{row + 1}\tProducto {row} descripción larga del ítem\t{row + 1} UND\tS/ {row * 13.5:.2f}")
+        page.insert_text((50, 660), "Total: S/ 4,050.00")
+    data = doc.tobytes(deflate=True)
+    doc.close()
+    return data
+
+
+def payload_size(doc_prep: dict) -> int:
+    units = doc_prep.get("shards") or [doc_prep]
+    return sum(len(unit.get("base64") or "") for unit in units)
+
+
+async def main():
+    args = sys.argv[1:]
+    extract = "--extract" in args
+    paths = [a for a in args if a != "--extract"]
+    samples = [(p, open(p, "rb").read()) for p in paths] or [
+        ("erp_invoice.pdf", erp_invoice(scanned_every=0)),
+        ("erp_invoice_with_scans.pdf", erp_invoice(scanned_every=4)),
+    ]
+
+    engine = None
+    if extract:
+        from app.core.dependencies.dependencies_analyze import get_extraction_engine
+        settings.EXTRACTION_CACHE_ENABLED = False
+        engine = get_extraction_engine()
+
+    for name, data in samples:
+        print(f"{name}: {len(data) / 1e6:.2f} MB")
+        for mode in ["off", "llm", "heuristic"]:
+            settings.PDF_TEXT_TRIAGE = mode
+            start = time.perf_counter()
+            doc_prep = prepare_document(data, name)
+            prep_ms = (time.perf_counter() - start) * 1000
+            units = doc_prep.get("shards") or [doc_prep]
+            calls = sum(1 for unit in units if unit.get("base64"))
+            line = f"  {mode:9s}: payload {payload_size(doc_prep) / 1e3:9.1f} KB in {calls:2d} calls, prepared in {prep_ms:5.0f} ms"
+
+            if engine:
+                start = time.perf_counter()
+                await asyncio.gather(*(
+                    engine.extract_single_document(unit["base64"], unit.get("mime_type", doc_prep["mime_type"]), unit["page_count"], 1)
+                    for unit in units if unit.get("base64")
+                ))
+                line += f", model {time.perf_counter() - start:.1f} s"
+            print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+import asyncio
+import signal
+import sys
+
+from app.core.dependencies.dependencies_analyze import get_extraction_engine
+from app.core.dependencies.dependencies_job import get_extraction_job_worker_pool
+from config.app_logging import setup_logging
+from config.config import settings
+from config.executor_config import shutdown_cpu_executor
+from main import init_models
+
+# Dedicated extraction worker: drains /analyze/jobs without serving HTTP.
+# Usage: python worker.py [workers]   (API processes run no workers unless JOB_WORKERS > 0)
+
+
+async def main():
+    setup_logging()
+    if len(sys.argv) > 1:
+        settings.JOB_WORKERS = int(sys.argv[1])
+    settings.JOB_WORKERS = settings.JOB_WORKERS or 1
+
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        await init_models()
+    if settings.LLM_WARMUP_ENABLED:
+        await get_extraction_engine().warmup()
+
+    pool = get_extraction_job_worker_pool()
+    pool.start()
+    print(f"Extraction worker running with {settings.JOB_WORKERS} workers")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        await pool.stop()
+        shutdown_cpu_executor()
+
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    asyncio.run(main())